@@ -0,0 +1,130 @@
+import math
+import time
+import numpy as np
+from shared import run_pool, worker_state
+
+METRICS = ('mse', 'rmse', 'mae', 'mape', 'directional_accuracy')
+
+
+def walk_forward_folds(n_rows, seq_length, n_folds=5, test_windows=None,
+                       mode='expanding', train_windows=None):
+    # Rolling-origin folds in window-index space: window i covers rows
+    # [i, i + seq_length) and predicts row i + seq_length. Each fold tests on
+    # the block right after its training block; 'expanding' keeps every
+    # earlier window, 'sliding' keeps a fixed-size training block.
+    total = n_rows - seq_length
+    test_windows = test_windows or total // (n_folds + 1)
+    first_test = total - n_folds * test_windows
+    if test_windows < 1 or first_test < 1:
+        raise ValueError(f"{n_rows} rows are too few for {n_folds} folds "
+                         f"with seq_length {seq_length}")
+    train_windows = train_windows or first_test
+
+    folds = []
+    for k in range(n_folds):
+        test_start = first_test + k * test_windows
+        train_start = 0 if mode == 'expanding' else max(0, test_start - train_windows)
+        folds.append({
+            'fold': k,
+            'train': (train_start, test_start),
+            'test': (test_start, test_start + test_windows),
+        })
+    return folds
+
+
+def fold_metrics(y_true, y_pred, last_seen):
+    # last_seen is the final input value of each window; direction is
+    # whether the model called the next move up or down correctly
+    error = y_pred - y_true
+    mse = float(np.mean(error ** 2))
+    nonzero = y_true != 0
+    return {
+        'mse': mse,
+        'rmse': math.sqrt(mse),
+        'mae': float(np.mean(np.abs(error))),
+        'mape': float(np.mean(np.abs(error[nonzero] / y_true[nonzero])) * 100)
+                if nonzero.any() else math.nan,
+        'directional_accuracy': float(np.mean(
+            np.sign(y_pred - last_seen) == np.sign(y_true - last_seen))),
+    }
+
+
+def run_fold(fold, seq_length=60, epochs=20, batch_size=32, units=50, patience=3,
+             architecture='lstm'):
+    import tensorflow as tf
+    from sklearn.preprocessing import MinMaxScaler
+    from datasets import window_dataset
+    from model_builder import ModelBuilder
+    from windows import SequenceWindows
+
+    start = time.time()
+    series = worker_state['series']
+    train_start, train_stop = fold['train']
+    test_start, test_stop = fold['test']
+
+    # The scaler only sees rows that feed the training windows; the fold's
+    # slice is scaled once and windowed as views
+    rows = series[train_start:test_stop + seq_length].reshape(-1, 1)
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    scaler.fit(rows[:train_stop - train_start + seq_length])
+    windows = SequenceWindows(scaler.transform(rows), seq_length)
+    split = train_stop - train_start
+
+    model = ModelBuilder.build(architecture, (seq_length, 1), units=(units, units))
+    history = model.fit(
+        window_dataset(windows[:split], batch_size=batch_size),
+        epochs=epochs,
+        callbacks=[tf.keras.callbacks.EarlyStopping(
+            monitor='loss', patience=patience, restore_best_weights=True)],
+        verbose=0
+    )
+
+    X_test = windows[split:]
+    y_pred = model.predict(X_test.materialize(), batch_size=256, verbose=0)[:, :1]
+    y_pred = scaler.inverse_transform(y_pred).ravel()
+    y_true = series[test_start + seq_length:test_stop + seq_length]
+    last_seen = series[test_start + seq_length - 1:test_stop + seq_length - 1]
+
+    return dict(fold,
+                **fold_metrics(y_true, y_pred, last_seen),
+                n_train=split, n_test=len(y_true),
+                epochs=len(history.history['loss']),
+                seconds=time.time() - start,
+                y_true=y_true.tolist(), y_pred=y_pred.tolist(),
+                last_seen=last_seen.tolist())
+
+
+def aggregate(folds):
+    # Mean and spread of the per-fold metrics, plus the metrics of every
+    # out-of-sample prediction pooled together
+    ok = [f for f in folds if 'error' not in f]
+    if not ok:
+        return {}
+    summary = {}
+    for name in METRICS:
+        values = np.array([f[name] for f in ok])
+        summary[name] = {'mean': float(np.nanmean(values)), 'std': float(np.nanstd(values))}
+    pooled = fold_metrics(*(np.concatenate([f[k] for f in ok])
+                            for k in ('y_true', 'y_pred', 'last_seen')))
+    summary['pooled'] = pooled
+    summary['fold_seconds'] = float(sum(f['seconds'] for f in ok))
+    return summary
+
+
+def run_backtest(series, seq_length=60, n_folds=5, mode='expanding', test_windows=None,
+                 train_windows=None, n_workers=None, on_result=None, should_stop=None,
+                 **fold_kwargs):
+    series = np.asarray(series, dtype=np.float64)
+    folds = walk_forward_folds(len(series), seq_length, n_folds, test_windows,
+                               mode, train_windows)
+    start = time.time()
+    results = run_pool(series, run_fold, folds, n_workers, on_result, should_stop,
+                       seq_length=seq_length, **fold_kwargs)
+    results.sort(key=lambda r: r['fold'])
+    return {
+        'mode': mode,
+        'seq_length': seq_length,
+        'folds': results,
+        'aggregate': aggregate(results),
+        'wall_seconds': time.time() - start,
+    }
@@ -0,0 +1,280 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+# Reproducible performance benchmarks on synthetic price series: window
+# construction, CSV loading, training throughput and forecast latency.
+# Results are JSON; --compare flags metrics that got worse than a stored
+# baseline by more than --tolerance.
+
+DEFAULT_ROWS = (1000, 100000, 1000000)
+# Metric name suffixes that are better when larger; everything else is a
+# time or a size and is better when smaller
+HIGHER_IS_BETTER = ('_per_s',)
+# Timings this short are dominated by noise and never count as regressions
+MIN_SECONDS = 0.005
+
+
+def synthetic_series(rows, seed=0):
+    # Geometric random walk, so prices stay positive at any length
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def peak_bytes(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_windows(rows, seq_length, repeat):
+    from preprocessor import DataPreprocessor
+
+    series = synthetic_series(rows)
+
+    def build():
+        DataPreprocessor(seq_length=seq_length).preprocess(series, materialize=False,
+                                                           test_size=0.2)
+
+    result = {
+        'build_s': best_of(build, repeat),
+        'build_peak_bytes': peak_bytes(build),
+    }
+    # Dense copies are only measured while they stay reasonably small
+    dense_bytes = (rows - seq_length) * seq_length * 8
+    if dense_bytes <= 512 * 1024 ** 2:
+        def dense():
+            DataPreprocessor(seq_length=seq_length).preprocess(series, materialize=True,
+                                                               test_size=0.2)
+        result['materialize_s'] = best_of(dense, repeat)
+        result['materialize_peak_bytes'] = peak_bytes(dense)
+    return result
+
+
+def bench_csv(rows, repeat, workdir):
+    import pandas as pd
+    from data_loader import load_csv
+
+    path = os.path.join(workdir, f"prices_{rows}.csv")
+    pd.DataFrame({
+        'Date': pd.date_range('1990-01-01', periods=rows, freq='min').strftime('%Y-%m-%d %H:%M'),
+        'Close': synthetic_series(rows).round(4),
+    }).to_csv(path, index=False)
+    cache_dir = os.path.join(workdir, "cache")
+
+    result = {
+        'csv_bytes': os.path.getsize(path),
+        'cold_s': best_of(lambda: load_csv(path, cache_dir=None), repeat),
+    }
+    load_csv(path, cache_dir=cache_dir)
+    result['cached_s'] = best_of(lambda: load_csv(path, cache_dir=cache_dir), repeat)
+    return result
+
+
+def bench_training(rows, seq_length, epochs, batch_size, units):
+    import tensorflow as tf
+    from datasets import window_dataset
+    from model_builder import ModelBuilder
+    from preprocessor import DataPreprocessor
+
+    tf.keras.utils.set_random_seed(0)
+    windows, _, _ = DataPreprocessor(seq_length=seq_length).preprocess(
+        synthetic_series(rows), materialize=False)
+    model = ModelBuilder.build_lstm((seq_length, 1), units=(units, units))
+
+    class EpochTimer(tf.keras.callbacks.Callback):
+        # Each epoch is reported as it ends, so a drifting run shows up
+        # before the summary
+        def on_epoch_begin(self, epoch, logs=None):
+            self.start = time.perf_counter()
+
+        def on_epoch_end(self, epoch, logs=None):
+            seconds = time.perf_counter() - self.start
+            durations.append(seconds)
+            print(f"train epoch {epoch + 1}/{epochs}: {seconds:.3f}s, "
+                  f"{len(windows) / seconds:.0f} samples/s", file=sys.stderr)
+
+    durations = []
+    model.fit(window_dataset(windows, batch_size=batch_size, seed=0), epochs=epochs,
+              callbacks=[EpochTimer()], verbose=0)
+    # The first epoch includes tracing; report it separately
+    steady = durations[1:] or durations
+    return {
+        'first_epoch_s': durations[0],
+        'epoch_s': float(np.median(steady)),
+        'samples_per_s': len(windows) / float(np.median(steady)),
+        'epoch_samples_per_s': [len(windows) / seconds for seconds in durations],
+    }
+
+
+def bench_forecast(seq_length, days, horizon, units, batch, repeat):
+    import tensorflow as tf
+    from forecaster import RecursiveForecaster
+    from model_builder import ModelBuilder
+
+    tf.keras.utils.set_random_seed(0)
+    model = ModelBuilder.build_lstm((seq_length, 1), horizon=horizon, units=(units, units))
+    forecaster = RecursiveForecaster(model, seq_length)
+    window = np.random.default_rng(0).random((batch, seq_length, 1))
+    if batch == 1:
+        window = window[0]
+    forecaster.forecast(window, days)
+
+    return {
+        'latency_ms': best_of(lambda: forecaster.forecast(window, days), repeat) * 1000,
+    }
+
+
+def run_benchmarks(args):
+    results = []
+
+    def record(name, params, metrics):
+        results.append({'benchmark': name, 'params': params, 'metrics': metrics})
+        print(f"{name} {params}: {metrics}", file=sys.stderr)
+
+    workdir = tempfile.mkdtemp(prefix="stock_bench_")
+    try:
+        for rows in args.rows:
+            if 'windows' in args.only:
+                record('windows', {'rows': rows, 'seq_length': args.seq_length},
+                       bench_windows(rows, args.seq_length, args.repeat))
+            if 'csv' in args.only:
+                record('csv', {'rows': rows}, bench_csv(rows, args.repeat, workdir))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if 'train' in args.only:
+        record('train', {'rows': args.train_rows, 'seq_length': args.seq_length,
+                         'batch_size': args.batch_size, 'units': args.units},
+               bench_training(args.train_rows, args.seq_length, args.epochs,
+                              args.batch_size, args.units))
+    if 'forecast' in args.only:
+        for horizon in sorted({1, args.horizon}):
+            for batch in (1, args.batch):
+                record('forecast', {'seq_length': args.seq_length, 'days': args.days,
+                                    'horizon': horizon, 'batch': batch, 'units': args.units},
+                       bench_forecast(args.seq_length, args.days, horizon, args.units,
+                                      batch, args.repeat))
+    return results
+
+
+def _key(entry):
+    return entry['benchmark'], json.dumps(entry['params'], sort_keys=True)
+
+
+def compare(results, baseline, tolerance):
+    # Relative change per metric; positive change means slower or bigger
+    # (or lower throughput), and anything past the tolerance is a regression
+    previous = {_key(entry): entry['metrics'] for entry in baseline['results']}
+    rows = []
+    for entry in results:
+        old = previous.get(_key(entry))
+        if old is None:
+            continue
+        for name, value in entry['metrics'].items():
+            # Per-epoch lists are for reading; their summaries are compared
+            if name not in old or not old[name] or isinstance(value, list):
+                continue
+            change = (value - old[name]) / old[name]
+            seconds = {'_s': 1, '_ms': 1000}.get('_' + name.rsplit('_', 1)[-1])
+            if name.endswith(HIGHER_IS_BETTER):
+                change, seconds = -change, None
+            noise = seconds is not None and max(value, old[name]) < MIN_SECONDS * seconds
+            rows.append({
+                'benchmark': entry['benchmark'],
+                'params': entry['params'],
+                'metric': name,
+                'baseline': old[name],
+                'current': value,
+                'change': change,
+                'regression': change > tolerance and not noise,
+            })
+    return rows
+
+
+def environment():
+    import pandas as pd
+
+    env = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+    if 'tensorflow' in sys.modules:
+        env['tensorflow'] = sys.modules['tensorflow'].__version__
+    return env
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark preprocessing, training "
+                                                 "and forecasting on synthetic data.")
+    parser.add_argument("--rows", type=int, nargs="+", default=list(DEFAULT_ROWS),
+                        help="series lengths for the window and CSV benchmarks")
+    parser.add_argument("--seq-length", type=int, default=60)
+    parser.add_argument("--only", nargs="+", default=['windows', 'csv', 'train', 'forecast'],
+                        choices=['windows', 'csv', 'train', 'forecast'])
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per measurement "
+                                                              "(the best is kept)")
+    parser.add_argument("--train-rows", type=int, default=20000)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--units", type=int, default=50)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--horizon", type=int, default=5,
+                        help="horizon of the multi-step model in the forecast benchmark")
+    parser.add_argument("--batch", type=int, default=64,
+                        help="number of series in the batched forecast benchmark")
+    parser.add_argument("--output", default=None, help="write results to this JSON file")
+    parser.add_argument("--compare", default=None, metavar="BASELINE",
+                        help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="relative slowdown allowed before flagging (default 0.10)")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+    results = run_benchmarks(args)
+    report = {'created': time.time(), 'environment': environment(), 'results': results}
+
+    status = 0
+    if args.compare:
+        with open(args.compare) as f:
+            report['comparison'] = compare(results, json.load(f), args.tolerance)
+        regressions = [row for row in report['comparison'] if row['regression']]
+        for row in regressions:
+            print(f"REGRESSION {row['benchmark']} {row['params']} {row['metric']}: "
+                  f"{row['baseline']:.4g} -> {row['current']:.4g} "
+                  f"({row['change'] * 100:+.1f}%)", file=sys.stderr)
+        status = 1 if regressions else 0
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
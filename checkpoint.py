@@ -0,0 +1,105 @@
+import json
+import os
+import shutil
+import time
+from data_loader import CACHE_DIR
+
+CHECKPOINT_DIR = os.path.join(CACHE_DIR, "checkpoints")
+STATE_FILE = "state.json"
+
+
+class TrainingCheckpoint:
+    # Model weights, optimizer slots and the (epoch, batch) position of a
+    # run, kept by a tf.train.CheckpointManager in one directory per run.
+    # state.json next to it holds the loss history, so a resumed run still
+    # reports the whole curve.
+
+    def __init__(self, directory, model, every_seconds=60.0, max_to_keep=2, fresh=False):
+        import tensorflow as tf
+
+        if fresh:
+            shutil.rmtree(directory, ignore_errors=True)
+        self.directory = directory
+        self.every_seconds = every_seconds
+        self.history = {}
+        self.epoch = tf.Variable(0, dtype=tf.int64, trainable=False)
+        self.batch = tf.Variable(0, dtype=tf.int64, trainable=False)
+        # Optimizer slots are created lazily; they must exist to be restored
+        model.optimizer.build(model.trainable_variables)
+        self.checkpoint = tf.train.Checkpoint(model=model, optimizer=model.optimizer,
+                                              epoch=self.epoch, batch=self.batch)
+        self.manager = tf.train.CheckpointManager(self.checkpoint, directory,
+                                                  max_to_keep=max_to_keep)
+
+    @property
+    def exists(self):
+        return self.manager.latest_checkpoint is not None
+
+    def restore(self):
+        # (epoch, batch) to continue from; (0, 0) when there is nothing saved
+        if not self.exists:
+            return 0, 0
+        self.checkpoint.restore(self.manager.latest_checkpoint).assert_existing_objects_matched()
+        try:
+            with open(os.path.join(self.directory, STATE_FILE)) as f:
+                self.history = json.load(f).get('history', {})
+        except (OSError, ValueError):
+            self.history = {}
+        return int(self.epoch.numpy()), int(self.batch.numpy())
+
+    def save(self, epoch, batch):
+        self.epoch.assign(epoch)
+        self.batch.assign(batch)
+        self.manager.save()
+        state = os.path.join(self.directory, STATE_FILE)
+        with open(state + ".tmp", "w") as f:
+            json.dump({'epoch': epoch, 'batch': batch, 'history': self.history,
+                       'saved': time.time()}, f)
+        os.replace(state + ".tmp", state)
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def callback(self, initial_epoch=0, initial_batch=0, steps=None):
+        import tensorflow as tf
+
+        checkpoint = self
+
+        class CheckpointCallback(tf.keras.callbacks.Callback):
+            # Saves every every_seconds within an epoch, at each epoch end
+            # and where training stops, so a cancelled run loses nothing.
+            # Must come before EarlyStopping, which may restore older weights
+            # when training ends.
+            def on_train_begin(self, logs=None):
+                self.last_save = time.monotonic()
+                self.position = self.saved = (initial_epoch, initial_batch)
+
+            def on_epoch_begin(self, epoch, logs=None):
+                self.epoch = epoch
+                self.offset = initial_batch if epoch == initial_epoch else 0
+
+            def on_train_batch_end(self, batch, logs=None):
+                self.position = (self.epoch, self.offset + batch + 1)
+                if time.monotonic() - self.last_save >= checkpoint.every_seconds:
+                    self._save()
+
+            def on_epoch_end(self, epoch, logs=None):
+                # Keras still ends an epoch cut short by stop_training; that
+                # one is resumed from its batch rather than counted
+                if self.model.stop_training and steps and self.position[1] < steps:
+                    return
+                for name, value in (logs or {}).items():
+                    checkpoint.history.setdefault(name, []).append(float(value))
+                self.position = (epoch + 1, 0)
+                self._save()
+
+            def on_train_end(self, logs=None):
+                if self.position != self.saved:
+                    self._save()
+
+            def _save(self):
+                checkpoint.save(*self.position)
+                self.saved = self.position
+                self.last_save = time.monotonic()
+
+        return CheckpointCallback()
@@ -0,0 +1,527 @@
+import argparse
+import json
+import signal
+import sys
+
+# Headless entry point. Heavy modules (pandas, TensorFlow) are imported
+# inside the command handlers so `--help` returns immediately.
+
+
+def _registered(names):
+    # argparse type checking a value against a model_builder registry.
+    # model_builder imports TensorFlow, so it is only loaded when parsing
+    # a command that takes the option.
+    def check(value):
+        import model_builder
+
+        choices = tuple(getattr(model_builder, names))
+        if value not in choices:
+            raise argparse.ArgumentTypeError(
+                f"invalid choice: {value!r} (choose from {', '.join(choices)})")
+        return value
+    return check
+
+
+def _add_data_args(parser):
+    parser.add_argument("csv", help="CSV file with the price series")
+    parser.add_argument("--target", default="Close", help="target column (default: Close)")
+    parser.add_argument("--date", default=None, help="date column used for forecast dates")
+
+
+def _add_model_args(parser):
+    parser.add_argument("--seq-length", type=int, default=60)
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--epochs", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--shuffle-buffer", type=int, default=1000)
+    parser.add_argument("--horizon", type=int, default=1)
+    parser.add_argument("--units", type=int, default=50)
+    parser.add_argument("--architecture", type=_registered('ARCHITECTURES'), default="lstm",
+                        help="lstm, gru, tcn, dense or any other registered encoder")
+    parser.add_argument("--layers", type=int, default=2)
+    parser.add_argument("--dropout", type=float, default=0.2)
+    parser.add_argument("--learning-rate", type=float, default=0.001)
+    parser.add_argument("--jit", action="store_true", help="compile training steps with XLA")
+    parser.add_argument("--threads", type=int, default=0,
+                        help="intra-op threads (0 = TensorFlow default)")
+    parser.add_argument("--inter-op-threads", type=int, default=0)
+    parser.add_argument("--mixed-precision", action="store_true",
+                        help="float16 compute when a GPU is present")
+    parser.add_argument("--quantiles", type=float, nargs="+", default=None,
+                        help="also fit a quantile head at these levels, e.g. 0.05 0.5 0.95")
+    parser.add_argument("--out-of-core", action="store_true",
+                        help="train from a memory-mapped copy of the CSV instead of "
+                             "loading it into memory")
+    parser.add_argument("--features", nargs="+", default=None, metavar="COL",
+                        help="extra input columns: raw CSV columns or indicator names "
+                             "from features.INDICATORS (raw columns only with "
+                             "--out-of-core)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always train instead of reusing a saved model")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue from the last checkpoint of this model")
+    parser.add_argument("--checkpoint-every", type=float, default=60.0, metavar="SECONDS",
+                        help="checkpoint interval within an epoch (0 = every batch)")
+    parser.add_argument("--no-checkpoint", action="store_true",
+                        help="train without saving checkpoints")
+    parser.add_argument("--model", default=None,
+                        help="registry key of a saved model (skips training)")
+
+
+def _result(args):
+    import core
+    from registry import ModelRegistry
+
+    registry = ModelRegistry()
+    # Out-of-core training memory-maps the CSV instead of loading it
+    out_of_core = getattr(args, "out_of_core", False)
+    df = None if out_of_core else core.load_data(args.csv, args.target,
+                                                 getattr(args, "date", None),
+                                                 getattr(args, "features", None))
+    if getattr(args, "model", None):
+        return df, core.load_result(registry, args.model, df)
+
+    def progress(pct):
+        print(f"\rtraining... {pct:3d}%", end="", file=sys.stderr, flush=True)
+
+    # The first Ctrl-C stops after the current batch with a checkpoint
+    # saved; a second one aborts
+    interrupted = []
+
+    def interrupt(signum, frame):
+        if interrupted:
+            raise KeyboardInterrupt
+        interrupted.append(signum)
+        print("\nstopping after this batch (Ctrl-C again to abort)", file=sys.stderr)
+
+    from checkpoint import CHECKPOINT_DIR
+
+    options = dict(
+        seq_length=args.seq_length,
+        test_size=args.test_size,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        shuffle_buffer=args.shuffle_buffer,
+        horizon=args.horizon,
+        units=args.units,
+        architecture=args.architecture,
+        layers=args.layers,
+        dropout=args.dropout,
+        learning_rate=args.learning_rate,
+        jit_compile=args.jit,
+        intra_op_threads=args.threads,
+        inter_op_threads=args.inter_op_threads,
+        mixed_precision=args.mixed_precision,
+        quantiles=args.quantiles,
+        registry=None if args.no_cache else registry,
+        on_progress=progress,
+        should_stop=lambda: bool(interrupted),
+        profile_dir=getattr(args, "profile_dir", None),
+        checkpoint_dir=None if args.no_checkpoint else CHECKPOINT_DIR,
+        resume=args.resume,
+        checkpoint_seconds=args.checkpoint_every
+    )
+    previous = signal.signal(signal.SIGINT, interrupt)
+    try:
+        if out_of_core:
+            def converting(rows, nbytes):
+                print(f"\rconverting... {rows:,} rows", end="", file=sys.stderr, flush=True)
+
+            result = core.train_out_of_core(args.csv, args.target,
+                                            feature_cols=args.features,
+                                            on_convert=converting, **options)
+        else:
+            result = core.train(df, args.target, feature_cols=args.features, **options)
+    finally:
+        signal.signal(signal.SIGINT, previous)
+    print(file=sys.stderr)
+    if result.get('stopped'):
+        print("training stopped; rerun with --resume to continue", file=sys.stderr)
+    return df, result
+
+
+def cmd_train(args):
+    _, result = _result(args)
+    if args.telemetry and result.get('telemetry') is not None:
+        for path in result['telemetry'].export(args.telemetry):
+            print(f"wrote {path}", file=sys.stderr)
+    history = result['history'].get('loss', [])
+    print(json.dumps({
+        'key': result['key'],
+        'cached': result.get('cached', False),
+        'epochs': len(history),
+        'final_loss': history[-1] if history else None,
+    }, indent=2))
+
+
+def cmd_evaluate(args):
+    import core
+
+    _, result = _result(args)
+    metrics = core.evaluate(result)
+    print(json.dumps({
+        'key': result['key'],
+        'mse': metrics['mse'],
+        'rmse': metrics['rmse'],
+        'mae': metrics['mae'],
+    }, indent=2))
+
+
+def _runtime_path(path):
+    import os
+
+    if not os.path.exists(path):
+        # A registry key
+        from registry import ModelRegistry
+        path = ModelRegistry().runtime_path(path)
+        if path is None:
+            raise SystemExit("no exported runtime for that key")
+    return path
+
+
+def _runtime_forecaster(path, tflite_path=None):
+    from runtime import ExportedForecaster
+
+    return ExportedForecaster.load(_runtime_path(path), tflite_path)
+
+
+def cmd_forecast(args):
+    import pandas as pd
+
+    intervals = None
+    if args.runtime:
+        # No TensorFlow or sklearn: the exported weights run in NumPy (or TFLite)
+        from data_loader import load_csv
+        cols = [args.target] + ([args.date] if args.date and args.date != args.target else [])
+        df = load_csv(args.csv, usecols=cols)
+        forecaster = _runtime_forecaster(args.runtime, args.tflite)
+        prices = forecaster.forecast(args.days, df[args.target].values)
+    else:
+        import core
+        df, result = _result(args)
+        series = None if df is None else df[args.target].values
+        prices = core.forecast(result, args.days, series=series)
+        if args.intervals:
+            intervals = core.forecast_intervals(result, args.days, series=series,
+                                                method=args.intervals,
+                                                samples=args.samples)
+    if args.date and df is not None:
+        last_date = pd.to_datetime(df[args.date].iloc[-1])
+        labels = [d.strftime('%Y-%m-%d')
+                  for d in pd.date_range(start=last_date, periods=args.days + 1)[1:]]
+    else:
+        labels = [f"Day {i + 1}" for i in range(args.days)]
+    if intervals is None:
+        print("date,prediction")
+        for label, price in zip(labels, prices):
+            print(f"{label},{price:.4f}")
+        return
+    print("date,prediction," + ",".join(f"q{q:g}" for q in intervals['quantiles']))
+    for i, (label, price) in enumerate(zip(labels, prices)):
+        print(f"{label},{price:.4f}," + ",".join(f"{band[i]:.4f}"
+                                                  for band in intervals['bands']))
+
+
+def cmd_export(args):
+    import core
+
+    _, result = _result(args)
+    core.export(result, args.output, tflite_path=args.tflite)
+    print(json.dumps({'key': result['key'], 'runtime': args.output,
+                      'tflite': args.tflite}, indent=2))
+
+
+def cmd_sweep(args):
+    import core
+    from sweep import DEFAULT_SPACE, grid_trials, random_trials
+
+    df = core.load_data(args.csv, args.target)
+    space = json.loads(args.space) if args.space else DEFAULT_SPACE
+    if args.random:
+        trials = random_trials(space, args.random, seed=args.seed)
+    else:
+        trials = grid_trials(space)
+
+    board = core.sweep(
+        df[args.target].values, trials,
+        n_workers=args.workers,
+        epochs=args.epochs,
+        on_result=lambda r: print(f"trial done: {r}", file=sys.stderr)
+    )
+    print(json.dumps(board, indent=2))
+
+
+def cmd_backtest(args):
+    import core
+
+    df = core.load_data(args.csv, args.target)
+    report = core.backtest(
+        df[args.target].values,
+        seq_length=args.seq_length,
+        n_folds=args.folds,
+        mode=args.mode,
+        n_workers=args.workers,
+        epochs=args.epochs,
+        units=args.units,
+        architecture=args.architecture,
+        on_result=lambda r: print(f"fold {r['fold']} done in {r.get('seconds', 0):.1f}s",
+                                  file=sys.stderr)
+    )
+    for fold in report['folds']:
+        for name in ('y_true', 'y_pred', 'last_seen'):
+            fold.pop(name, None)
+    print(json.dumps(report, indent=2))
+
+
+def cmd_ensemble(args):
+    import core
+
+    df = core.load_data(args.csv, args.target)
+    result = core.ensemble(
+        df, args.target,
+        n_members=args.members,
+        architectures=args.architectures,
+        method=args.method,
+        seed=args.seed,
+        val_size=args.val_size,
+        n_workers=args.workers,
+        seq_length=args.seq_length,
+        test_size=args.test_size,
+        epochs=args.epochs,
+        units=args.units,
+        layers=args.layers,
+        on_result=lambda r: print(f"member {r['member']} done in {r.get('seconds', 0):.1f}s",
+                                  file=sys.stderr)
+    )
+    report = dict(result['ensemble'], key=result['key'])
+    if args.days:
+        report['forecast'] = core.forecast(result, args.days).tolist()
+    print(json.dumps(report, indent=2))
+
+
+def cmd_multi(args):
+    import os
+    from multi_asset import forecast_all, from_long_frame, load_directory, train_multi_asset
+
+    if os.path.isdir(args.source):
+        series = load_directory(args.source, args.target)
+    else:
+        from data_loader import load_csv
+        cols = [args.ticker_col, args.target] + ([args.date] if args.date else [])
+        series = from_long_frame(load_csv(args.source, usecols=cols),
+                                 args.ticker_col, args.target, args.date)
+
+    result = train_multi_asset(
+        series,
+        seq_length=args.seq_length,
+        test_size=args.test_size,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        embedding_dim=args.embedding_dim,
+        units=args.units,
+        on_progress=lambda pct: print(f"\rtraining... {pct:3d}%", end="",
+                                      file=sys.stderr, flush=True)
+    )
+    print(file=sys.stderr)
+    forecasts = forecast_all(result, args.days)
+    print("ticker," + ",".join(f"day{i + 1}" for i in range(args.days)))
+    for name, prices in forecasts.items():
+        print(name + "," + ",".join(f"{p:.4f}" for p in prices))
+
+
+def cmd_stream(args):
+    import stream
+
+    if args.replay:
+        source = stream.replay_csv(args.replay, args.target, args.date, args.speed)
+    elif args.tail:
+        source = stream.tail_file(args.tail, from_start=args.from_start)
+    else:
+        source = stream.socket_source(args.connect)
+
+    forecaster = stream.StreamingForecaster.from_runtime(_runtime_path(args.runtime),
+                                                         args.tflite, days=args.days,
+                                                         warm=args.warm)
+
+    def show(update):
+        sys.stdout.write(f"{update['time']:.3f},{update['close']:.4f},"
+                         + ",".join(f"{p:.4f}" for p in update['forecast']) + "\n")
+
+    feed = stream.PriceStream(source, forecaster, bar_seconds=args.bar_seconds,
+                              conflate=not args.every_bar,
+                              on_forecast=None if args.quiet else show)
+    if not args.quiet:
+        print("time,close," + ",".join(f"day{i + 1}" for i in range(args.days)))
+    try:
+        stats = feed.run(max_bars=args.max_bars)
+    except KeyboardInterrupt:
+        feed.stop()
+        stats = feed.stats()
+    sys.stdout.flush()
+    print(json.dumps(stats, indent=2), file=sys.stderr)
+
+
+def cmd_serve(args):
+    from server import serve
+
+    print(f"serving on {args.unix or f'http://{args.host}:{args.port}'}", file=sys.stderr)
+    serve(host=args.host, port=args.port, unix_socket=args.unix,
+          max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000.0,
+          preload=args.preload)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="stock-predict",
+        description="Train, evaluate and forecast LSTM price models without the GUI."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train = commands.add_parser("train", help="train (or reuse) a model and save it")
+    _add_data_args(train)
+    _add_model_args(train)
+    train.add_argument("--telemetry", default=None, metavar="PATH",
+                       help="write the per-epoch/per-batch trace (.json or .csv)")
+    train.add_argument("--profile-dir", default=None,
+                       help="capture a TensorFlow profiler trace of a few batches here")
+    train.set_defaults(func=cmd_train)
+
+    evaluate = commands.add_parser("evaluate", help="report MSE/RMSE/MAE on the test split")
+    _add_data_args(evaluate)
+    _add_model_args(evaluate)
+    evaluate.set_defaults(func=cmd_evaluate)
+
+    forecast = commands.add_parser("forecast", help="forecast future prices as CSV")
+    _add_data_args(forecast)
+    _add_model_args(forecast)
+    forecast.add_argument("--days", type=int, default=30)
+    forecast.add_argument("--intervals", choices=("mc", "quantile"), default=None,
+                          help="add prediction intervals from Monte-Carlo dropout "
+                               "or the quantile head")
+    forecast.add_argument("--samples", type=int, default=100,
+                          help="Monte-Carlo dropout samples (default 100)")
+    forecast.add_argument("--runtime", default=None, metavar="NPZ_OR_KEY",
+                          help="forecast with an exported model, without TensorFlow")
+    forecast.add_argument("--tflite", default=None,
+                          help="with --runtime, run this .tflite file instead of NumPy")
+    forecast.set_defaults(func=cmd_forecast)
+
+    export = commands.add_parser("export", help="export a model for the lightweight runtime")
+    _add_data_args(export)
+    _add_model_args(export)
+    export.add_argument("output", help="destination .npz")
+    export.add_argument("--tflite", default=None, help="also write a TFLite model here")
+    export.set_defaults(func=cmd_export)
+
+    sweep = commands.add_parser("sweep", help="run a parallel hyperparameter sweep")
+    _add_data_args(sweep)
+    sweep.add_argument("--space", default=None,
+                       help='JSON search space, e.g. \'{"seq_length": [30, 60], ...}\'')
+    sweep.add_argument("--random", type=int, default=0, metavar="N",
+                       help="sample N random trials instead of the full grid")
+    sweep.add_argument("--seed", type=int, default=None)
+    sweep.add_argument("--workers", type=int, default=None)
+    sweep.add_argument("--epochs", type=int, default=20)
+    sweep.set_defaults(func=cmd_sweep)
+
+    backtest = commands.add_parser("backtest", help="walk-forward backtest with "
+                                                    "parallel folds")
+    _add_data_args(backtest)
+    backtest.add_argument("--folds", type=int, default=5)
+    backtest.add_argument("--mode", choices=("expanding", "sliding"), default="expanding",
+                          help="grow the training window or slide a fixed-size one")
+    backtest.add_argument("--seq-length", type=int, default=60)
+    backtest.add_argument("--units", type=int, default=50)
+    backtest.add_argument("--architecture", type=_registered('ARCHITECTURES'),
+                          default="lstm")
+    backtest.add_argument("--epochs", type=int, default=20)
+    backtest.add_argument("--workers", type=int, default=None)
+    backtest.set_defaults(func=cmd_backtest)
+
+    ens = commands.add_parser("ensemble", help="train models in parallel and combine "
+                                               "their forecasts")
+    _add_data_args(ens)
+    ens.add_argument("--members", type=int, default=5)
+    ens.add_argument("--architectures", type=_registered('ARCHITECTURES'), nargs="+",
+                     default=["lstm"],
+                     help="cycled over the members, which also differ by seed")
+    ens.add_argument("--method", type=_registered('ENSEMBLE_METHODS'), default="mean",
+                     help="weighted = inverse validation error")
+    ens.add_argument("--seed", type=int, default=0)
+    ens.add_argument("--val-size", type=float, default=0.1,
+                     help="share of windows before the test split used for weighting")
+    ens.add_argument("--seq-length", type=int, default=60)
+    ens.add_argument("--test-size", type=float, default=0.2)
+    ens.add_argument("--units", type=int, default=50)
+    ens.add_argument("--layers", type=int, default=2)
+    ens.add_argument("--epochs", type=int, default=20)
+    ens.add_argument("--workers", type=int, default=None)
+    ens.add_argument("--days", type=int, default=0, help="also forecast this many days")
+    ens.set_defaults(func=cmd_ensemble)
+
+    multi = commands.add_parser("multi", help="train one model over many tickers "
+                                              "and forecast all of them")
+    multi.add_argument("source", help="directory of per-ticker CSVs, or one long-format CSV")
+    multi.add_argument("--target", default="Close")
+    multi.add_argument("--ticker-col", default="ticker",
+                       help="ticker column of a long-format CSV")
+    multi.add_argument("--date", default=None, help="date column used to order rows")
+    multi.add_argument("--seq-length", type=int, default=60)
+    multi.add_argument("--test-size", type=float, default=0.2)
+    multi.add_argument("--epochs", type=int, default=50)
+    multi.add_argument("--batch-size", type=int, default=256)
+    multi.add_argument("--units", type=int, default=50)
+    multi.add_argument("--embedding-dim", type=int, default=8,
+                       help="size of the learned series embedding (0 disables it)")
+    multi.add_argument("--days", type=int, default=30)
+    multi.set_defaults(func=cmd_multi)
+
+    live = commands.add_parser("stream", help="forecast continuously from a live price feed")
+    live.add_argument("runtime", metavar="NPZ_OR_KEY",
+                      help="exported runtime (.npz) or registry key")
+    feed = live.add_mutually_exclusive_group(required=True)
+    feed.add_argument("--replay", metavar="CSV", help="replay a CSV as a feed")
+    feed.add_argument("--tail", metavar="FILE", help="follow ticks appended to a file")
+    feed.add_argument("--connect", metavar="HOST:PORT_OR_SOCKET",
+                      help="read newline-delimited ticks from a socket")
+    live.add_argument("--target", default="Close", help="price column of --replay")
+    live.add_argument("--date", default=None, help="date column that paces --replay")
+    live.add_argument("--speed", type=float, default=1.0,
+                      help="--replay speed multiplier (0 = as fast as possible)")
+    live.add_argument("--from-start", action="store_true",
+                      help="with --tail, read the existing lines first")
+    live.add_argument("--bar-seconds", type=float, default=0.0,
+                      help="aggregate ticks into bars of this length (0 = one bar per tick)")
+    live.add_argument("--days", type=int, default=1, help="bars to forecast ahead")
+    live.add_argument("--tflite", default=None, help="run this .tflite file instead of NumPy")
+    live.add_argument("--warm", action="store_true",
+                      help="start from the model's saved tail instead of waiting "
+                           "for seq_length bars")
+    live.add_argument("--every-bar", action="store_true",
+                      help="forecast every bar even when the feed outpaces the model")
+    live.add_argument("--max-bars", type=int, default=None)
+    live.add_argument("--quiet", action="store_true", help="only print the final stats")
+    live.set_defaults(func=cmd_stream)
+
+    serve = commands.add_parser("serve", help="serve saved models over HTTP")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--unix", default=None, help="listen on a Unix socket instead")
+    serve.add_argument("--max-batch", type=int, default=64)
+    serve.add_argument("--max-wait-ms", type=float, default=2.0,
+                       help="how long a request may wait to be batched")
+    serve.add_argument("--preload", nargs="*", default=[], metavar="KEY",
+                       help="registry keys to load at startup")
+    serve.set_defaults(func=cmd_serve)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,861 @@
+import copy
+import os
+import time
+import numpy as np
+from preprocessor import DataPreprocessor
+from windows import SequenceWindows
+from registry import model_key
+from telemetry import TrainingTelemetry
+
+# Pure-Python training, evaluation and forecasting API shared by the GUI
+# tabs and the command line. TensorFlow is imported only by the functions
+# that need it.
+
+def architectures():
+    # Names registered in model_builder, in registration order
+    from model_builder import ARCHITECTURES
+    return tuple(ARCHITECTURES)
+
+
+def load_data(path, target_col, date_col=None, feature_cols=None):
+    # Only the columns the model reads: the target, the date and the raw
+    # columns behind feature_cols (indicators are computed from the target,
+    # volume_z also from the volume column)
+    from data_loader import load_csv, read_header
+    from features import INDICATORS
+
+    feature_cols = list(feature_cols or [])
+    cols = [target_col] + ([date_col] if date_col and date_col != target_col else [])
+    raw = [c for c in feature_cols if c not in INDICATORS]
+    if 'volume_z' in feature_cols:
+        raw += [c for c in read_header(path) if c in ('Volume', 'volume')][:1]
+    return load_csv(path, usecols=list(dict.fromkeys(cols + raw)))
+
+
+class TrainingJob:
+    def __init__(self, df, target_col, seq_length=60, test_size=0.2, epochs=50,
+                 batch_size=32, shuffle_buffer=1000, cache=False, streaming=True,
+                 horizon=1, units=50, feature_cols=None, registry=None, base_result=None,
+                 finetune_epochs=3, range_policy='keep', on_progress=None,
+                 should_stop=None, on_epoch=None, on_batch=None, profile_dir=None,
+                 architecture='lstm', layers=2, dropout=0.2, learning_rate=0.001,
+                 jit_compile=False, intra_op_threads=0, inter_op_threads=0,
+                 mixed_precision=False, quantiles=None, checkpoint_dir=None,
+                 resume=False, checkpoint_seconds=60.0, seed=None):
+        self.df = df
+        self.target_col = target_col
+        self.seq_length = seq_length
+        self.test_size = test_size
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.shuffle_buffer = shuffle_buffer
+        self.cache = cache
+        self.streaming = streaming
+        self.horizon = horizon
+        self.units = units
+        self.feature_cols = list(feature_cols or [])
+        self.registry = registry
+        self.base_result = base_result
+        self.finetune_epochs = finetune_epochs
+        self.range_policy = range_policy
+        self.on_progress = on_progress
+        self.should_stop = should_stop
+        self.on_epoch = on_epoch
+        self.on_batch = on_batch
+        self.profile_dir = profile_dir
+        self.architecture = architecture
+        self.layers = layers
+        self.dropout = dropout
+        self.learning_rate = learning_rate
+        self.jit_compile = jit_compile
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.mixed_precision = mixed_precision
+        self.quantiles = sorted(quantiles) if quantiles else None
+        self.checkpoint_dir = checkpoint_dir
+        self.resume = resume
+        self.checkpoint_seconds = checkpoint_seconds
+        self.seed = seed
+        self.telemetry = TrainingTelemetry()
+
+    def model_config(self):
+        config = {
+            'architecture': self.architecture,
+            'seq_length': self.seq_length,
+            'test_size': self.test_size,
+            'horizon': self.horizon,
+            'units': self.units,
+            'layers': self.layers,
+            'dropout': self.dropout,
+            'learning_rate': self.learning_rate,
+            'features': self.feature_cols,
+            'scaling': 'train',
+        }
+        # Only models with a quantile head carry the key, so earlier
+        # registry entries stay valid
+        if self.quantiles:
+            config['quantiles'] = self.quantiles
+        if self.seed is not None:
+            config['seed'] = self.seed
+        return config
+
+    def stopped(self):
+        return self.should_stop is not None and self.should_stop()
+
+    def report(self, progress):
+        if self.on_progress is not None:
+            self.on_progress(progress)
+
+    def run(self):
+        import tensorflow as tf
+        from model_builder import ModelBuilder, configure_threads
+
+        configure_threads(self.intra_op_threads, self.inter_op_threads)
+
+        # Fine-tune the previous model when the data only grew at the end
+        if self.base_result is not None:
+            result = self._update_incrementally()
+            if result is not None:
+                return result
+
+        # Preprocess data
+        series = self.df[self.target_col].values
+        preprocessor = DataPreprocessor(self.target_col, self.seq_length,
+                                        self.feature_cols)
+        X, y, scaler = preprocessor.preprocess(self.df, materialize=False,
+                                               test_size=self.test_size,
+                                               horizon=self.horizon)
+
+        # Split data; every target of a training window lies in the rows
+        # the scaler was fitted on
+        split_idx = int(preprocessor.n_windows(len(series), self.horizon)
+                        * (1 - self.test_size))
+        X_train, X_test = X[:split_idx], X[split_idx:]
+        y_train, y_test = y[:split_idx], y[split_idx:]
+
+        # Reuse a model trained on the same series and configuration
+        key = model_key(series, self.model_config())
+        if self.registry is not None and self.registry.contains(key):
+            entry = self.registry.load(key)
+            preprocessor = entry['preprocessor']
+            preprocessor.attach(self.df)
+            X_test = SequenceWindows(preprocessor.scaled_data, self.seq_length)[split_idx:]
+            y_test = X_test.target_matrix()
+            self.report(100)
+            return {
+                'model': entry['model'],
+                'quantile_model': entry.get('quantile_model'),
+                'quantiles': self.quantiles,
+                'preprocessor': preprocessor,
+                'X_test': X_test.materialize(),
+                'y_test': y_test.copy(),
+                'history': entry['metadata']['history'],
+                'series': series.copy(),
+                'key': key,
+                'config': self.model_config(),
+                'cached': True,
+                'telemetry': self.telemetry
+            }
+
+        # Build model
+        if self.seed is not None:
+            tf.keras.utils.set_random_seed(self.seed)
+        model = ModelBuilder.build(
+            self.architecture,
+            (X.shape[1], X.shape[2]),
+            horizon=self.horizon,
+            units=(self.units,) * self.layers,
+            dropout=self.dropout,
+            learning_rate=self.learning_rate,
+            jit_compile=self.jit_compile,
+            mixed_precision=self.mixed_precision
+        )
+        checkpoint, epoch, batch = self._open_checkpoint(key, model)
+
+        # Create dataset; a resumed run starts at the order of the first
+        # epoch it trains on
+        samples = len(X_train.target_view(self.horizon))
+        steps = -(-samples // self.batch_size)
+        train_dataset = self._make_dataset(X_train, seed=self._seed(key),
+                                           first_epoch=epoch + 1 if batch >= steps else epoch)
+
+        # Callbacks
+        callbacks = [
+            tf.keras.callbacks.EarlyStopping(
+                monitor='loss',
+                patience=5,
+                restore_best_weights=True
+            ),
+            self._create_progress_callback(self.epochs),
+            self._create_telemetry_callback(samples)
+        ]
+
+        # Train; the rest of an interrupted epoch skips the batches it saw
+        start = time.time()
+        history, stopped = self._fit(model, train_dataset, callbacks, steps, checkpoint,
+                                     epoch, batch, train_dataset.skip)
+
+        quantile_model = None
+        if self.quantiles and not stopped:
+            quantile_model = self._fit_quantile_head(model, X_train)
+
+        if self.registry is not None and not stopped:
+            self.registry.save(key, model, preprocessor, {
+                'config': self.model_config(),
+                'target_col': self.target_col,
+                'history': history,
+                'train_seconds': time.time() - start
+            }, quantile_model=quantile_model)
+
+        return {
+            'model': model,
+            'quantile_model': quantile_model,
+            'quantiles': self.quantiles,
+            'preprocessor': preprocessor,
+            'X_test': X_test.materialize(),
+            'y_test': y_test.copy(),
+            'history': history,
+            'series': series.copy(),
+            'key': key,
+            'config': self.model_config(),
+            'cached': False,
+            'stopped': stopped,
+            'telemetry': self.telemetry
+        }
+
+    def _make_dataset(self, windows, seed=None, first_epoch=0):
+        import tensorflow as tf
+        from datasets import seeded_order, window_dataset
+
+        if self.streaming:
+            return window_dataset(
+                windows,
+                batch_size=self.batch_size,
+                shuffle_buffer=self.shuffle_buffer,
+                cache=self.cache,
+                horizon=self.horizon,
+                seed=seed,
+                first_epoch=first_epoch
+            )
+
+        targets = windows.target_matrix(self.horizon)
+        if self.shuffle_buffer and seed is not None:
+            X = tf.constant(windows[:len(targets)].materialize())
+            y = tf.constant(targets)
+            dataset = seeded_order(0, len(targets), seed, first_epoch,
+                                   self.shuffle_buffer).batch(self.batch_size)
+            return dataset.map(lambda idx: (tf.gather(X, idx), tf.gather(y, idx))).prefetch(
+                tf.data.AUTOTUNE)
+
+        dataset = tf.data.Dataset.from_tensor_slices(
+            (windows[:len(targets)].materialize(), targets)
+        )
+        if self.cache:
+            dataset = dataset.cache()
+        if self.shuffle_buffer:
+            dataset = dataset.shuffle(self.shuffle_buffer, seed=seed)
+        return dataset.batch(self.batch_size).prefetch(tf.data.AUTOTUNE)
+
+    def _seed(self, key):
+        # Checkpointed runs shuffle with a seed taken from the model key, so
+        # a resumed run draws the same orders as the one it continues. The
+        # seeded order keeps the shuffle buffer and window cache settings.
+        if self.seed is not None:
+            return self.seed
+        return int(key[:8], 16) if self.checkpoint_dir else None
+
+    def _open_checkpoint(self, key, model):
+        # (checkpoint, epoch, batch) to train from. Without resume any
+        # earlier checkpoint of this model is discarded.
+        if not self.checkpoint_dir:
+            return None, 0, 0
+        from checkpoint import TrainingCheckpoint
+
+        checkpoint = TrainingCheckpoint(os.path.join(self.checkpoint_dir, key), model,
+                                        every_seconds=self.checkpoint_seconds,
+                                        fresh=not self.resume)
+        epoch, batch = checkpoint.restore()
+        return checkpoint, epoch, batch
+
+    def _fit(self, model, dataset, callbacks, steps, checkpoint=None, epoch=0, batch=0,
+             remainder=None):
+        # Trains epochs [epoch, self.epochs). An epoch that was cut short is
+        # finished first from remainder(batch), the dataset without the
+        # batches already trained on. Returns (history, stopped); the
+        # checkpoint is kept when stopped, and its history covers every
+        # session of a resumed run.
+        if batch >= steps:
+            epoch, batch = epoch + 1, 0
+        runs = []
+        if batch and epoch < self.epochs:
+            runs.append((remainder(batch), epoch, epoch + 1, batch))
+            epoch += 1
+        runs.append((dataset, epoch, self.epochs, 0))
+
+        history = {}
+        for data, first, last, skip in runs:
+            if first >= last or self.stopped():
+                continue
+            extra = [checkpoint.callback(first, skip, steps)] if checkpoint else []
+            logs = model.fit(
+                self.telemetry.timed(data),
+                initial_epoch=first,
+                epochs=last,
+                callbacks=extra + callbacks,
+                verbose=0
+            ).history
+            for name, values in logs.items():
+                history.setdefault(name, []).extend(values)
+
+        stopped = self.stopped()
+        if checkpoint is not None:
+            history = dict(checkpoint.history)
+            if not stopped:
+                checkpoint.clear()
+        return history, stopped
+
+    def _fit_quantile_head(self, model, windows):
+        import tensorflow as tf
+        from datasets import window_dataset
+        from model_builder import ModelBuilder
+
+        # The trained encoder is run once over the training windows; only
+        # the new output layer is fitted, on those cached features. A single
+        # linear layer is cheap per epoch, so it gets larger batches, a
+        # higher learning rate and at least 50 epochs.
+        quantile_model, head, extract = ModelBuilder.build_quantile_head(
+            model, self.quantiles, learning_rate=self.learning_rate * 10)
+        features, targets = [], []
+        for x, y in window_dataset(windows, batch_size=1024, shuffle_buffer=0,
+                                   horizon=self.horizon):
+            features.append(extract(x, training=False).numpy())
+            targets.append(y.numpy())
+        head.fit(
+            np.concatenate(features), np.concatenate(targets),
+            epochs=max(self.epochs, 50),
+            batch_size=max(self.batch_size, 256),
+            callbacks=[tf.keras.callbacks.EarlyStopping(
+                monitor='loss', patience=5, restore_best_weights=True)],
+            verbose=0
+        )
+        return quantile_model
+
+    def _update_incrementally(self):
+        base = self.base_result
+        old = base['series']
+        new = self.df[self.target_col].values
+        if len(new) <= len(old) or not np.array_equal(new[:len(old)], old):
+            return None
+        # Indicator features depend on history, and a quantile head is fitted
+        # on the final encoder; those models retrain fully
+        if (self.feature_cols or base['preprocessor'].feature_cols or self.quantiles
+                or base.get('quantile_model') is not None):
+            return None
+
+        # Keep the fitted scaler; only rescale everything if the tail leaves
+        # the fitted range and the caller asked for the range to grow
+        old_preprocessor = base['preprocessor']
+        scaler = old_preprocessor.scaler
+        tail = new[len(old):].reshape(-1, 1)
+        out_of_range = (tail.min() < scaler.data_min_[0] or
+                        tail.max() > scaler.data_max_[0])
+        if out_of_range and self.range_policy == 'extend':
+            scaler = copy.deepcopy(scaler)
+            scaler.partial_fit(tail)
+            scaled = scaler.transform(new.reshape(-1, 1))
+        else:
+            scaled = np.concatenate([old_preprocessor.scaled_data,
+                                     scaler.transform(tail)])
+
+        seq_length = old_preprocessor.seq_length
+        preprocessor = DataPreprocessor(old_preprocessor.target_col, seq_length)
+        preprocessor.scaler = scaler
+        preprocessor.attach(new, scaled)
+        windows = SequenceWindows(scaled, seq_length)
+
+        # Only windows whose target is a new row are trained on. A copy of
+        # the base model is tuned so the base result stays as it was.
+        model = self._clone_model(base['model'])
+        horizon = model.output_shape[-1]
+        self.horizon = horizon
+        self.seq_length = seq_length
+        new_windows = windows[max(len(old) - seq_length, 0):]
+        history = {}
+        start = time.time()
+        if len(new_windows.target_view(horizon)):
+            dataset = self._make_dataset(new_windows)
+            history = model.fit(
+                self.telemetry.timed(dataset),
+                epochs=self.finetune_epochs,
+                callbacks=[self._create_progress_callback(self.finetune_epochs),
+                           self._create_telemetry_callback(
+                               len(new_windows.target_view(horizon)))],
+                verbose=0
+            ).history
+        stopped = self.stopped()
+        self.report(100)
+
+        split_idx = int(preprocessor.n_windows(len(new), horizon) * (1 - self.test_size))
+        X_test = windows[split_idx:]
+        # Keyed by the base model's configuration and marked incremental, so
+        # a full retrain on the same data never picks up the tuned model
+        config = dict(base.get('config') or self.model_config(),
+                      seq_length=seq_length, horizon=horizon,
+                      incremental=True, base_key=base.get('key'))
+        key = model_key(new, config)
+        if self.registry is not None and not stopped:
+            self.registry.save(key, model, preprocessor, {
+                'config': config,
+                'target_col': preprocessor.target_col,
+                'history': history,
+                'train_seconds': time.time() - start,
+                'base_key': base.get('key'),
+                'scaler_extended': bool(out_of_range and self.range_policy == 'extend')
+            })
+
+        return {
+            'model': model,
+            'preprocessor': preprocessor,
+            'X_test': X_test.materialize(),
+            'y_test': X_test.targets.copy(),
+            'history': history,
+            'series': new.copy(),
+            'key': key,
+            'config': config,
+            'cached': False,
+            'stopped': stopped,
+            'incremental': True,
+            'telemetry': self.telemetry
+        }
+
+    @staticmethod
+    def _clone_model(model):
+        # Same architecture, weights and compile settings; fresh optimizer
+        # slots, which fine-tuning starts from anyway
+        import tensorflow as tf
+
+        clone = tf.keras.models.clone_model(model)
+        clone.set_weights(model.get_weights())
+        clone.compile(optimizer=model.optimizer.__class__.from_config(
+                          model.optimizer.get_config()),
+                      loss=model.loss, jit_compile=model.jit_compile)
+        return clone
+
+    def _create_progress_callback(self, epochs):
+        import tensorflow as tf
+
+        class ProgressCallback(tf.keras.callbacks.Callback):
+            def __init__(self, job, epochs):
+                super().__init__()
+                self.job = job
+                self.epochs = epochs
+
+            def on_train_batch_end(self, batch, logs=None):
+                # Keras checks stop_training after every batch, so a stop
+                # request lands within one step rather than one epoch
+                if self.job.stopped():
+                    self.model.stop_training = True
+
+            def on_epoch_end(self, epoch, logs=None):
+                if self.job.stopped():
+                    self.model.stop_training = True
+                self.job.report(int((epoch + 1) / self.epochs * 100))
+
+            def on_train_end(self, logs=None):
+                # EarlyStopping may end the run before the last epoch
+                self.job.report(100)
+
+        return ProgressCallback(self, epochs)
+
+    def _create_telemetry_callback(self, samples):
+        return self.telemetry.callback(
+            samples=samples,
+            batch_size=self.batch_size,
+            on_epoch=self.on_epoch,
+            on_batch=self.on_batch,
+            profile_dir=self.profile_dir
+        )
+
+
+class OutOfCoreJob(TrainingJob):
+    # Trains from a CSV converted to a memory-mapped .npy. Batches are read
+    # and scaled straight from the mmap, so memory stays flat however long
+    # the series is. Feature columns must be raw columns of the CSV.
+
+    def __init__(self, path, target_col, on_convert=None, **options):
+        from features import INDICATORS
+
+        super().__init__(None, target_col, **options)
+        if self.quantiles:
+            raise ValueError("quantile heads need in-memory training data")
+        indicators = [c for c in self.feature_cols if c in INDICATORS]
+        if indicators:
+            raise ValueError(f"indicators ({', '.join(indicators)}) need in-memory "
+                             f"training data")
+        self.path = path
+        self.on_convert = on_convert
+
+    def run(self):
+        import tensorflow as tf
+        from datasets import memmap_dataset, memmap_steps
+        from memmap_store import MemmapSeries
+        from model_builder import ModelBuilder, configure_threads
+
+        configure_threads(self.intra_op_threads, self.inter_op_threads)
+
+        store = MemmapSeries.from_csv(self.path, [self.target_col] + self.feature_cols,
+                                      on_progress=self.on_convert)
+        data = store.data
+        seq_length = self.seq_length
+        preprocessor = DataPreprocessor(self.target_col, seq_length, self.feature_cols)
+        n_windows = preprocessor.n_windows(len(data), self.horizon)
+        if n_windows < 2:
+            raise ValueError(f"{len(data)} rows are too few for seq_length {seq_length}")
+        split_idx = int(n_windows * (1 - self.test_size))
+
+        # Scaling statistics come from a chunked scan of the training rows
+        fit_rows = preprocessor.fit_rows(len(data), self.test_size, self.horizon)
+        low, high = store.column_range(fit_rows)
+        preprocessor.fit_range(low, high, fit_rows)
+        # Only the tail is kept in memory, for forecasting
+        preprocessor.attach(np.asarray(data[-seq_length:], dtype=np.float64))
+        preprocessor.n_rows = len(data)
+
+        series = data[:, 0]
+        key = model_key(series, self.model_config())
+        if self.registry is not None and self.registry.contains(key):
+            entry = self.registry.load(key)
+            self.report(100)
+            return self._result(entry['model'], entry['preprocessor'], data, split_idx,
+                                entry['metadata']['history'], key, cached=True)
+
+        if self.seed is not None:
+            tf.keras.utils.set_random_seed(self.seed)
+        model = ModelBuilder.build(
+            self.architecture,
+            (seq_length, data.shape[1]),
+            horizon=self.horizon,
+            units=(self.units,) * self.layers,
+            dropout=self.dropout,
+            learning_rate=self.learning_rate,
+            jit_compile=self.jit_compile,
+            mixed_precision=self.mixed_precision
+        )
+        checkpoint, epoch, batch = self._open_checkpoint(key, model)
+        steps = memmap_steps(split_idx, self.batch_size)
+
+        # Seeded epochs are replayed exactly: an interrupted epoch resumes
+        # with the same order, skipping the batches it already trained on
+        def dataset(first_epoch, skip_batches=0):
+            return memmap_dataset(data, seq_length, *self._scaling(preprocessor),
+                                  stop=split_idx, batch_size=self.batch_size,
+                                  horizon=self.horizon, seed=self._seed(key),
+                                  first_epoch=first_epoch, skip_batches=skip_batches)
+
+        if batch >= steps:
+            epoch, batch = epoch + 1, 0
+        train_dataset = dataset(epoch + 1 if batch else epoch)
+        callbacks = [
+            tf.keras.callbacks.EarlyStopping(
+                monitor='loss',
+                patience=5,
+                restore_best_weights=True
+            ),
+            self._create_progress_callback(self.epochs),
+            self._create_telemetry_callback(split_idx)
+        ]
+
+        start = time.time()
+        history, stopped = self._fit(model, train_dataset, callbacks, steps, checkpoint,
+                                     epoch, batch, lambda skip: dataset(epoch, skip))
+
+        if self.registry is not None and not stopped:
+            self.registry.save(key, model, preprocessor, {
+                'config': self.model_config(),
+                'target_col': self.target_col,
+                'history': history,
+                'train_seconds': time.time() - start,
+                'source': store.path
+            })
+        return self._result(model, preprocessor, data, split_idx, history, key,
+                            stopped=stopped)
+
+    @staticmethod
+    def _scaling(preprocessor):
+        # (offset, scale) per column for scaling batches on the fly
+        scaler = preprocessor.feature_scaler or preprocessor.scaler
+        return scaler.data_min_, scaler.scale_
+
+    def _result(self, model, preprocessor, data, split_idx, history, key, cached=False,
+                stopped=False):
+        from datasets import memmap_dataset
+
+        # Test windows are streamed from the mmap on evaluation rather than
+        # materialized here
+        test_dataset = memmap_dataset(data, self.seq_length, *self._scaling(preprocessor),
+                                      start=split_idx, batch_size=1024,
+                                      horizon=self.horizon, shuffle=False)
+        return {
+            'model': model,
+            'preprocessor': preprocessor,
+            'test_dataset': test_dataset,
+            'history': history,
+            'series': data[:, 0],
+            'key': key,
+            'cached': cached,
+            'stopped': stopped,
+            'out_of_core': True,
+            'horizon': self.horizon,
+            'telemetry': self.telemetry
+        }
+
+
+def train(df, target_col, **options):
+    return TrainingJob(df, target_col, **options).run()
+
+
+def train_out_of_core(path, target_col, **options):
+    return OutOfCoreJob(path, target_col, **options).run()
+
+
+def load_result(registry, key, df=None):
+    # Rebuild a training result from a registry entry; with data, the test
+    # windows are recreated using the saved scaler
+    entry = registry.load(key)
+    preprocessor = entry['preprocessor']
+    config = entry['metadata'].get('config', {})
+    result = {
+        'model': entry['model'],
+        'quantile_model': entry.get('quantile_model'),
+        'quantiles': config.get('quantiles'),
+        'preprocessor': preprocessor,
+        'history': entry['metadata'].get('history', {}),
+        'key': key,
+        'config': config,
+        'cached': True
+    }
+    if df is not None:
+        series = df[preprocessor.target_col].values
+        preprocessor.attach(df)
+        windows = SequenceWindows(preprocessor.scaled_data, preprocessor.seq_length)
+        n_windows = preprocessor.n_windows(len(series), config.get('horizon', 1))
+        X_test = windows[int(n_windows * (1 - config.get('test_size', 0.2))):]
+        result.update({
+            'X_test': X_test.materialize(),
+            'y_test': X_test.target_matrix().copy(),
+            'series': series.copy()
+        })
+    return result
+
+
+def evaluate(result):
+    model = result['model']
+    scaler = result['preprocessor'].scaler
+
+    # Make predictions (first step of multi-horizon heads); out-of-core
+    # results stream their test windows batch by batch
+    if 'X_test' in result:
+        y_pred = model.predict(result['X_test'], verbose=0)[:, :1]
+        y_test = result['y_test']
+    else:
+        y_pred, y_test = [], []
+        for x, y in result['test_dataset']:
+            y_pred.append(model(x, training=False).numpy()[:, :1])
+            y_test.append(y.numpy()[:, :1])
+        y_pred, y_test = np.concatenate(y_pred), np.concatenate(y_test)
+
+    # Inverse transform
+    y_true = scaler.inverse_transform(y_test.reshape(-1, 1)).flatten()
+    y_pred = scaler.inverse_transform(y_pred).flatten()
+
+    mse = float(np.mean((y_true - y_pred) ** 2))
+    return {
+        'mse': mse,
+        'rmse': float(np.sqrt(mse)),
+        'mae': float(np.mean(np.abs(y_true - y_pred))),
+        'y_true': y_true,
+        'y_pred': y_pred
+    }
+
+
+def forecast(result, days, series=None):
+    from forecaster import RecursiveForecaster
+
+    preprocessor = result['preprocessor']
+    seq_length = preprocessor.seq_length
+
+    # Cached scaled tail; rows appended to series since training are
+    # scaled on the way in
+    scaled_seq = preprocessor.last_window(series)
+
+    forecaster = result.get('forecaster')
+    if forecaster is None:
+        forecaster = RecursiveForecaster(result['model'], seq_length,
+                                         n_features=preprocessor.n_features)
+        result['forecaster'] = forecaster
+    predictions = forecaster.forecast(scaled_seq, days)
+
+    return preprocessor.scaler.inverse_transform(
+        np.asarray(predictions).reshape(-1, 1)
+    ).flatten()
+
+
+def forecast_intervals(result, days, series=None, method='mc', samples=100,
+                       quantiles=(0.05, 0.5, 0.95)):
+    # Prediction bands in price space: {'quantiles': [...], 'bands':
+    # (n_quantiles, days)}. 'mc' takes quantiles of Monte-Carlo dropout
+    # paths; 'quantile' uses the model's quantile head and its own levels.
+    from forecaster import MonteCarloForecaster, QuantileForecaster
+
+    preprocessor = result['preprocessor']
+    scaled_seq = preprocessor.last_window(series)
+
+    if method == 'quantile':
+        if result.get('quantile_model') is None:
+            raise ValueError("this model was trained without a quantile head")
+        forecaster = result.get('quantile_forecaster')
+        if forecaster is None:
+            forecaster = QuantileForecaster(result['quantile_model'],
+                                            preprocessor.seq_length,
+                                            result['quantiles'],
+                                            n_features=preprocessor.n_features)
+            result['quantile_forecaster'] = forecaster
+        quantiles = list(result['quantiles'])
+        # Independently fitted quantiles can cross; sorting restores order
+        bands = np.sort(forecaster.forecast(scaled_seq, days), axis=0)
+    elif method == 'mc':
+        forecaster = result.get('mc_forecaster')
+        if forecaster is None or forecaster.samples != samples:
+            forecaster = MonteCarloForecaster(result['model'], preprocessor.seq_length,
+                                              n_features=preprocessor.n_features,
+                                              samples=samples)
+            result['mc_forecaster'] = forecaster
+        quantiles = list(quantiles)
+        bands = np.quantile(forecaster.sample(scaled_seq, days), quantiles, axis=0)
+    else:
+        raise ValueError(f"unknown interval method {method!r}")
+
+    prices = preprocessor.scaler.inverse_transform(np.reshape(bands, (-1, 1)))
+    return {'quantiles': quantiles, 'bands': prices.reshape(len(quantiles), days)}
+
+
+def export(result, path, tflite_path=None):
+    # Write the model and scaling state for the TensorFlow-free runtime
+    from runtime import export_numpy, export_tflite
+
+    export_numpy(result['model'], result['preprocessor'], path)
+    if tflite_path:
+        export_tflite(result['model'], tflite_path)
+    return path
+
+
+def sweep(series, trials=None, n_workers=None, epochs=20, on_result=None,
+          should_stop=None):
+    from sweep import DEFAULT_SPACE, grid_trials, run_sweep
+
+    if trials is None:
+        trials = grid_trials(DEFAULT_SPACE)
+    return run_sweep(series, trials, n_workers=n_workers, on_result=on_result,
+                     should_stop=should_stop, epochs=epochs)
+
+
+def backtest(series, seq_length=60, n_folds=5, mode='expanding', n_workers=None,
+             epochs=20, units=50, architecture='lstm', on_result=None, should_stop=None):
+    from backtest import run_backtest
+
+    return run_backtest(series, seq_length=seq_length, n_folds=n_folds, mode=mode,
+                        n_workers=n_workers, on_result=on_result,
+                        should_stop=should_stop, epochs=epochs, units=units,
+                        architecture=architecture)
+
+
+def ensemble(df, target_col, n_members=5, architectures=None, method='mean', seed=0,
+             val_size=0.1, n_workers=None, registry=None, on_result=None, should_stop=None,
+             **options):
+    # Trains n_members target-only models in a process pool (options are
+    # TrainingJob options shared by all of them) and joins the finished ones
+    # into a single model, so evaluation and forecasting cost one batched
+    # forward pass over every member.
+    from ensemble import (inverse_error_weights, member_specs, price_metrics,
+                          run_ensemble, split_windows)
+    from forecaster import RecursiveForecaster, compile_step
+    from model_builder import ENSEMBLE_METHODS, ModelBuilder
+    from registry import ModelRegistry
+
+    # Checked before any member trains
+    if method not in ENSEMBLE_METHODS:
+        raise ValueError(f"unknown ensemble method {method!r}; "
+                         f"choose from {ENSEMBLE_METHODS}")
+    start = time.time()
+    registry = registry or ModelRegistry()
+    series = df[target_col].values
+    test_size = options.pop('test_size', 0.2)
+    specs = member_specs(n_members, tuple(architectures or ('lstm',)), seed)
+    members = run_ensemble(series, specs, n_workers=n_workers, on_result=on_result,
+                           should_stop=should_stop, target_col=target_col,
+                           test_size=test_size, val_size=val_size,
+                           registry_root=registry.root, **options)
+    trained = [m for m in members if 'error' not in m]
+    if not trained:
+        errors = [m['error'] for m in members]
+        raise ValueError("no ensemble member finished" +
+                         (f": {errors[0]}" if errors else ""))
+
+    # Members share the series and split, hence the same fitted scaler
+    entries = [registry.load(m['key']) for m in trained]
+    preprocessor = entries[0]['preprocessor']
+    preprocessor.attach(df)
+    weights = None
+    if method == 'weighted':
+        weights = inverse_error_weights([m['val_mse'] for m in trained])
+    model, stacked = ModelBuilder.build_ensemble([e['model'] for e in entries], method,
+                                                 weights)
+
+    windows = SequenceWindows(preprocessor.scaled_data, preprocessor.seq_length)
+    n_windows = preprocessor.n_windows(len(series), options.get('horizon', 1))
+    X_test = windows[split_windows(n_windows, test_size, val_size)[1]:]
+    y_test = X_test.target_matrix()
+    X = X_test.materialize()
+
+    # One pass scores every member; the ensemble combines that same stack
+    member_preds = stacked.predict(X, batch_size=256, verbose=0)
+    combined = model.layers[-1](member_preds).numpy()
+    scaler = preprocessor.scaler
+
+    def prices(values):
+        return scaler.inverse_transform(np.reshape(values, (-1, 1))).ravel()
+
+    y_true = prices(np.reshape(y_test, (len(y_test), -1))[:, :1])
+    for i, member in enumerate(trained):
+        member.update(price_metrics(y_true, prices(member_preds[:, i, :1])),
+                      weight=float(weights[i]) if weights is not None else 1 / len(trained))
+
+    # The members' small recurrent steps run back to back in one graph;
+    # compiled with XLA they fuse, so a forecast step costs far less than
+    # one call per member
+    seq_length = preprocessor.seq_length
+    forecaster = RecursiveForecaster(
+        None, seq_length, preprocessor.n_features,
+        step_fn=compile_step(model, seq_length, preprocessor.n_features, jit_compile=True),
+        horizon=model.output_shape[-1]
+    )
+
+    member_keys = [m['key'] for m in trained]
+    return {
+        'model': model,
+        'forecaster': forecaster,
+        'stacked_model': stacked,
+        'preprocessor': preprocessor,
+        'X_test': X,
+        'y_test': y_test.copy(),
+        'history': {},
+        'series': series.copy(),
+        'key': model_key(series, {'ensemble': member_keys, 'method': method}),
+        'cached': all(m['cached'] for m in trained),
+        'ensemble': {
+            'method': method,
+            'members': members,
+            'metrics': price_metrics(y_true, prices(combined[:, :1])),
+            'wall_seconds': time.time() - start,
+        },
+    }
@@ -0,0 +1,176 @@
+import csv
+import hashlib
+import os
+import warnings
+import pandas as pd
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "stock_prediction")
+SAMPLE_BYTES = 64 * 1024
+SAMPLE_ROWS = 1000
+CHUNK_ROWS = 100000
+
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = "parquet"
+except ImportError:
+    CACHE_FORMAT = "pickle"
+
+
+def sniff_delimiter(path):
+    with open(path, "r", newline="", encoding="utf-8", errors="replace") as f:
+        sample = f.read(SAMPLE_BYTES)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",\t;|").delimiter
+    except csv.Error:
+        return ","
+
+
+def read_header(path, sep=None):
+    sep = sep or sniff_delimiter(path)
+    return pd.read_csv(path, sep=sep, nrows=0).columns.tolist()
+
+
+def infer_column_kinds(path, sep, usecols=None):
+    # Classify columns from a small sample so the full read can use explicit
+    # dtypes: 'float', 'currency' ($-prefixed), 'date' or 'string'
+    sample = pd.read_csv(path, sep=sep, usecols=usecols, nrows=SAMPLE_ROWS,
+                         dtype=str, skipinitialspace=True)
+    kinds = {}
+    for col in sample.columns:
+        values = sample[col].dropna().str.strip()
+        if values.empty:
+            kinds[col] = "string"
+        elif pd.to_numeric(values, errors="coerce").notna().all():
+            kinds[col] = "float"
+        elif values.str.startswith("$").all():
+            kinds[col] = "currency"
+        elif _parses_as_dates(values):
+            kinds[col] = "date"
+        else:
+            kinds[col] = "string"
+    return kinds
+
+
+def _parses_as_dates(values):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        return pd.to_datetime(values, errors="coerce").notna().all()
+
+
+def _read_dtypes(kinds):
+    return {col: ("float64" if kind == "float" else str) for col, kind in kinds.items()}
+
+
+def convert_columns(df, kinds):
+    # Vectorized parsing of the columns read as strings
+    for col, kind in kinds.items():
+        if col not in df.columns:
+            continue
+        if kind == "currency":
+            cleaned = df[col].str.strip().str.replace(r"[$,]", "", regex=True)
+            df[col] = pd.to_numeric(cleaned, errors="coerce")
+        elif kind == "date":
+            df[col] = pd.to_datetime(df[col].str.strip(), errors="coerce")
+        elif kind == "float" and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+
+def cache_path(path, usecols=None, cache_dir=CACHE_DIR):
+    # Sidecar key: absolute path + mtime + size + requested columns
+    stat = os.stat(path)
+    key = "|".join([
+        os.path.abspath(path),
+        str(stat.st_mtime_ns),
+        str(stat.st_size),
+        ",".join(usecols) if usecols else "*",
+    ])
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    name = f"{os.path.basename(path)}-{digest}.{CACHE_FORMAT}"
+    return os.path.join(cache_dir, name)
+
+
+def read_cache(path, usecols=None, cache_dir=CACHE_DIR):
+    if cache_dir is None:
+        return None
+    sidecar = cache_path(path, usecols, cache_dir)
+    if not os.path.exists(sidecar):
+        return None
+    try:
+        if CACHE_FORMAT == "parquet":
+            return pd.read_parquet(sidecar)
+        return pd.read_pickle(sidecar)
+    except Exception:
+        return None
+
+
+def write_cache(df, path, usecols=None, cache_dir=CACHE_DIR):
+    if cache_dir is None:
+        return
+    sidecar = cache_path(path, usecols, cache_dir)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = sidecar + ".tmp"
+        if CACHE_FORMAT == "parquet":
+            df.to_parquet(tmp, index=False)
+        else:
+            df.to_pickle(tmp)
+        os.replace(tmp, sidecar)
+    except (OSError, ValueError, ImportError):
+        # A cache that can't be written only costs a reparse next time
+        pass
+
+
+def load_csv(path, usecols=None, cache_dir=CACHE_DIR):
+    df = read_cache(path, usecols, cache_dir)
+    if df is not None:
+        return df
+
+    sep = sniff_delimiter(path)
+    kinds = infer_column_kinds(path, sep, usecols)
+    try:
+        df = pd.read_csv(path, sep=sep, usecols=usecols, dtype=_read_dtypes(kinds),
+                         skipinitialspace=True, memory_map=True)
+    except ValueError:
+        # A value outside the sample broke the inferred dtype
+        df = pd.read_csv(path, sep=sep, usecols=usecols, dtype=str,
+                         skipinitialspace=True, memory_map=True)
+    if usecols:
+        df = df[list(usecols)]
+    df = convert_columns(df, kinds)
+
+    write_cache(df, path, usecols, cache_dir)
+    return df
+
+
+def iter_csv_chunks(path, usecols=None, chunksize=CHUNK_ROWS):
+    # Yield (chunk, rows_read, bytes_read) with each chunk already converted
+    sep = sniff_delimiter(path)
+    kinds = infer_column_kinds(path, sep, usecols)
+    dtype = _read_dtypes(kinds)
+    rows = 0
+    with open(path, "rb") as f:
+        while True:
+            # After a fallback, rows already yielded are parsed again and dropped
+            skip = rows
+            reader = pd.read_csv(f, sep=sep, usecols=usecols, dtype=dtype,
+                                 skipinitialspace=True, chunksize=chunksize)
+            try:
+                with reader:
+                    for chunk in reader:
+                        if skip:
+                            if skip >= len(chunk):
+                                skip -= len(chunk)
+                                continue
+                            chunk, skip = chunk.iloc[skip:], 0
+                        if usecols:
+                            chunk = chunk[list(usecols)]
+                        rows += len(chunk)
+                        yield convert_columns(chunk, kinds), rows, f.tell()
+                return
+            except ValueError:
+                if dtype is str:
+                    raise
+                # A value outside the sample broke the inferred dtype
+                dtype = str
+                f.seek(0)
@@ -1,12 +1,20 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                             QPushButton, QComboBox, QLineEdit, QGroupBox,
-                            QTextEdit, QFileDialog, QMessageBox)
-import pandas as pd
+                            QTextEdit, QFileDialog, QMessageBox, QProgressBar,
+                            QCheckBox)
+import os
+from data_loader import read_header
+from features import OHLCV_COLUMNS
+from loader import DataLoader
 
 class DataTab(QWidget):
     def __init__(self):
         super().__init__()
         self.df = None
+        self.filename = None
+        self.columns = []
+        self.loader = None
+        self._retired_loaders = []
         self.init_ui()
         
     def init_ui(self):
@@ -21,8 +29,11 @@ class DataTab(QWidget):
         self.file_path.setPlaceholderText("Select CSV file...")
         browse_btn = QPushButton("Browse...")
         browse_btn.clicked.connect(self.load_file)
+        reload_btn = QPushButton("Reload")
+        reload_btn.clicked.connect(self.reload_columns)
         path_layout.addWidget(self.file_path)
         path_layout.addWidget(browse_btn)
+        path_layout.addWidget(reload_btn)
         
         # Column selection
         col_group = QGroupBox("Column Selection")
@@ -31,22 +42,41 @@ class DataTab(QWidget):
         target_layout = QHBoxLayout()
         target_layout.addWidget(QLabel("Target Column:"))
         self.target_col = QComboBox()
+        self.target_col.currentTextChanged.connect(self.reload_columns)
         target_layout.addWidget(self.target_col)
         
         date_layout = QHBoxLayout()
         date_layout.addWidget(QLabel("Date Column:"))
         self.date_col = QComboBox()
+        self.date_col.currentTextChanged.connect(self.reload_columns)
         date_layout.addWidget(self.date_col)
         
+        self.include_ohlcv = QCheckBox("Also load Open/High/Low/Volume columns")
+        self.include_ohlcv.toggled.connect(self.reload_columns)
+        
         col_layout.addLayout(target_layout)
         col_layout.addLayout(date_layout)
+        col_layout.addWidget(self.include_ohlcv)
         col_group.setLayout(col_layout)
         
+        # Load progress
+        progress_layout = QHBoxLayout()
+        self.load_progress = QProgressBar()
+        self.load_progress.setRange(0, 100)
+        self.load_status = QLabel("")
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.cancel_loading)
+        self.cancel_btn.setEnabled(False)
+        progress_layout.addWidget(self.load_progress)
+        progress_layout.addWidget(self.load_status)
+        progress_layout.addWidget(self.cancel_btn)
+        
         # Data preview
         preview_group = QGroupBox("Data Preview")
         preview_layout = QVBoxLayout()
         self.data_preview = QTextEdit()
         self.data_preview.setReadOnly(True)
+        preview_layout.addLayout(progress_layout)
         preview_layout.addWidget(self.data_preview)
         preview_group.setLayout(preview_layout)
         
@@ -68,19 +98,22 @@ class DataTab(QWidget):
             return
             
         try:
-            self.df = pd.read_csv(filename)
+            # Only the header is parsed here; the data follows column selection
+            cols = read_header(filename)
+            self.filename = filename
+            self.columns = cols
             self.file_path.setText(filename)
-            self.data_preview.setText(str(self.df.head()))
             
             # Update comboboxes
-            cols = self.df.columns.tolist()
+            self.target_col.blockSignals(True)
+            self.date_col.blockSignals(True)
             self.target_col.clear()
             self.date_col.clear()
             self.target_col.addItems(cols)
             self.date_col.addItems(cols + ["None"])
             
             # Auto-select likely columns
-            for col in ['Close', 'close', 'price']:
+            for col in ['Close', 'close', 'Close/Last', 'price']:
                 if col in cols:
                     self.target_col.setCurrentText(col)
                     break
@@ -89,6 +122,80 @@ class DataTab(QWidget):
                 if col in cols:
                     self.date_col.setCurrentText(col)
                     break
+            self.target_col.blockSignals(False)
+            self.date_col.blockSignals(False)
+            
+            self.reload_columns()
                     
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to load file: {str(e)}")
+    
+    def selected_columns(self):
+        cols = [self.target_col.currentText()]
+        date_col = self.date_col.currentText()
+        if date_col and date_col != "None" and date_col not in cols:
+            cols.append(date_col)
+        if self.include_ohlcv.isChecked():
+            cols += [c for c in self.columns if c in OHLCV_COLUMNS and c not in cols]
+        return cols
+    
+    def reload_columns(self, *args):
+        if not self.filename or not self.target_col.currentText():
+            return
+            
+        self.cancel_loading()
+        self.df = None
+        self.load_progress.setValue(0)
+        self.load_status.setText("Loading...")
+        self.cancel_btn.setEnabled(True)
+        
+        self.loader = DataLoader(self.filename, usecols=self.selected_columns())
+        self.loader.progress_updated.connect(self.on_load_progress)
+        self.loader.preview_ready.connect(self.on_preview_ready)
+        self.loader.load_completed.connect(self.on_load_complete)
+        self.loader.error_occurred.connect(self.on_load_error)
+        self.loader.start()
+    
+    def cancel_loading(self):
+        if self.loader is None:
+            return
+            
+        # Keep the old worker alive until its thread exits
+        loader = self.loader
+        self.loader = None
+        loader.stop()
+        for signal in (loader.progress_updated, loader.preview_ready,
+                       loader.load_completed, loader.error_occurred):
+            signal.disconnect()
+        self._retired_loaders.append(loader)
+        loader.finished.connect(lambda: self._retired_loaders.remove(loader))
+        self.on_load_cancelled()
+    
+    def on_load_progress(self, rows, nbytes):
+        total = os.path.getsize(self.filename) if nbytes is not None else 0
+        if total:
+            self.load_progress.setValue(int(min(nbytes / total, 1.0) * 100))
+            self.load_status.setText(f"{rows:,} rows, {nbytes / 1e6:.1f} MB")
+        else:
+            self.load_progress.setValue(100)
+            self.load_status.setText(f"{rows:,} rows (cached)")
+    
+    def on_preview_ready(self, preview):
+        self.data_preview.setText(str(preview))
+    
+    def on_load_complete(self, df):
+        self.df = df
+        self.loader = None
+        self.load_progress.setValue(100)
+        self.cancel_btn.setEnabled(False)
+        self.data_preview.setText(str(df.head()))
+    
+    def on_load_cancelled(self):
+        self.cancel_btn.setEnabled(False)
+        self.load_status.setText("Cancelled")
+    
+    def on_load_error(self, error):
+        self.loader = None
+        self.cancel_btn.setEnabled(False)
+        self.load_status.setText("")
+        QMessageBox.critical(self, "Error", f"Failed to load file: {error}")
@@ -0,0 +1,158 @@
+import numpy as np
+import tensorflow as tf
+from numpy.lib.stride_tricks import sliding_window_view
+
+BLOCK_WINDOWS = 65536
+
+
+def buffer_order(rng, count, buffer_size):
+    # The order tf.data's shuffle(buffer_size) would produce, drawn from
+    # rng: each index is picked at random from a buffer refilled in order.
+    # A buffer covering the whole epoch is a full permutation.
+    if not buffer_size or buffer_size >= count:
+        return rng.permutation(count)
+    buffer = np.arange(buffer_size)
+    picks = rng.random(count)
+    order = np.empty(count, dtype=np.int64)
+    size, refill = buffer_size, buffer_size
+    for i in range(count):
+        j = int(picks[i] * size)
+        order[i] = buffer[j]
+        if refill < count:
+            buffer[j] = refill
+            refill += 1
+        else:
+            size -= 1
+            buffer[j] = buffer[size]
+    return order
+
+
+def seeded_order(start, count, seed, first_epoch=0, buffer_size=None):
+    # Window indices start..start + count in an order fixed by (seed,
+    # epoch), shuffled through a buffer of buffer_size as tf.data would
+    # (in full when None). The epoch advances each time the dataset is
+    # iterated, so a run resumed at first_epoch draws the orders of an
+    # uninterrupted one; tf.data's own reshuffling depends on how often
+    # the pipeline was iterated and cannot be replayed.
+    epochs = [first_epoch]
+
+    def order():
+        rng = np.random.default_rng([seed, epochs[0]])
+        epochs[0] += 1
+        yield start + buffer_order(rng, count, buffer_size)
+
+    dataset = tf.data.Dataset.from_generator(
+        order, output_signature=tf.TensorSpec((None,), tf.int64))
+    # A known length keeps Keras from stepping past the end of each epoch,
+    # which also counts an optimizer iteration
+    return dataset.unbatch().apply(tf.data.experimental.assert_cardinality(count))
+
+
+def window_dataset(windows, batch_size=32, shuffle_buffer=1000, cache=False,
+                   horizon=1, seed=None, first_epoch=0):
+    # Stream (X, y) batches from a SequenceWindows object. Only the 1-D
+    # scaled series is stored in the graph; each batch gathers its windows
+    # from window start indices, so memory scales with len(series) rather
+    # than len(series) * seq_length. Seeded runs draw the same buffered
+    # shuffle from seeded_order, starting at epoch first_epoch.
+    seq_length = windows.seq_length
+    series = tf.constant(windows.series, dtype=tf.float32)
+    target = series[:, 0]
+    count = len(windows.target_view(horizon))
+    offsets = tf.range(seq_length, dtype=tf.int64)
+    target_offsets = tf.range(horizon, dtype=tf.int64) + seq_length
+
+    def gather(idx):
+        x = tf.gather(series, idx[..., None] + offsets)
+        y = tf.gather(target, idx[..., None] + target_offsets)
+        return x, y
+
+    dataset = tf.data.Dataset.range(windows.start, windows.start + count)
+
+    if shuffle_buffer and seed is not None:
+        dataset = seeded_order(windows.start, count, seed, first_epoch, shuffle_buffer)
+        if cache:
+            # Windows are materialized up front and batches index into them
+            X, y = gather(tf.range(windows.start, windows.start + count, dtype=tf.int64))
+            dataset = dataset.batch(batch_size).map(
+                lambda idx: (tf.gather(X, idx - windows.start),
+                             tf.gather(y, idx - windows.start)),
+                num_parallel_calls=tf.data.AUTOTUNE)
+        else:
+            dataset = dataset.batch(batch_size).map(gather,
+                                                    num_parallel_calls=tf.data.AUTOTUNE)
+    elif cache:
+        # Materialize windows once on the first epoch, trading memory for speed
+        dataset = dataset.map(gather, num_parallel_calls=tf.data.AUTOTUNE).cache()
+        if shuffle_buffer:
+            dataset = dataset.shuffle(shuffle_buffer, seed=seed)
+        dataset = dataset.batch(batch_size)
+    else:
+        if shuffle_buffer:
+            dataset = dataset.shuffle(shuffle_buffer, seed=seed)
+        dataset = dataset.batch(batch_size).map(
+            gather, num_parallel_calls=tf.data.AUTOTUNE
+        )
+
+    return dataset.prefetch(tf.data.AUTOTUNE)
+
+
+def memmap_steps(n_windows, batch_size, block_windows=BLOCK_WINDOWS):
+    # Batches per epoch of memmap_dataset; blocks are batched separately
+    full, rest = divmod(n_windows, block_windows)
+    return full * -(-block_windows // batch_size) + -(-rest // batch_size)
+
+
+def memmap_dataset(data, seq_length, offset, scale, start=0, stop=None, batch_size=32,
+                   horizon=1, shuffle=True, block_windows=BLOCK_WINDOWS, seed=None,
+                   first_epoch=0, skip_batches=0):
+    # (X, y) batches read straight from a memory-mapped (n, F) array and
+    # min/max scaled on the fly. start/stop are window indices as in
+    # SequenceWindows. Windows are visited in shuffled blocks: each block is
+    # one contiguous read, shuffled internally, so memory stays at one
+    # block whatever the length of the series. With a seed the order of
+    # every epoch is fixed, so a resumed run can continue at epoch
+    # first_epoch, skip_batches in, exactly where it stopped.
+    n_windows = len(data) - seq_length - horizon + 1
+    start, stop, _ = slice(start, stop).indices(max(n_windows, 0))
+    offset = np.asarray(offset, dtype=np.float32)
+    scale = np.asarray(scale, dtype=np.float32)
+    n_features = data.shape[1]
+    epochs = [first_epoch]
+
+    def batches():
+        skip = skip_batches if epochs[0] == first_epoch else 0
+        rng = np.random.default_rng(None if seed is None else [seed, epochs[0]])
+        epochs[0] += 1
+        blocks = np.arange(start, stop, block_windows)
+        if shuffle:
+            rng.shuffle(blocks)
+        for first in blocks:
+            last = min(first + block_windows, stop)
+            count = last - first
+            order = rng.permutation(count) if shuffle else np.arange(count)
+            # Skipped blocks are never read
+            n_batches = -(-count // batch_size)
+            if skip >= n_batches:
+                skip -= n_batches
+                continue
+            rows = (np.asarray(data[first:last + seq_length + horizon - 1],
+                               dtype=np.float32) - offset) * scale
+            windows = sliding_window_view(rows, seq_length, axis=0).transpose(0, 2, 1)
+            targets = sliding_window_view(rows[seq_length:, 0], horizon)
+            for i in range(skip * batch_size, count, batch_size):
+                idx = order[i:i + batch_size]
+                yield windows[idx], targets[idx]
+            skip = 0
+
+    dataset = tf.data.Dataset.from_generator(
+        batches,
+        output_signature=(
+            tf.TensorSpec((None, seq_length, n_features), tf.float32),
+            tf.TensorSpec((None, horizon), tf.float32),
+        )
+    )
+    # As in seeded_order; a dataset skipping batches is good for one epoch
+    steps = memmap_steps(stop - start, batch_size, block_windows) - skip_batches
+    dataset = dataset.apply(tf.data.experimental.assert_cardinality(max(steps, 0)))
+    return dataset.prefetch(tf.data.AUTOTUNE)
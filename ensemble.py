@@ -0,0 +1,78 @@
+import math
+import time
+import numpy as np
+from shared import run_pool, worker_state
+
+# Ensembles of independently trained models. Members differ by seed and
+# optionally by architecture, train in a process pool and are saved in the
+# model registry like any other run. The windows are split three ways:
+# members train on the first block, the validation block sets the
+# inverse-error weights, and ensemble and members are scored on the test
+# block, which none of them has seen.
+
+def member_specs(n_members, architectures=('lstm',), seed=0):
+    # Member i trains architectures[i % len(architectures)] from seed + i
+    return [{'member': i, 'architecture': architectures[i % len(architectures)],
+             'seed': seed + i}
+            for i in range(n_members)]
+
+
+def split_windows(n_windows, test_size=0.2, val_size=0.1):
+    # (val_start, test_start); the first matches TrainingJob's split with
+    # test_size + val_size held out
+    return (int(n_windows * (1 - (test_size + val_size))),
+            int(n_windows * (1 - test_size)))
+
+
+def inverse_error_weights(errors):
+    inverse = 1.0 / np.maximum(np.asarray(errors, dtype=np.float64), 1e-12)
+    return inverse / inverse.sum()
+
+
+def price_metrics(y_true, y_pred):
+    mse = float(np.mean((y_true - y_pred) ** 2))
+    return {'mse': mse, 'rmse': math.sqrt(mse), 'mae': float(np.mean(np.abs(y_true - y_pred)))}
+
+
+def run_member(spec, target_col='Close', test_size=0.2, val_size=0.1, registry_root=None,
+               **options):
+    import pandas as pd
+    from core import TrainingJob
+    from registry import REGISTRY_DIR, ModelRegistry
+
+    start = time.time()
+    df = pd.DataFrame({target_col: worker_state['series']})
+    result = TrainingJob(
+        df, target_col,
+        test_size=test_size + val_size,
+        registry=ModelRegistry(registry_root or REGISTRY_DIR),
+        architecture=spec['architecture'],
+        seed=spec['seed'],
+        **options
+    ).run()
+
+    # The held-out windows are validation followed by test
+    X_held, y_held = result['X_test'], result['y_test']
+    n_windows = result['preprocessor'].n_windows(len(df), options.get('horizon', 1))
+    val_start, test_start = split_windows(n_windows, test_size, val_size)
+    n_val = test_start - val_start
+    if n_val < 1:
+        raise ValueError("the validation block is empty; raise val_size")
+    scaler = result['preprocessor'].scaler
+    y_pred = result['model'].predict(X_held[:n_val], batch_size=256, verbose=0)[:, :1]
+    y_true = np.asarray(y_held[:n_val]).reshape(n_val, -1)[:, :1]
+    val = price_metrics(scaler.inverse_transform(y_true).ravel(),
+                        scaler.inverse_transform(y_pred).ravel())
+
+    history = result['history'].get('loss', [])
+    return dict(spec, key=result['key'], cached=result['cached'],
+                val_mse=val['mse'], val_rmse=val['rmse'],
+                epochs=len(history), seconds=time.time() - start)
+
+
+def run_ensemble(series, specs, n_workers=None, on_result=None, should_stop=None,
+                 **member_kwargs):
+    results = run_pool(series, run_member, specs, n_workers, on_result, should_stop,
+                       **member_kwargs)
+    results.sort(key=lambda r: r['member'])
+    return results
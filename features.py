@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from data_loader import CACHE_DIR, CACHE_FORMAT
+
+FEATURE_CACHE_DIR = os.path.join(CACHE_DIR, "features")
+INDICATORS = ('return', 'sma', 'volatility', 'rsi', 'macd', 'macd_signal', 'volume_z')
+OHLCV_COLUMNS = ('Open', 'High', 'Low', 'Volume', 'open', 'high', 'low', 'volume')
+# Part of the cache key; bump when compute_features changes its output
+FEATURE_VERSION = 2
+
+_memory_cache = OrderedDict()
+_MEMORY_CACHE_SIZE = 4
+
+
+def find_volume_column(df):
+    for col in ('Volume', 'volume'):
+        if col in df.columns:
+            return col
+    return None
+
+
+def default_feature_cols(df, target_col):
+    # Raw OHLCV columns that were loaded, plus every indicator they support
+    raw = [c for c in df.columns if c in OHLCV_COLUMNS and c != target_col]
+    indicators = [name for name in INDICATORS
+                  if name != 'volume_z' or find_volume_column(df) is not None]
+    return raw + indicators
+
+
+def compute_features(df, target_col, feature_cols, window=14, fast=12, slow=26,
+                     signal=9):
+    # Vectorized pandas kernels only. Exactly the leading warm-up rows of
+    # the longest indicator are dropped, so row i of the result is row
+    # warmup + i of df; a gap inside the series is never skipped over.
+    price = df[target_col].astype(np.float64)
+    out = {target_col: price}
+    returns = price.pct_change()
+    warmup = 0
+
+    for name in feature_cols:
+        if name == 'return':
+            out[name] = returns
+            warmup = max(warmup, 1)
+        elif name == 'sma':
+            out[name] = price.rolling(window).mean()
+            warmup = max(warmup, window - 1)
+        elif name == 'volatility':
+            out[name] = returns.rolling(window).std()
+            warmup = max(warmup, window)
+        elif name == 'rsi':
+            warmup = max(warmup, 1)
+            delta = price.diff()
+            gain = delta.clip(lower=0).ewm(alpha=1 / window, adjust=False).mean()
+            loss = (-delta.clip(upper=0)).ewm(alpha=1 / window, adjust=False).mean()
+            out[name] = 100 - 100 / (1 + gain / loss)
+        elif name in ('macd', 'macd_signal'):
+            macd = (price.ewm(span=fast, adjust=False).mean()
+                    - price.ewm(span=slow, adjust=False).mean())
+            out[name] = macd if name == 'macd' else macd.ewm(span=signal, adjust=False).mean()
+        elif name == 'volume_z':
+            volume = df[find_volume_column(df)].astype(np.float64).ffill()
+            rolling = volume.rolling(window)
+            std = rolling.std()
+            # A window of constant volume is no deviation at all
+            out[name] = ((volume - rolling.mean()) / std).where(std != 0, 0.0)
+            warmup = max(warmup, window - 1)
+        else:
+            # Gaps in raw input columns carry the last known value
+            out[name] = df[name].astype(np.float64).ffill()
+
+    frame = pd.DataFrame(out, index=df.index)
+    frame = frame.replace([np.inf, -np.inf], np.nan)
+    # RSI is undefined only while there are no losses yet
+    if 'rsi' in frame:
+        frame['rsi'] = frame['rsi'].fillna(100.0).where(price.diff().notna())
+    frame = frame.iloc[warmup:]
+
+    missing = frame.isna().to_numpy()
+    if missing.any():
+        row, col = np.argwhere(missing)[0]
+        raise ValueError(f"{frame.columns[col]} is missing or infinite at row "
+                         f"{frame.index[row]}; fill or drop those rows in the data")
+    return frame
+
+
+def _cache_key(df, target_col, feature_cols, params):
+    digest = hashlib.sha256()
+    needed = [target_col] + [c for c in feature_cols if c in df.columns]
+    volume_col = find_volume_column(df)
+    if 'volume_z' in feature_cols and volume_col is not None:
+        needed.append(volume_col)
+    for col in dict.fromkeys(needed):
+        digest.update(col.encode("utf-8"))
+        digest.update(np.ascontiguousarray(df[col].to_numpy(dtype=np.float64)).tobytes())
+    digest.update(json.dumps([FEATURE_VERSION, list(feature_cols), params],
+                             sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+def feature_frame(df, target_col, feature_cols, cache_dir=FEATURE_CACHE_DIR, **params):
+    # Cached compute_features: an in-process LRU in front of a disk cache
+    key = _cache_key(df, target_col, feature_cols, params)
+    if key in _memory_cache:
+        _memory_cache.move_to_end(key)
+        return _memory_cache[key]
+
+    path = os.path.join(cache_dir, f"{key}.{CACHE_FORMAT}") if cache_dir else None
+    frame = None
+    if path and os.path.exists(path):
+        try:
+            frame = (pd.read_parquet(path) if CACHE_FORMAT == "parquet"
+                     else pd.read_pickle(path))
+        except Exception:
+            frame = None
+    if frame is None:
+        frame = compute_features(df, target_col, feature_cols, **params)
+        if path:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                if CACHE_FORMAT == "parquet":
+                    frame.to_parquet(path + ".tmp")
+                else:
+                    frame.to_pickle(path + ".tmp")
+                os.replace(path + ".tmp", path)
+            except (OSError, ValueError, ImportError):
+                pass
+
+    _memory_cache[key] = frame
+    if len(_memory_cache) > _MEMORY_CACHE_SIZE:
+        _memory_cache.popitem(last=False)
+    return frame
@@ -0,0 +1,137 @@
+import numpy as np
+
+
+class RingBuffer:
+    # Fixed-size window over the most recent rows of a batch of series. The
+    # rows are stored twice so the current window is always a contiguous
+    # slice: pushing a row is O(1) and never reallocates.
+
+    def __init__(self, initial):
+        initial = np.asarray(initial, dtype=np.float32)
+        self.size = initial.shape[1]
+        self._data = np.concatenate([initial, initial], axis=1)
+        self._pos = 0
+
+    @property
+    def window(self):
+        return self._data[:, self._pos:self._pos + self.size]
+
+    @property
+    def last(self):
+        return self._data[:, self._pos + self.size - 1]
+
+    def push(self, rows):
+        self._data[:, self._pos] = rows
+        self._data[:, self._pos + self.size] = rows
+        self._pos = (self._pos + 1) % self.size
+
+
+def compile_step(model, seq_length, n_features=1, training=False, jit_compile=False):
+    import tensorflow as tf
+
+    # Calling the model directly inside a tf.function skips the per-call
+    # setup of model.predict; the fixed signature avoids retracing. XLA
+    # fuses the many small per-timestep ops of recurrent layers, which pays
+    # off most for graphs holding several models.
+    @tf.function(
+        input_signature=[tf.TensorSpec([None, seq_length, n_features], tf.float32)],
+        reduce_retracing=True,
+        jit_compile=jit_compile
+    )
+    def step(x):
+        return model(x, training=training)
+
+    return lambda x: step(x).numpy()
+
+
+class RecursiveForecaster:
+    def __init__(self, model, seq_length, n_features=1, step_fn=None, horizon=None):
+        self.seq_length = seq_length
+        self.n_features = n_features
+        if step_fn is None:
+            step_fn = compile_step(model, seq_length, n_features)
+            horizon = model.output_shape[-1]
+        self.step_fn = step_fn
+        self.horizon = horizon or 1
+
+    def forecast(self, seq, days):
+        # seq holds the last seq_length scaled rows of one series, or a batch
+        # of them as (B, seq_length[, F]). Models with a multi-horizon head
+        # emit several days per forward pass; the rest is fed back
+        # recursively. Non-target features are carried forward unchanged.
+        seq = np.asarray(seq, dtype=np.float32)
+        windows = seq.reshape(-1, self.seq_length, self.n_features)
+        batch = windows.shape[0]
+
+        ring = RingBuffer(windows)
+        out = np.empty((batch, days), dtype=np.float32)
+        t = 0
+        while t < days:
+            preds = np.asarray(self.step_fn(ring.window)).reshape(batch, -1)
+            k = min(preds.shape[1], days - t)
+            out[:, t:t + k] = preds[:, :k]
+            for j in range(k):
+                row = ring.last.copy()
+                row[:, 0] = preds[:, j]
+                ring.push(row)
+            t += k
+
+        if batch == 1 and seq.ndim < 3:
+            return out[0]
+        return out
+
+
+class MonteCarloForecaster:
+    # Monte-Carlo dropout: K forecast paths with dropout left on. All K
+    # copies of each window run as one batch, so a step costs a single
+    # forward pass of batch B * K instead of K passes.
+
+    def __init__(self, model, seq_length, n_features=1, samples=100):
+        self.samples = samples
+        self.seq_length = seq_length
+        self.n_features = n_features
+        self.forecaster = RecursiveForecaster(
+            None, seq_length, n_features,
+            step_fn=compile_step(model, seq_length, n_features, training=True),
+            horizon=model.output_shape[-1]
+        )
+
+    def sample(self, seq, days):
+        # (samples, days) paths for one series, (B, samples, days) for a batch
+        seq = np.asarray(seq, dtype=np.float32)
+        windows = seq.reshape(-1, self.seq_length, self.n_features)
+        paths = self.forecaster.forecast(np.repeat(windows, self.samples, axis=0), days)
+        paths = paths.reshape(len(windows), self.samples, days)
+        if len(windows) == 1 and seq.ndim < 3:
+            return paths[0]
+        return paths
+
+
+class QuantileForecaster:
+    # Recursive forecast from a quantile head: the median is fed back and
+    # every quantile of each step is kept
+
+    def __init__(self, model, seq_length, quantiles, n_features=1):
+        self.quantiles = np.asarray(quantiles, dtype=np.float64)
+        self.median = int(np.argmin(np.abs(self.quantiles - 0.5)))
+        self.horizon = model.output_shape[-1] // len(self.quantiles)
+        self._step = compile_step(model, seq_length, n_features)
+        self._steps = []
+        self.forecaster = RecursiveForecaster(None, seq_length, n_features,
+                                              step_fn=self._median_step,
+                                              horizon=self.horizon)
+
+    def _median_step(self, x):
+        out = self._step(x).reshape(len(x), len(self.quantiles), self.horizon)
+        self._steps.append(out)
+        return out[:, self.median]
+
+    def forecast(self, seq, days):
+        # (n_quantiles, days) for one series, (B, n_quantiles, days) for a batch
+        self._steps = []
+        seq = np.asarray(seq, dtype=np.float32)
+        self.forecaster.forecast(seq, days)
+        bands = np.concatenate(self._steps, axis=2)[:, :, :days]
+        if len(bands) == 1 and seq.ndim < 3:
+            return bands[0]
+        return bands
@@ -0,0 +1,55 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+import pandas as pd
+from data_loader import CHUNK_ROWS, iter_csv_chunks, read_cache, write_cache
+
+class DataLoader(QThread):
+    progress_updated = pyqtSignal(object, object)
+    preview_ready = pyqtSignal(object)
+    load_completed = pyqtSignal(object)
+    load_cancelled = pyqtSignal()
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, filename, usecols=None, chunksize=CHUNK_ROWS):
+        super().__init__()
+        self.filename = filename
+        self.usecols = usecols
+        self.chunksize = chunksize
+        self._running = True
+
+    def run(self):
+        try:
+            # Sidecar hit: no parsing needed
+            df = read_cache(self.filename, self.usecols)
+            if df is not None:
+                self.preview_ready.emit(df.head())
+                self.progress_updated.emit(len(df), None)
+                self.load_completed.emit(df)
+                return
+            
+            chunks = []
+            for chunk, rows, nbytes in iter_csv_chunks(
+                self.filename, self.usecols, self.chunksize
+            ):
+                if not self._running:
+                    self.load_cancelled.emit()
+                    return
+                chunks.append(chunk)
+                if len(chunks) == 1:
+                    self.preview_ready.emit(chunk.head())
+                self.progress_updated.emit(rows, nbytes)
+            
+            if chunks:
+                df = pd.concat(chunks, ignore_index=True)
+            else:
+                df = pd.DataFrame(columns=self.usecols)
+            write_cache(df, self.filename, self.usecols)
+            self.load_completed.emit(df)
+            
+        except Exception as e:
+            self.error_occurred.emit(str(e))
+        finally:
+            self._running = False
+
+    def stop(self):
+        # Non-blocking: the worker exits at the next chunk boundary
+        self._running = False
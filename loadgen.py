@@ -0,0 +1,137 @@
+import argparse
+import json
+import sys
+import threading
+import time
+import http.client
+import numpy as np
+
+# Load generator for server.py. Sends concurrent forecast requests and
+# reports latency percentiles and throughput; --baseline runs the same
+# workload through an in-process, unbatched forecaster for comparison.
+
+
+def _summary(name, latencies, elapsed):
+    latencies = np.asarray(latencies)
+    return {
+        'client': name,
+        'requests': int(len(latencies)),
+        'throughput_rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'p99_ms': float(np.percentile(latencies, 99) * 1000),
+    }
+
+
+def _connect(host, port, unix_socket):
+    if unix_socket:
+        class UnixConnection(http.client.HTTPConnection):
+            def connect(self):
+                import socket
+                self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self.sock.connect(unix_socket)
+        return UnixConnection("localhost")
+    return http.client.HTTPConnection(host, port)
+
+
+def describe_model(args):
+    # The server's /models entry for args.model; feature models take rows
+    # of [target, *feature_cols] rather than a flat list of prices
+    conn = _connect(args.host, args.port, args.unix)
+    try:
+        conn.request("GET", "/models")
+        models = json.loads(conn.getresponse().read())
+    finally:
+        conn.close()
+    for model in models:
+        if model['key'] == args.model:
+            return model
+    raise SystemExit(f"model {args.model} is not in the server's registry")
+
+
+def synthetic_values(length, n_features=1, seed=0):
+    # Random-walk prices, or rows of random walks for feature models
+    rng = np.random.default_rng(seed)
+    walks = 100 + np.cumsum(rng.normal(size=(length, n_features)), axis=0)
+    return (walks[:, 0] if n_features == 1 else walks).tolist()
+
+
+def run_http(args, values):
+    body = json.dumps({'model': args.model, 'values': values, 'days': args.days})
+    latencies, lock = [], threading.Lock()
+
+    def worker():
+        conn = _connect(args.host, args.port, args.unix)
+        local = []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            conn.request("POST", "/forecast", body, {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            payload = response.read()
+            if response.status != 200:
+                raise RuntimeError(payload.decode("utf-8", "replace"))
+            local.append(time.perf_counter() - start)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(args.concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return _summary("http", latencies, time.perf_counter() - start)
+
+
+def run_baseline(args, values):
+    # Stand-in client: same model, called directly one request at a time
+    from forecaster import RecursiveForecaster
+    from registry import ModelRegistry
+    from server import input_window
+
+    entry = ModelRegistry().load(args.model)
+    preprocessor = entry['preprocessor']
+    seq_length = preprocessor.seq_length
+    forecaster = RecursiveForecaster(entry['model'], seq_length, preprocessor.n_features)
+    window = input_window(preprocessor, values)
+    forecaster.forecast(window, args.days)
+
+    latencies = []
+    total = args.requests * args.concurrency
+    start = time.perf_counter()
+    for _ in range(total):
+        t0 = time.perf_counter()
+        path = forecaster.forecast(window, args.days)
+        preprocessor.scaler.inverse_transform(path.reshape(-1, 1))
+        latencies.append(time.perf_counter() - t0)
+    return _summary("in-process", latencies, time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the forecast server.")
+    parser.add_argument("--model", required=True, help="registry key to query")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="Unix socket path instead of TCP")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    parser.add_argument("--days", type=int, default=10)
+    parser.add_argument("--seq-length", type=int, default=365,
+                        help="length of the synthetic input history")
+    parser.add_argument("--baseline", action="store_true",
+                        help="also run the unbatched in-process client")
+    args = parser.parse_args(argv)
+
+    model = describe_model(args)
+    values = synthetic_values(max(args.seq_length, model.get('seq_length') or 0),
+                              1 + len(model.get('feature_cols') or []))
+
+    reports = [run_http(args, values)]
+    if args.baseline:
+        reports.append(run_baseline(args, values))
+    print(json.dumps(reports, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import os
+import struct
+import numpy as np
+from data_loader import CACHE_DIR, CHUNK_ROWS, cache_path, iter_csv_chunks
+
+# Columns of a CSV converted once into a float32 .npy that is memory-mapped
+# for training, so neither the rows nor their windows have to fit in RAM.
+# The conversion streams the CSV in chunks and is reused while the source
+# file is unchanged (same key as the parsed-CSV cache).
+
+STORE_DIR = os.path.join(CACHE_DIR, "memmap")
+# Fixed header size, so the final row count can be written after the data
+HEADER_BYTES = 128
+SCAN_ROWS = 1 << 20
+
+
+def _npy_header(shape, dtype=np.float32):
+    header = repr({
+        'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+        'fortran_order': False,
+        'shape': tuple(shape),
+    })
+    # magic (6) + version (2) + header length (2) + header
+    header = header.ljust(HEADER_BYTES - 10 - 1) + '\n'
+    return b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1')
+
+
+def store_path(path, columns, store_dir=STORE_DIR):
+    return os.path.splitext(cache_path(path, columns, store_dir))[0] + '.npy'
+
+
+def convert_csv(path, columns, store_dir=STORE_DIR, chunksize=CHUNK_ROWS,
+                on_progress=None):
+    target = store_path(path, columns, store_dir)
+    if os.path.exists(target):
+        return target
+    os.makedirs(store_dir, exist_ok=True)
+    tmp = target + f".tmp{os.getpid()}"
+    rows = 0
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(_npy_header((0, len(columns))))
+            for chunk, _, nbytes in iter_csv_chunks(path, usecols=columns,
+                                                    chunksize=chunksize):
+                block = np.ascontiguousarray(chunk[list(columns)].to_numpy(dtype=np.float32))
+                f.write(block.tobytes())
+                rows += len(block)
+                if on_progress is not None:
+                    on_progress(rows, nbytes)
+            f.seek(0)
+            f.write(_npy_header((rows, len(columns))))
+        os.replace(tmp, target)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return target
+
+
+class MemmapSeries:
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = list(columns)
+        self.data = np.load(path, mmap_mode='r')
+        if self.data.shape[1] != len(self.columns):
+            raise ValueError(f"{path} holds {self.data.shape[1]} columns, "
+                             f"expected {len(self.columns)}")
+
+    @classmethod
+    def from_csv(cls, path, columns, store_dir=STORE_DIR, on_progress=None):
+        return cls(convert_csv(path, columns, store_dir, on_progress=on_progress), columns)
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+    def column_range(self, stop=None, chunk=SCAN_ROWS):
+        # Per-column min/max of rows [0, stop), scanned a chunk at a time
+        stop = len(self.data) if stop is None else min(stop, len(self.data))
+        low = np.full(self.data.shape[1], np.inf)
+        high = np.full(self.data.shape[1], -np.inf)
+        for start in range(0, stop, chunk):
+            block = self.data[start:min(start + chunk, stop)]
+            low = np.fmin(low, np.nanmin(block, axis=0))
+            high = np.fmax(high, np.nanmax(block, axis=0))
+        return low, high
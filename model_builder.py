@@ -1,26 +1,233 @@
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout
+import math
+import tensorflow as tf
+from tensorflow.keras.models import Model
+from tensorflow.keras.layers import (GRU, LSTM, Add, Concatenate, Conv1D, Cropping1D,
+                                     Dense, Dropout, Embedding, Flatten, Input)
 from tensorflow.keras.optimizers import Adam
 
+# Sequence encoders by name. Each takes the (batch, seq_length, features)
+# input tensor and returns a (batch, width) summary; the dense head, the
+# optional series embedding and compilation are shared.
+ARCHITECTURES = {}
+
+
+def register(name):
+    def decorator(fn):
+        ARCHITECTURES[name] = fn
+        return fn
+    return decorator
+
+
+@register('lstm')
+def lstm_encoder(x, units, dropout):
+    # Stacked LSTM layers
+    for i, width in enumerate(units):
+        x = LSTM(width, return_sequences=i < len(units) - 1)(x)
+        x = Dropout(dropout)(x)
+    return x
+
+
+@register('gru')
+def gru_encoder(x, units, dropout):
+    # Stacked GRU layers; fewer gates than LSTM, so cheaper per step on CPU
+    for i, width in enumerate(units):
+        x = GRU(width, return_sequences=i < len(units) - 1)(x)
+        x = Dropout(dropout)(x)
+    return x
+
+
+@register('tcn')
+def tcn_encoder(x, units, dropout, kernel_size=3):
+    # Residual blocks of dilated causal convolutions. Dilations double per
+    # block, and extra blocks (at the last width) are added until the
+    # receptive field covers the whole window.
+    seq_length = x.shape[1]
+    needed = math.ceil(math.log2((seq_length - 1) / (kernel_size - 1) + 1))
+    widths = list(units) + [units[-1]] * max(needed - len(units), 0)
+    for i, width in enumerate(widths):
+        y = Conv1D(width, kernel_size, padding='causal', dilation_rate=2 ** i,
+                   activation='relu')(x)
+        y = Dropout(dropout)(y)
+        if x.shape[-1] != width:
+            x = Conv1D(width, 1)(x)
+        x = Add()([x, y])
+    # The last time step has seen the whole window
+    return Flatten()(Cropping1D((seq_length - 1, 0))(x))
+
+
+@register('dense')
+def dense_encoder(x, units, dropout):
+    # Feed-forward baseline over the flattened window
+    x = Flatten()(x)
+    for width in units:
+        x = Dense(width, activation='relu')(x)
+        x = Dropout(dropout)(x)
+    return x
+
+
+def gpu_available():
+    return bool(tf.config.list_physical_devices('GPU'))
+
+
+def configure_threads(intra_op=0, inter_op=0):
+    # 0 keeps TensorFlow's default. Thread pools can only be sized before
+    # the runtime starts; later calls leave the running pools alone.
+    try:
+        if intra_op:
+            tf.config.threading.set_intra_op_parallelism_threads(intra_op)
+        if inter_op:
+            tf.config.threading.set_inter_op_parallelism_threads(inter_op)
+    except RuntimeError:
+        pass
+
+
+def quantile_loss(quantiles, horizon):
+    # Pinball loss over a (batch, n_quantiles * horizon) output laid out
+    # quantile-major, against (batch, horizon) targets
+    q = tf.constant(quantiles, dtype=tf.float32, shape=(1, len(quantiles), 1))
+
+    def loss(y_true, y_pred):
+        y_pred = tf.reshape(tf.cast(y_pred, tf.float32), (-1, len(quantiles), horizon))
+        error = tf.expand_dims(tf.cast(y_true, tf.float32), 1) - y_pred
+        return tf.reduce_mean(tf.maximum(q * error, (q - 1) * error))
+
+    return loss
+
+
 class ModelBuilder:
     @staticmethod
-    def build_lstm(input_shape):
-        model = Sequential()
-        
-        # First LSTM layer
-        model.add(LSTM(50, return_sequences=True, input_shape=input_shape))
-        model.add(Dropout(0.2))
-        
-        # Second LSTM layer
-        model.add(LSTM(50, return_sequences=False))
-        model.add(Dropout(0.2))
-        
-        # Dense layers
-        model.add(Dense(25))
-        model.add(Dense(1))
-        
-        # Compile
-        optimizer = Adam(learning_rate=0.001)
-        model.compile(optimizer=optimizer, loss='mse')
-        
+    def build(architecture, input_shape, horizon=1, units=(50, 50), dense_units=25,
+              dropout=0.2, learning_rate=0.001, n_series=None, embedding_dim=8,
+              jit_compile=False, mixed_precision=False):
+        if architecture not in ARCHITECTURES:
+            raise ValueError(f"unknown architecture {architecture!r}; "
+                             f"choose from {sorted(ARCHITECTURES)}")
+        # float16 compute only pays off on GPUs. The policy is process-wide,
+        # so the caller's is put back once the layers exist.
+        previous = tf.keras.mixed_precision.global_policy()
+        tf.keras.mixed_precision.set_global_policy(
+            'mixed_float16' if mixed_precision and gpu_available() else 'float32')
+        try:
+            window = Input(shape=input_shape)
+            inputs = [window]
+            x = ARCHITECTURES[architecture](window, tuple(units), dropout)
+
+            # Learned per-series embedding joins the sequence summary
+            if n_series is not None:
+                series_id = Input(shape=(), dtype='int32')
+                inputs.append(series_id)
+                embedded = Flatten()(Embedding(n_series, embedding_dim)(series_id))
+                x = Concatenate()([x, embedded])
+
+            # Dense layers; the output stays float32 under mixed precision
+            x = Dense(dense_units)(x)
+            output = Dense(horizon, dtype='float32')(x)
+
+            model = Model(inputs=inputs if n_series is not None else window, outputs=output)
+
+            # Compile
+            optimizer = Adam(learning_rate=learning_rate)
+            model.compile(optimizer=optimizer, loss='mse', jit_compile=jit_compile)
+        finally:
+            tf.keras.mixed_precision.set_global_policy(previous)
+
         return model
+
+    @staticmethod
+    def build_lstm(input_shape, horizon=1, units=(50, 50), dense_units=25,
+                   dropout=0.2, learning_rate=0.001):
+        return ModelBuilder.build('lstm', input_shape, horizon=horizon, units=units,
+                                  dense_units=dense_units, dropout=dropout,
+                                  learning_rate=learning_rate)
+
+    @staticmethod
+    def build_multi_series(input_shape, n_series, embedding_dim=8, horizon=1,
+                           units=(50, 50), dense_units=25, dropout=0.2,
+                           learning_rate=0.001, architecture='lstm'):
+        return ModelBuilder.build(architecture, input_shape, horizon=horizon, units=units,
+                                  dense_units=dense_units, dropout=dropout,
+                                  learning_rate=learning_rate, n_series=n_series,
+                                  embedding_dim=embedding_dim)
+
+    @staticmethod
+    def build_quantile_head(model, quantiles, learning_rate=0.001):
+        # A quantile output on the features that feed the point head. Returns
+        # the full quantile model, the head alone (compiled, to be fitted on
+        # extracted features) and the feature extractor.
+        horizon = model.output_shape[-1]
+        features = model.layers[-1].input
+        head = Dense(len(quantiles) * horizon, dtype='float32', name='quantile_head')
+
+        feature_input = Input(shape=tuple(features.shape[1:]))
+        head_model = Model(feature_input, head(feature_input))
+        head_model.compile(optimizer=Adam(learning_rate=learning_rate),
+                           loss=quantile_loss(quantiles, horizon))
+
+        quantile_model = Model(model.input, head(features))
+        return quantile_model, head_model, Model(model.input, features)
+
+    @staticmethod
+    def build_ensemble(members, method='mean', weights=None):
+        # One graph over every member: StackMembers runs them on the same
+        # batch and CombineMembers reduces the stack. Returns the combined
+        # model and the (batch, n_members, horizon) stacked model, which
+        # share their layers.
+        stack = StackMembers(members)
+        window = Input(shape=tuple(members[0].input_shape[1:]))
+        stacked = stack(window)
+        model = Model(window, CombineMembers(method, weights)(stacked))
+        return model, Model(window, stacked)
+
+
+ENSEMBLE_METHODS = ('mean', 'median', 'weighted')
+
+
+@tf.keras.utils.register_keras_serializable(package='ensemble')
+class StackMembers(tf.keras.layers.Layer):
+    # Members must share the input shape and horizon
+    def __init__(self, members, **kwargs):
+        super().__init__(**kwargs)
+        self.members = list(members)
+
+    def call(self, x, training=None):
+        return tf.stack([tf.cast(m(x, training=training), tf.float32)
+                         for m in self.members], axis=1)
+
+    def get_config(self):
+        return dict(super().get_config(), members=[
+            tf.keras.utils.serialize_keras_object(m) for m in self.members])
+
+    @classmethod
+    def from_config(cls, config):
+        members = [tf.keras.utils.deserialize_keras_object(m)
+                   for m in config.pop('members')]
+        return cls(members, **config)
+
+
+@tf.keras.utils.register_keras_serializable(package='ensemble')
+class CombineMembers(tf.keras.layers.Layer):
+    # Mean, median or weighted mean over the member axis of a stack
+    def __init__(self, method='mean', weights=None, **kwargs):
+        super().__init__(**kwargs)
+        if method not in ENSEMBLE_METHODS:
+            raise ValueError(f"unknown ensemble method {method!r}; "
+                             f"choose from {ENSEMBLE_METHODS}")
+        if method == 'weighted' and weights is None:
+            raise ValueError("a weighted ensemble needs member weights")
+        self.method = method
+        self.member_weights = (None if weights is None
+                               else tf.constant(weights, dtype=tf.float32))
+
+    def get_config(self):
+        weights = (None if self.member_weights is None
+                   else self.member_weights.numpy().tolist())
+        return dict(super().get_config(), method=self.method, weights=weights)
+
+    def call(self, stacked):
+        if self.method == 'median':
+            n = stacked.shape[1]
+            ordered = tf.sort(stacked, axis=1)
+            return 0.5 * (ordered[:, (n - 1) // 2] + ordered[:, n // 2])
+        if self.method == 'weighted':
+            return tf.einsum('bnh,n->bh', stacked, self.member_weights)
+        return tf.reduce_mean(stacked, axis=1)
@@ -1,15 +1,35 @@
+import os
+import time
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                             QPushButton, QGroupBox, QProgressBar, QSpinBox,
-                            QDoubleSpinBox, QMessageBox)
-from PyQt5.QtCore import Qt
-from trainer import ModelTrainer
+                            QDoubleSpinBox, QCheckBox, QComboBox, QMessageBox,
+                            QFileDialog)
+from PyQt5.QtCore import Qt, pyqtSignal
+from matplotlib.backends.backend_qt5agg import FigureCanvas
+from matplotlib.figure import Figure
+from data_loader import CACHE_DIR
+from checkpoint import CHECKPOINT_DIR
+from trainer import EnsembleRunner, ModelTrainer, SweepRunner
+from registry import ModelRegistry
+from sweep import grid_trials, random_trials
+from features import OHLCV_COLUMNS, default_feature_cols
+from core import architectures
 
 class ModelTab(QWidget):
+    sweep_finished = pyqtSignal(list)
+    ensemble_finished = pyqtSignal(dict)
+
     def __init__(self, data_tab):
         super().__init__()
         self.data_tab = data_tab
         self.trainer = None
+        self.ensembler = None
+        self.sweeper = None
         self.model_result = None
+        self.sweep_results = []
+        self.batch_losses = []
+        self.epoch_records = []
+        self.registry = ModelRegistry()
         self.init_ui()
         
     def init_ui(self):
@@ -19,6 +39,11 @@ class ModelTab(QWidget):
         params_group = QGroupBox("Model Parameters")
         params_layout = QVBoxLayout()
         
+        self.architecture = QComboBox()
+        self.architecture.addItems([name.upper() if name != 'dense' else 'Dense'
+                                    for name in architectures()])
+        self._add_parameter(params_layout, "Architecture:", self.architecture)
+        
         self.seq_length = QSpinBox()
         self.seq_length.setRange(1, 365)
         self.seq_length.setValue(60)
@@ -30,6 +55,79 @@ class ModelTab(QWidget):
         self.test_size.setValue(0.2)
         self._add_parameter(params_layout, "Test Size:", self.test_size)
         
+        self.batch_size = QSpinBox()
+        self.batch_size.setRange(1, 4096)
+        self.batch_size.setValue(32)
+        self._add_parameter(params_layout, "Batch Size:", self.batch_size)
+        
+        self.shuffle_buffer = QSpinBox()
+        self.shuffle_buffer.setRange(0, 1000000)
+        self.shuffle_buffer.setSingleStep(1000)
+        self.shuffle_buffer.setValue(1000)
+        self.shuffle_buffer.setToolTip("Windows are drawn at random from a buffer of this size; "
+                                       "resumable runs replay the same buffered order")
+        self._add_parameter(params_layout, "Shuffle Buffer:", self.shuffle_buffer)
+        
+        self.units = QSpinBox()
+        self.units.setRange(4, 512)
+        self.units.setValue(50)
+        self._add_parameter(params_layout, "LSTM Units:", self.units)
+        
+        self.layers = QSpinBox()
+        self.layers.setRange(1, 8)
+        self.layers.setValue(2)
+        self._add_parameter(params_layout, "Layers:", self.layers)
+        
+        self.dropout = QDoubleSpinBox()
+        self.dropout.setRange(0.0, 0.9)
+        self.dropout.setSingleStep(0.05)
+        self.dropout.setValue(0.2)
+        self._add_parameter(params_layout, "Dropout:", self.dropout)
+        
+        self.learning_rate = QDoubleSpinBox()
+        self.learning_rate.setDecimals(5)
+        self.learning_rate.setRange(0.00001, 0.1)
+        self.learning_rate.setSingleStep(0.0005)
+        self.learning_rate.setValue(0.001)
+        self._add_parameter(params_layout, "Learning Rate:", self.learning_rate)
+        
+        self.threads = QSpinBox()
+        self.threads.setRange(0, 256)
+        self.threads.setSpecialValueText("Default")
+        self._add_parameter(params_layout, "CPU Threads:", self.threads)
+        
+        self.jit_compile = QCheckBox("XLA compile (jit_compile)")
+        params_layout.addWidget(self.jit_compile)
+        
+        self.mixed_precision = QCheckBox("Mixed precision (GPU only)")
+        params_layout.addWidget(self.mixed_precision)
+        
+        self.quantile_head = QCheckBox("Quantile head (5/50/95%)")
+        params_layout.addWidget(self.quantile_head)
+        
+        self.out_of_core = QCheckBox("Out-of-core (memory-mapped file)")
+        params_layout.addWidget(self.out_of_core)
+        
+        self.horizon = QSpinBox()
+        self.horizon.setRange(1, 365)
+        self.horizon.setValue(1)
+        self._add_parameter(params_layout, "Direct Forecast Horizon:", self.horizon)
+        
+        self.use_indicators = QCheckBox("Add technical indicators and OHLCV inputs")
+        params_layout.addWidget(self.use_indicators)
+        
+        self.cache_windows = QCheckBox("Cache windows in memory")
+        self.cache_windows.setToolTip("Materialize the training windows once instead of "
+                                      "gathering them every epoch, resumable runs included")
+        params_layout.addWidget(self.cache_windows)
+        
+        self.use_registry = QCheckBox("Reuse saved models")
+        self.use_registry.setChecked(True)
+        params_layout.addWidget(self.use_registry)
+        
+        self.resume_check = QCheckBox("Resume from checkpoint")
+        params_layout.addWidget(self.resume_check)
+        
         params_group.setLayout(params_layout)
         
         # Training
@@ -41,20 +139,128 @@ class ModelTab(QWidget):
         
         btn_layout = QHBoxLayout()
         self.train_btn = QPushButton("Train Model")
-        self.train_btn.clicked.connect(self.start_training)
+        self.train_btn.clicked.connect(lambda: self.start_training())
+        self.update_btn = QPushButton("Update With New Rows")
+        self.update_btn.clicked.connect(self.update_training)
+        self.update_btn.setEnabled(False)
         self.stop_btn = QPushButton("Stop")
         self.stop_btn.clicked.connect(self.stop_training)
         self.stop_btn.setEnabled(False)
         
+        self.export_runtime_btn = QPushButton("Export Runtime...")
+        self.export_runtime_btn.clicked.connect(self.export_runtime)
+        self.export_runtime_btn.setEnabled(False)
+        
         btn_layout.addWidget(self.train_btn)
+        btn_layout.addWidget(self.update_btn)
         btn_layout.addWidget(self.stop_btn)
+        btn_layout.addWidget(self.export_runtime_btn)
         
         train_layout.addWidget(self.progress)
         train_layout.addLayout(btn_layout)
         train_group.setLayout(train_layout)
         
+        # Telemetry
+        telemetry_group = QGroupBox("Training Telemetry")
+        telemetry_layout = QVBoxLayout()
+        
+        self.telemetry_figure = Figure(figsize=(8, 2.2))
+        self.telemetry_canvas = FigureCanvas(self.telemetry_figure)
+        self.telemetry_canvas.setMinimumHeight(160)
+        loss_ax, speed_ax, memory_ax = self.telemetry_figure.subplots(1, 3)
+        self.loss_line, = loss_ax.plot([], [], color='tab:blue', linewidth=1)
+        self.speed_line, = speed_ax.plot([], [], color='tab:green', marker='o')
+        self.memory_line, = memory_ax.plot([], [], color='tab:red', marker='o')
+        for ax, title in ((loss_ax, "Batch loss"), (speed_ax, "Samples/s per epoch"),
+                          (memory_ax, "RSS (MB)")):
+            ax.set_title(title, fontsize=9)
+            ax.tick_params(labelsize=8)
+        self.telemetry_figure.tight_layout()
+        
+        self.telemetry_label = QLabel("No training run yet")
+        
+        telemetry_btn_layout = QHBoxLayout()
+        self.profile_check = QCheckBox("Capture TF profiler trace")
+        self.export_btn = QPushButton("Export Trace")
+        self.export_btn.clicked.connect(self.export_telemetry)
+        self.export_btn.setEnabled(False)
+        telemetry_btn_layout.addWidget(self.profile_check)
+        telemetry_btn_layout.addWidget(self.export_btn)
+        
+        telemetry_layout.addWidget(self.telemetry_canvas)
+        telemetry_layout.addWidget(self.telemetry_label)
+        telemetry_layout.addLayout(telemetry_btn_layout)
+        telemetry_group.setLayout(telemetry_layout)
+        
+        # Hyperparameter sweep
+        sweep_group = QGroupBox("Hyperparameter Sweep")
+        sweep_layout = QVBoxLayout()
+        
+        self.sweep_mode = QComboBox()
+        self.sweep_mode.addItems(["Grid", "Random"])
+        self._add_parameter(sweep_layout, "Search:", self.sweep_mode)
+        
+        self.sweep_trials = QSpinBox()
+        self.sweep_trials.setRange(1, 1000)
+        self.sweep_trials.setValue(8)
+        self._add_parameter(sweep_layout, "Random Trials:", self.sweep_trials)
+        
+        self.sweep_progress = QProgressBar()
+        self.sweep_progress.setAlignment(Qt.AlignCenter)
+        sweep_layout.addWidget(self.sweep_progress)
+        
+        sweep_btn_layout = QHBoxLayout()
+        self.sweep_btn = QPushButton("Run Sweep")
+        self.sweep_btn.clicked.connect(self.start_sweep)
+        self.stop_sweep_btn = QPushButton("Stop Sweep")
+        self.stop_sweep_btn.clicked.connect(self.stop_sweep)
+        self.stop_sweep_btn.setEnabled(False)
+        sweep_btn_layout.addWidget(self.sweep_btn)
+        sweep_btn_layout.addWidget(self.stop_sweep_btn)
+        sweep_layout.addLayout(sweep_btn_layout)
+        sweep_group.setLayout(sweep_layout)
+        
+        # Ensemble
+        ensemble_group = QGroupBox("Ensemble")
+        ensemble_layout = QVBoxLayout()
+        
+        self.ensemble_members = QSpinBox()
+        self.ensemble_members.setRange(2, 32)
+        self.ensemble_members.setValue(5)
+        self._add_parameter(ensemble_layout, "Members:", self.ensemble_members)
+        
+        self.ensemble_method = QComboBox()
+        self.ensemble_method.addItems(["Mean", "Median", "Inverse Error"])
+        self._add_parameter(ensemble_layout, "Combine:", self.ensemble_method)
+        
+        self.ensemble_epochs = QSpinBox()
+        self.ensemble_epochs.setRange(1, 500)
+        self.ensemble_epochs.setValue(20)
+        self._add_parameter(ensemble_layout, "Epochs per Member:", self.ensemble_epochs)
+        
+        self.ensemble_mixed = QCheckBox("Mix architectures (otherwise seeds only)")
+        ensemble_layout.addWidget(self.ensemble_mixed)
+        
+        self.ensemble_progress = QProgressBar()
+        self.ensemble_progress.setAlignment(Qt.AlignCenter)
+        ensemble_layout.addWidget(self.ensemble_progress)
+        
+        ensemble_btn_layout = QHBoxLayout()
+        self.ensemble_btn = QPushButton("Train Ensemble")
+        self.ensemble_btn.clicked.connect(self.start_ensemble)
+        self.stop_ensemble_btn = QPushButton("Stop Ensemble")
+        self.stop_ensemble_btn.clicked.connect(self.stop_ensemble)
+        self.stop_ensemble_btn.setEnabled(False)
+        ensemble_btn_layout.addWidget(self.ensemble_btn)
+        ensemble_btn_layout.addWidget(self.stop_ensemble_btn)
+        ensemble_layout.addLayout(ensemble_btn_layout)
+        ensemble_group.setLayout(ensemble_layout)
+        
         layout.addWidget(params_group)
         layout.addWidget(train_group)
+        layout.addWidget(telemetry_group)
+        layout.addWidget(sweep_group)
+        layout.addWidget(ensemble_group)
         self.setLayout(layout)
     
     def _add_parameter(self, layout, label, widget):
@@ -63,40 +269,298 @@ class ModelTab(QWidget):
         row.addWidget(widget)
         layout.addLayout(row)
     
-    def start_training(self):
-        if self.data_tab.df is None:
+    def start_training(self, base_result=None):
+        out_of_core = self.out_of_core.isChecked() and base_result is None
+        if out_of_core and not self.data_tab.filename:
+            QMessageBox.warning(self, "Warning", "Please select a data file first")
+            return
+        if not out_of_core and self.data_tab.df is None:
             QMessageBox.warning(self, "Warning", "Please load data first")
             return
             
         self.train_btn.setEnabled(False)
+        self.update_btn.setEnabled(False)
         self.stop_btn.setEnabled(True)
         self.progress.setValue(0)
+        self.reset_telemetry()
+        
+        target_col = self.data_tab.target_col.currentText()
+        feature_cols = []
+        profile_dir = None
+        if self.profile_check.isChecked():
+            profile_dir = os.path.join(CACHE_DIR, "profiles", time.strftime("%Y%m%d-%H%M%S"))
+        if out_of_core:
+            # Only raw columns can be read from the memory-mapped file
+            feature_cols = [c for c in self.data_tab.selected_columns()[1:]
+                            if c in OHLCV_COLUMNS]
+        elif self.use_indicators.isChecked():
+            feature_cols = default_feature_cols(self.data_tab.df, target_col)
         
         self.trainer = ModelTrainer(
             df=self.data_tab.df,
-            target_col=self.data_tab.target_col.currentText(),
+            source=self.data_tab.filename if out_of_core else None,
+            target_col=target_col,
             seq_length=self.seq_length.value(),
-            test_size=self.test_size.value()
+            test_size=self.test_size.value(),
+            batch_size=self.batch_size.value(),
+            shuffle_buffer=self.shuffle_buffer.value(),
+            cache=self.cache_windows.isChecked(),
+            horizon=self.horizon.value(),
+            units=self.units.value(),
+            architecture=self.architecture.currentText().lower(),
+            layers=self.layers.value(),
+            dropout=self.dropout.value(),
+            learning_rate=self.learning_rate.value(),
+            jit_compile=self.jit_compile.isChecked(),
+            intra_op_threads=self.threads.value(),
+            mixed_precision=self.mixed_precision.isChecked(),
+            quantiles=(0.05, 0.5, 0.95) if self.quantile_head.isChecked() else None,
+            feature_cols=feature_cols,
+            registry=self.registry if self.use_registry.isChecked() else None,
+            base_result=base_result,
+            profile_dir=profile_dir,
+            checkpoint_dir=CHECKPOINT_DIR,
+            resume=self.resume_check.isChecked()
         )
         
         self.trainer.progress_updated.connect(self.progress.setValue)
+        self.trainer.epoch_logged.connect(self.on_epoch_logged)
+        self.trainer.batch_logged.connect(self.on_batch_logged)
         self.trainer.training_completed.connect(self.on_training_complete)
         self.trainer.error_occurred.connect(self.on_training_error)
         self.trainer.start()
     
+    def sweep_space(self):
+        # Search around the current settings
+        seq_length = self.seq_length.value()
+        units = self.units.value()
+        return {
+            'seq_length': sorted({max(1, seq_length // 2), seq_length,
+                                  min(365, seq_length * 2)}),
+            'test_size': [round(self.test_size.value(), 2)],
+            'units': sorted({max(4, units // 2), units, min(512, units * 2)}),
+            'dropout': [0.1, 0.2],
+            'learning_rate': [0.001],
+            'architecture': [self.architecture.currentText().lower()],
+            'layers': [self.layers.value()],
+        }
+    
+    def start_sweep(self):
+        if self.data_tab.df is None:
+            QMessageBox.warning(self, "Warning", "Please load data first")
+            return
+            
+        space = self.sweep_space()
+        if self.sweep_mode.currentText() == "Grid":
+            trials = grid_trials(space)
+        else:
+            trials = random_trials(space, self.sweep_trials.value())
+            
+        self.sweep_results = []
+        self.sweep_progress.setRange(0, len(trials))
+        self.sweep_progress.setValue(0)
+        self.sweep_btn.setEnabled(False)
+        self.stop_sweep_btn.setEnabled(True)
+        
+        target_col = self.data_tab.target_col.currentText()
+        self.sweeper = SweepRunner(self.data_tab.df[target_col].values, trials)
+        self.sweeper.trial_completed.connect(self.on_trial_complete)
+        self.sweeper.sweep_completed.connect(self.on_sweep_complete)
+        self.sweeper.error_occurred.connect(self.on_sweep_error)
+        self.sweeper.start()
+    
+    def stop_sweep(self):
+        if self.sweeper:
+            self.sweeper.stop()
+            self.stop_sweep_btn.setEnabled(False)
+    
+    def on_trial_complete(self, result):
+        self.sweep_results.append(result)
+        self.sweep_progress.setValue(len(self.sweep_results))
+    
+    def on_sweep_complete(self, board):
+        self.sweep_results = board
+        self.sweep_btn.setEnabled(True)
+        self.stop_sweep_btn.setEnabled(False)
+        self.sweep_finished.emit(board)
+    
+    def on_sweep_error(self, error):
+        QMessageBox.critical(self, "Error", error)
+        self.sweep_btn.setEnabled(True)
+        self.stop_sweep_btn.setEnabled(False)
+    
+    def start_ensemble(self):
+        if self.data_tab.df is None:
+            QMessageBox.warning(self, "Warning", "Please load data first")
+            return
+        
+        n_members = self.ensemble_members.value()
+        architectures = (list(architectures()) if self.ensemble_mixed.isChecked()
+                         else [self.architecture.currentText().lower()])
+        method = {"Mean": 'mean', "Median": 'median',
+                  "Inverse Error": 'weighted'}[self.ensemble_method.currentText()]
+        
+        self.ensemble_members_done = 0
+        self.ensemble_progress.setRange(0, n_members)
+        self.ensemble_progress.setValue(0)
+        self.ensemble_btn.setEnabled(False)
+        self.stop_ensemble_btn.setEnabled(True)
+        
+        self.ensembler = EnsembleRunner(
+            self.data_tab.df,
+            self.data_tab.target_col.currentText(),
+            n_members=n_members,
+            architectures=architectures,
+            method=method,
+            epochs=self.ensemble_epochs.value(),
+            seq_length=self.seq_length.value(),
+            test_size=self.test_size.value(),
+            batch_size=self.batch_size.value(),
+            shuffle_buffer=self.shuffle_buffer.value(),
+            horizon=self.horizon.value(),
+            units=self.units.value(),
+            layers=self.layers.value(),
+            dropout=self.dropout.value(),
+            learning_rate=self.learning_rate.value()
+        )
+        self.ensembler.member_completed.connect(self.on_member_complete)
+        self.ensembler.ensemble_completed.connect(self.on_ensemble_complete)
+        self.ensembler.error_occurred.connect(self.on_ensemble_error)
+        self.ensembler.start()
+    
+    def stop_ensemble(self):
+        # Members still training are dropped; finished ones are combined
+        if self.ensembler:
+            self.ensembler.stop()
+            self.stop_ensemble_btn.setEnabled(False)
+    
+    def on_member_complete(self, member):
+        self.ensemble_members_done += 1
+        self.ensemble_progress.setValue(self.ensemble_members_done)
+    
+    def on_ensemble_complete(self, result):
+        # The ensemble becomes the current model for results and prediction;
+        # it cannot be fine-tuned or exported as a single network
+        self.model_result = result
+        self.ensemble_btn.setEnabled(True)
+        self.stop_ensemble_btn.setEnabled(False)
+        self.update_btn.setEnabled(False)
+        self.export_btn.setEnabled(False)
+        self.export_runtime_btn.setEnabled(False)
+        self.ensemble_finished.emit(result)
+    
+    def on_ensemble_error(self, error):
+        QMessageBox.critical(self, "Error", error)
+        self.ensemble_btn.setEnabled(True)
+        self.stop_ensemble_btn.setEnabled(False)
+    
+    def reset_telemetry(self):
+        self.batch_losses = []
+        self.epoch_records = []
+        for line in (self.loss_line, self.speed_line, self.memory_line):
+            line.set_data([], [])
+        self.telemetry_label.setText("Training...")
+        self.telemetry_canvas.draw_idle()
+    
+    def _refresh_line(self, line, x, y):
+        line.set_data(x, y)
+        line.axes.relim()
+        line.axes.autoscale_view()
+    
+    def on_batch_logged(self, record):
+        self.batch_losses.append(record['loss'])
+        self._refresh_line(self.loss_line, range(len(self.batch_losses)), self.batch_losses)
+        self.telemetry_canvas.draw_idle()
+    
+    def on_epoch_logged(self, record):
+        self.epoch_records.append(record)
+        epochs = [r['epoch'] + 1 for r in self.epoch_records]
+        self._refresh_line(self.speed_line, epochs,
+                           [r['samples_per_s'] for r in self.epoch_records])
+        self._refresh_line(self.memory_line, epochs,
+                           [r['rss_bytes'] / 2 ** 20 for r in self.epoch_records])
+        self.telemetry_canvas.draw_idle()
+        
+        data_share = record['data_s'] / record['seconds'] * 100 if record['seconds'] else 0
+        self.telemetry_label.setText(
+            f"Epoch {record['epoch'] + 1}: {record['seconds']:.2f}s, "
+            f"{record['samples_per_s']:,.0f} samples/s, loss {record['loss']:.6f}, "
+            f"input pipeline ~{data_share:.0f}%, "
+            f"RSS {record['rss_bytes'] / 2 ** 20:,.0f} MB "
+            f"(peak {record['peak_rss_bytes'] / 2 ** 20:,.0f} MB)"
+        )
+    
+    def export_telemetry(self):
+        telemetry = (self.model_result or {}).get('telemetry')
+        if telemetry is None:
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Training Trace", "training_trace.json",
+            "JSON Files (*.json);;CSV Files (*.csv)"
+        )
+        if path:
+            try:
+                telemetry.export(path)
+            except OSError as e:
+                QMessageBox.critical(self, "Error", f"Export failed: {e}")
+    
+    def export_runtime(self):
+        # NumPy weights (.npz) or a TFLite flatbuffer for TensorFlow-free use
+        if self.model_result is None:
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Model Runtime", "model.npz",
+            "NumPy Runtime (*.npz);;TensorFlow Lite (*.tflite)"
+        )
+        if not path:
+            return
+        try:
+            import core
+            if path.endswith('.tflite'):
+                core.export(self.model_result, os.path.splitext(path)[0] + '.npz',
+                            tflite_path=path)
+            else:
+                core.export(self.model_result, path)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Export failed: {e}")
+    
+    def update_training(self):
+        if self.model_result is None:
+            return
+        self.start_training(base_result=self.model_result)
+    
     def stop_training(self):
+        # Only asks the trainer to stop; it finishes the current batch,
+        # saves a checkpoint and then reports back as usual
         if self.trainer:
             self.trainer.stop()
-            self.train_btn.setEnabled(True)
             self.stop_btn.setEnabled(False)
+            self.stop_btn.setText("Stopping...")
     
     def on_training_complete(self, result):
         self.model_result = result
         self.train_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
-        QMessageBox.information(self, "Success", "Training completed!")
+        self.stop_btn.setText("Stop")
+        self.update_btn.setEnabled(True)
+        self.export_btn.setEnabled(result.get('telemetry') is not None)
+        self.export_runtime_btn.setEnabled(True)
+        if result.get('cached'):
+            self.telemetry_label.setText("Loaded saved model; no training run")
+        if result.get('stopped'):
+            QMessageBox.information(self, "Stopped",
+                                    "Training stopped; tick \"Resume from checkpoint\" "
+                                    "to continue where it left off")
+        elif result.get('incremental'):
+            QMessageBox.information(self, "Success", "Model updated with new rows")
+        elif result.get('cached'):
+            QMessageBox.information(self, "Success", "Loaded saved model")
+        else:
+            QMessageBox.information(self, "Success", "Training completed!")
     
     def on_training_error(self, error):
         QMessageBox.critical(self, "Error", error)
         self.train_btn.setEnabled(True)
+        self.update_btn.setEnabled(self.model_result is not None)
         self.stop_btn.setEnabled(False)
+        self.stop_btn.setText("Stop")
@@ -0,0 +1,186 @@
+import glob
+import os
+import time
+import numpy as np
+
+# One shared model over many tickers. Every series is scaled with its own
+# min/max, but the parameters live in flat arrays and all series are stored
+# back to back in one buffer, so scaling, windowing and forecasting stay
+# vectorized across tickers.
+
+
+def load_directory(path, target_col, pattern="*.csv"):
+    from data_loader import load_csv
+
+    series = {}
+    for filename in sorted(glob.glob(os.path.join(path, pattern))):
+        name = os.path.splitext(os.path.basename(filename))[0]
+        series[name] = load_csv(filename, usecols=[target_col])[target_col].values
+    return series
+
+
+def from_long_frame(df, ticker_col, target_col, date_col=None):
+    if date_col is not None:
+        df = df.sort_values([ticker_col, date_col], kind="stable")
+    return {name: group[target_col].values
+            for name, group in df.groupby(ticker_col, sort=True)}
+
+
+class MultiSeriesPreprocessor:
+    def __init__(self, seq_length=60, feature_range=(0, 1)):
+        self.seq_length = seq_length
+        self.feature_range = feature_range
+        self.names = []
+        self.data_min = None
+        self.scale = None
+        self.offsets = None
+        self.lengths = None
+        self.scaled_data = None
+
+    def fit_transform(self, series, test_size=0.0):
+        # Series too short to produce a single window are skipped. Min/max
+        # come from the rows each series' training windows read.
+        series = {name: np.asarray(values, dtype=np.float64)
+                  for name, values in series.items()
+                  if len(values) > self.seq_length}
+        if not series:
+            raise ValueError(f"no series longer than seq_length={self.seq_length}")
+        self.names = list(series)
+        values = list(series.values())
+
+        self.lengths = np.array([len(v) for v in values])
+        self.offsets = np.concatenate([[0], np.cumsum(self.lengths)[:-1]])
+        flat = np.concatenate(values)
+
+        lo, hi = self.feature_range
+        fit_rows = ((self.lengths - self.seq_length) * (1 - test_size)).astype(int) + self.seq_length
+        self.data_min = np.array([v[:n].min() for v, n in zip(values, fit_rows)])
+        data_range = np.array([v[:n].max() for v, n in zip(values, fit_rows)]) - self.data_min
+        data_range[data_range == 0] = 1.0
+        self.scale = (hi - lo) / data_range
+
+        ids = np.repeat(np.arange(len(values)), self.lengths)
+        self.scaled_data = (flat - self.data_min[ids]) * self.scale[ids] + lo
+        return self.scaled_data
+
+    def transform(self, values, series_idx):
+        lo, _ = self.feature_range
+        series_idx = np.asarray(series_idx)
+        return (np.asarray(values) - self.data_min[series_idx]) * self.scale[series_idx] + lo
+
+    def inverse_transform(self, scaled, series_idx):
+        lo, _ = self.feature_range
+        series_idx = np.asarray(series_idx)
+        return (np.asarray(scaled) - lo) / self.scale[series_idx] + self.data_min[series_idx]
+
+    def window_index(self, test_size=0.0):
+        # Start offsets (into the flat buffer) of every window that stays
+        # inside one series, split chronologically per series
+        counts = self.lengths - self.seq_length
+        ids = np.repeat(np.arange(len(counts)), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        starts = self.offsets[ids] + local
+
+        cutoff = (counts * (1 - test_size)).astype(int)
+        train = local < cutoff[ids]
+        return (starts[train], ids[train]), (starts[~train], ids[~train])
+
+    def last_windows(self):
+        # (S, seq_length) scaled tail of every series
+        ends = self.offsets + self.lengths
+        idx = ends[:, None] - self.seq_length + np.arange(self.seq_length)
+        return self.scaled_data[idx]
+
+
+def multi_series_dataset(scaled_data, starts, series_ids, seq_length, batch_size=32,
+                         shuffle_buffer=10000, with_ids=True):
+    import tensorflow as tf
+
+    # Shuffling the window index interleaves all tickers in one stream
+    data = tf.constant(scaled_data[:, None], dtype=tf.float32)
+    offsets = tf.range(seq_length, dtype=tf.int64)
+
+    def gather(idx, ids):
+        x = tf.gather(data, idx[:, None] + offsets)
+        y = tf.gather(data[:, 0], idx[:, None] + seq_length)
+        if with_ids:
+            return (x, ids), y
+        return x, y
+
+    dataset = tf.data.Dataset.from_tensor_slices(
+        (starts.astype(np.int64), series_ids.astype(np.int32))
+    )
+    if shuffle_buffer:
+        dataset = dataset.shuffle(shuffle_buffer)
+    return dataset.batch(batch_size).map(
+        gather, num_parallel_calls=tf.data.AUTOTUNE
+    ).prefetch(tf.data.AUTOTUNE)
+
+
+def train_multi_asset(series, seq_length=60, test_size=0.2, epochs=50, batch_size=256,
+                      shuffle_buffer=10000, embedding_dim=8, units=50, on_progress=None):
+    import tensorflow as tf
+    from model_builder import ModelBuilder
+
+    preprocessor = MultiSeriesPreprocessor(seq_length)
+    scaled = preprocessor.fit_transform(series, test_size)
+    (train_starts, train_ids), (test_starts, test_ids) = preprocessor.window_index(test_size)
+
+    with_ids = embedding_dim > 0
+    train_dataset = multi_series_dataset(scaled, train_starts, train_ids, seq_length,
+                                         batch_size, shuffle_buffer, with_ids)
+    callbacks = [tf.keras.callbacks.EarlyStopping(monitor='loss', patience=5,
+                                                  restore_best_weights=True)]
+    fit_kwargs = {}
+    if len(test_starts):
+        fit_kwargs['validation_data'] = multi_series_dataset(
+            scaled, test_starts, test_ids, seq_length, batch_size, 0, with_ids
+        )
+    if on_progress is not None:
+        callbacks.append(tf.keras.callbacks.LambdaCallback(
+            on_epoch_end=lambda epoch, logs: on_progress(int((epoch + 1) / epochs * 100))
+        ))
+
+    if with_ids:
+        model = ModelBuilder.build_multi_series(
+            (seq_length, 1), len(preprocessor.names),
+            embedding_dim=embedding_dim, units=(units, units)
+        )
+    else:
+        model = ModelBuilder.build_lstm((seq_length, 1), units=(units, units))
+
+    start = time.time()
+    history = model.fit(train_dataset, epochs=epochs, callbacks=callbacks,
+                        verbose=0, **fit_kwargs)
+
+    return {
+        'model': model,
+        'preprocessor': preprocessor,
+        'history': history.history,
+        'with_ids': with_ids,
+        'train_seconds': time.time() - start
+    }
+
+
+def forecast_all(result, days):
+    # One batched recursive forecast for every ticker at once
+    import tensorflow as tf
+    from forecaster import RecursiveForecaster
+
+    model = result['model']
+    preprocessor = result['preprocessor']
+    seq_length = preprocessor.seq_length
+    n_series = len(preprocessor.names)
+
+    if result['with_ids']:
+        ids = tf.constant(np.arange(n_series, dtype=np.int32))
+        step = tf.function(lambda x: model([x, ids], training=False))
+        step_fn = lambda window: step(window).numpy()
+        forecaster = RecursiveForecaster(None, seq_length, step_fn=step_fn,
+                                         horizon=model.output_shape[-1])
+    else:
+        forecaster = RecursiveForecaster(model, seq_length)
+
+    scaled = forecaster.forecast(preprocessor.last_windows()[..., None], days)
+    prices = preprocessor.inverse_transform(scaled, np.arange(n_series)[:, None])
+    return dict(zip(preprocessor.names, prices))
@@ -0,0 +1,137 @@
+import numpy as np
+import matplotlib.dates as mdates
+from matplotlib.ticker import AutoLocator, ScalarFormatter
+
+# Line plots that stay fast for long series: each line keeps its full data
+# but only hands matplotlib a min/max envelope of the visible x-range at
+# screen resolution, recomputed whenever the view or the canvas changes.
+# Line2D artists are created once and updated with set_data.
+
+
+def as_numeric_x(x):
+    # Datetimes become matplotlib date numbers; everything else float
+    x = np.asarray(x)
+    if x.dtype == object and len(x) and hasattr(x[0], 'year'):
+        x = x.astype('datetime64[ns]')
+    if np.issubdtype(x.dtype, np.datetime64):
+        epoch = np.datetime64(mdates.get_epoch(), 'ns')
+        return (x.astype('datetime64[ns]') - epoch) / np.timedelta64(1, 'D'), True
+    return x.astype(np.float64), False
+
+
+def minmax_decimate(x, y, n_bins):
+    # Keep the lowest and highest point of each of n_bins buckets, in x
+    # order, so spikes survive at any zoom level
+    n = len(y)
+    if n <= 2 * n_bins:
+        return x, y
+    chunk = -(-n // n_bins)
+    pad = n_bins * chunk - n
+    padded = np.concatenate([y, np.repeat(y[-1:], pad)]).reshape(n_bins, chunk)
+    base = np.arange(n_bins)[:, None] * chunk
+    lo = padded.argmin(axis=1)[:, None]
+    hi = padded.argmax(axis=1)[:, None]
+    idx = np.sort(np.hstack([lo, hi]), axis=1) + base
+    idx = np.minimum(idx.ravel(), n - 1)
+    return x[idx], y[idx]
+
+
+class DecimatedLine:
+    def __init__(self, ax, x, y, **style):
+        self.line, = ax.plot([], [], **style)
+        self.set_data(x, y)
+
+    def set_data(self, x, y):
+        # Kept in ascending x for the range lookups; data such as a CSV
+        # listed newest-first arrives in descending order
+        x, self.is_date = as_numeric_x(x)
+        y = np.asarray(y, dtype=np.float64).ravel()
+        if len(x) > 1 and not (np.diff(x) >= 0).all():
+            order = np.argsort(x, kind='stable')
+            x, y = x[order], y[order]
+        self.x, self.y = x, y
+
+    def limits(self):
+        return np.nanmin(self.x), np.nanmax(self.x), np.nanmin(self.y), np.nanmax(self.y)
+
+    def render(self, x0, x1, n_bins):
+        # One extra point either side keeps the line running off-screen
+        i0 = max(np.searchsorted(self.x, x0) - 1, 0)
+        i1 = min(np.searchsorted(self.x, x1, side='right') + 1, len(self.x))
+        self.line.set_data(*minmax_decimate(self.x[i0:i1], self.y[i0:i1], n_bins))
+
+
+class FastPlot:
+    def __init__(self, figure, canvas):
+        self.figure = figure
+        self.canvas = canvas
+        self.ax = figure.add_subplot(111)
+        self.lines = {}
+        # Filled bands are drawn as-is; they are meant for short spans such
+        # as forecast intervals
+        self.bands = {}
+        self._rendering = False
+        self.ax.callbacks.connect('xlim_changed', lambda ax: self.render())
+        canvas.mpl_connect('resize_event', lambda event: self.render())
+
+    def set_series(self, name, x, y, **style):
+        if len(y) == 0:
+            self.remove(name)
+            return
+        if name in self.lines:
+            self.lines[name].set_data(x, y)
+            self.lines[name].line.set(**style)
+        else:
+            self.lines[name] = DecimatedLine(self.ax, x, y, **style)
+
+    def set_band(self, name, x, low, high, **style):
+        self.remove(name)
+        x, _ = as_numeric_x(x)
+        low = np.asarray(low, dtype=np.float64).ravel()
+        high = np.asarray(high, dtype=np.float64).ravel()
+        self.bands[name] = (self.ax.fill_between(x, low, high, **style),
+                            (np.nanmin(x), np.nanmax(x), np.nanmin(low), np.nanmax(high)))
+
+    def remove(self, name):
+        line = self.lines.pop(name, None)
+        if line is not None:
+            line.line.remove()
+        band = self.bands.pop(name, None)
+        if band is not None:
+            band[0].remove()
+
+    def clear(self):
+        for name in list(self.lines) + list(self.bands):
+            self.remove(name)
+
+    def autoscale(self):
+        if not self.lines:
+            return
+        limits = np.array([line.limits() for line in self.lines.values()] +
+                          [band[1] for band in self.bands.values()])
+        x0, x1 = limits[:, 0].min(), limits[:, 1].max()
+        y0, y1 = limits[:, 2].min(), limits[:, 3].max()
+        pad = (y1 - y0) * 0.05 or 1.0
+        if any(line.is_date for line in self.lines.values()):
+            locator = mdates.AutoDateLocator()
+            self.ax.xaxis.set_major_locator(locator)
+            self.ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        else:
+            self.ax.xaxis.set_major_locator(AutoLocator())
+            self.ax.xaxis.set_major_formatter(ScalarFormatter())
+        self.ax.set_ylim(y0 - pad, y1 + pad)
+        self.ax.set_xlim(x0, x1 if x1 > x0 else x0 + 1, emit=False)
+        self.render()
+
+    def render(self):
+        if self._rendering or not self.lines:
+            return
+        self._rendering = True
+        try:
+            x0, x1 = self.ax.get_xlim()
+            n_bins = max(int(self.ax.bbox.width), 1)
+            for line in self.lines.values():
+                line.render(x0, x1, n_bins)
+            self.canvas.draw_idle()
+        finally:
+            self._rendering = False
@@ -1,6 +1,7 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                             QPushButton, QGroupBox, QTextEdit, QSplitter,
-                            QSpinBox, QMessageBox)
+                            QSpinBox, QMessageBox, QComboBox, QLineEdit,
+                            QDoubleSpinBox, QFileDialog)
 from PyQt5.QtCore import Qt
 from matplotlib.backends.backend_qt5agg import (
     FigureCanvas, NavigationToolbar2QT as NavigationToolbar
@@ -8,12 +9,16 @@ from matplotlib.backends.backend_qt5agg import (
 from matplotlib.figure import Figure
 import numpy as np
 import pandas as pd
+import core
+from plotting import FastPlot
+from trainer import StreamRunner
 
 class PredictTab(QWidget):
     def __init__(self, data_tab, model_tab):
         super().__init__()
         self.data_tab = data_tab
         self.model_tab = model_tab
+        self.streamer = None
         self.init_ui()
         
     def init_ui(self):
@@ -26,6 +31,7 @@ class PredictTab(QWidget):
         self.figure = Figure(figsize=(10, 6))
         self.canvas = FigureCanvas(self.figure)
         self.toolbar = NavigationToolbar(self.canvas, self)
+        self.plot = FastPlot(self.figure, self.canvas)
         
         plot_layout.addWidget(self.toolbar)
         plot_layout.addWidget(self.canvas)
@@ -48,9 +54,60 @@ class PredictTab(QWidget):
         predict_btn.clicked.connect(self.predict)
         
         params_layout.addWidget(self.days_spinbox)
+        params_layout.addWidget(QLabel("Intervals:"))
+        self.interval_method = QComboBox()
+        self.interval_method.addItems(["None", "MC Dropout", "Quantile Head"])
+        params_layout.addWidget(self.interval_method)
+        params_layout.addWidget(QLabel("Samples:"))
+        self.mc_samples = QSpinBox()
+        self.mc_samples.setRange(10, 2000)
+        self.mc_samples.setValue(100)
+        params_layout.addWidget(self.mc_samples)
         params_layout.addWidget(predict_btn)
         params_group.setLayout(params_layout)
         
+        # Live stream
+        stream_group = QGroupBox("Live Stream")
+        stream_layout = QVBoxLayout()
+        
+        source_layout = QHBoxLayout()
+        self.stream_source = QComboBox()
+        self.stream_source.addItems(["Replay CSV", "Tail File", "Socket"])
+        self.stream_location = QLineEdit()
+        self.stream_location.setPlaceholderText("file path, or host:port / socket path")
+        browse_btn = QPushButton("Browse...")
+        browse_btn.clicked.connect(self.browse_stream_file)
+        source_layout.addWidget(QLabel("Source:"))
+        source_layout.addWidget(self.stream_source)
+        source_layout.addWidget(self.stream_location)
+        source_layout.addWidget(browse_btn)
+        
+        stream_params = QHBoxLayout()
+        stream_params.addWidget(QLabel("Replay Speed:"))
+        self.stream_speed = QDoubleSpinBox()
+        self.stream_speed.setRange(0, 1000000)
+        self.stream_speed.setValue(1.0)
+        self.stream_speed.setSpecialValueText("Max")
+        stream_params.addWidget(self.stream_speed)
+        stream_params.addWidget(QLabel("Bar Seconds:"))
+        self.bar_seconds = QDoubleSpinBox()
+        self.bar_seconds.setRange(0, 86400)
+        self.bar_seconds.setSpecialValueText("Per tick")
+        stream_params.addWidget(self.bar_seconds)
+        self.stream_start_btn = QPushButton("Start Stream")
+        self.stream_start_btn.clicked.connect(self.start_stream)
+        self.stream_stop_btn = QPushButton("Stop")
+        self.stream_stop_btn.clicked.connect(self.stop_stream)
+        self.stream_stop_btn.setEnabled(False)
+        stream_params.addWidget(self.stream_start_btn)
+        stream_params.addWidget(self.stream_stop_btn)
+        
+        self.stream_status = QLabel("")
+        stream_layout.addLayout(source_layout)
+        stream_layout.addLayout(stream_params)
+        stream_layout.addWidget(self.stream_status)
+        stream_group.setLayout(stream_layout)
+        
         # Results
         results_group = QGroupBox("Prediction Results")
         self.results_text = QTextEdit()
@@ -61,6 +118,7 @@ class PredictTab(QWidget):
         results_group.setLayout(results_layout)
         
         controls_layout.addWidget(params_group)
+        controls_layout.addWidget(stream_group)
         controls_layout.addWidget(results_group)
         controls_widget.setLayout(controls_layout)
         
@@ -73,69 +131,158 @@ class PredictTab(QWidget):
         self.setLayout(layout)
     
     def predict(self):
-        if not hasattr(self.model_tab, 'model_result'):
+        if getattr(self.model_tab, 'model_result', None) is None:
             QMessageBox.warning(self, "Warning", "Train model first")
             return
             
         try:
             days = self.days_spinbox.value()
-            result = self.model_tab.model_result
-            model = result['model']
-            preprocessor = result['preprocessor']
             target_col = self.data_tab.target_col.currentText()
-            seq_length = preprocessor.seq_length
-            
-            # Get last sequence
-            last_seq = self.data_tab.df[target_col].values[-seq_length:]
-            scaled_seq = preprocessor.scaler.transform(last_seq.reshape(-1, 1))
-            
-            # Generate predictions
-            predictions = []
-            current_seq = scaled_seq.copy()
-            
-            for _ in range(days):
-                x_input = current_seq[-seq_length:].reshape(1, seq_length, 1)
-                pred = model.predict(x_input, verbose=0)[0, 0]
-                predictions.append(pred)
-                current_seq = np.append(current_seq, pred)
-            
-            # Inverse transform
-            predicted_prices = preprocessor.scaler.inverse_transform(
-                np.array(predictions).reshape(-1, 1)
-            ).flatten()
+            # Out-of-core models forecast from their saved tail
+            df = self.data_tab.df
+            series = df[target_col].values if df is not None else None
+            method = self.interval_method.currentIndex()
+            bands = None
+            if method:
+                # Median with a 5-95% band
+                intervals = core.forecast_intervals(
+                    self.model_tab.model_result,
+                    days,
+                    series=series,
+                    method='mc' if method == 1 else 'quantile',
+                    samples=self.mc_samples.value()
+                )
+                levels = np.asarray(intervals['quantiles'])
+                pick = lambda q: intervals['bands'][int(np.argmin(np.abs(levels - q)))]
+                predicted_prices = pick(0.5)
+                bands = (pick(0.05), pick(0.95))
+            else:
+                predicted_prices = core.forecast(
+                    self.model_tab.model_result,
+                    days,
+                    series=series
+                )
             
             # Generate dates
             date_col = self.data_tab.date_col.currentText()
-            if date_col != "None":
-                last_date = pd.to_datetime(self.data_tab.df[date_col].iloc[-1])
+            if date_col != "None" and df is not None:
+                last_date = pd.to_datetime(df[date_col].iloc[-1])
                 dates = pd.date_range(start=last_date, periods=days+1)[1:]
+                x = dates.to_numpy()
                 date_labels = [d.strftime('%Y-%m-%d') for d in dates]
             else:
+                x = np.arange(1, days + 1)
                 date_labels = [f"Day {i+1}" for i in range(days)]
             
             # Update plot
-            self.figure.clear()
-            ax = self.figure.add_subplot(111)
-            
-            ax.plot(date_labels, predicted_prices, 'g-', marker='o', label='Predicted Price')
+            self.plot.remove('live')
+            self.plot.remove('live_forecast')
+            self.plot.set_series('predicted', x, predicted_prices, color='g',
+                                 label='Median Price' if bands else 'Predicted Price')
+            if bands:
+                self.plot.set_band('interval', x, *bands, color='g', alpha=0.2,
+                                   label='5-95% Interval')
+            else:
+                self.plot.remove('interval')
+            ax = self.plot.ax
             ax.set_title("Future Price Prediction")
-            ax.set_xlabel("Date")
+            ax.set_xlabel("Date" if np.issubdtype(x.dtype, np.datetime64) else "Day")
             ax.set_ylabel("Price ($)")
             ax.legend()
             ax.grid(True)
             
-            # Rotate date labels if needed
-            if len(date_labels[0]) > 6:  # If using actual dates not "Day X"
-                for label in ax.get_xticklabels():
-                    label.set_rotation(45)
-                    label.set_ha('right')
-            
+            self.plot.autoscale()
             self.figure.tight_layout()
-            self.canvas.draw()
             
             # Update results text
-            results = [f"{date}: {price:.2f}" for date, price in zip(date_labels, predicted_prices)]
+            if bands:
+                results = [f"{date}: {price:.2f}  [{low:.2f}, {high:.2f}]"
+                           for date, price, low, high in zip(date_labels, predicted_prices,
+                                                              *bands)]
+            else:
+                results = [f"{date}: {price:.2f}" for date, price in zip(date_labels, predicted_prices)]
             self.results_text.setPlainText("Predictions:\n" + "\n".join(results))
             
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Prediction failed: {str(e)}")
+
+    def browse_stream_file(self):
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "Select Feed File", "", "CSV/Text Files (*.csv *.txt);;All Files (*)"
+        )
+        if filename:
+            self.stream_location.setText(filename)
+    
+    def start_stream(self):
+        if getattr(self.model_tab, 'model_result', None) is None:
+            QMessageBox.warning(self, "Warning", "Train model first")
+            return
+        location = self.stream_location.text().strip()
+        if not location:
+            QMessageBox.warning(self, "Warning", "Choose a stream source")
+            return
+        
+        source = ('replay', 'tail', 'socket')[self.stream_source.currentIndex()]
+        date_col = self.data_tab.date_col.currentText()
+        self.streamer = StreamRunner(
+            self.model_tab.model_result, source, location,
+            target=self.data_tab.target_col.currentText(),
+            date=None if date_col == "None" else date_col,
+            speed=self.stream_speed.value(),
+            bar_seconds=self.bar_seconds.value(),
+            days=self.days_spinbox.value()
+        )
+        self.streamer.forecast_updated.connect(self.on_stream_forecast)
+        self.streamer.stream_finished.connect(self.on_stream_finished)
+        self.streamer.error_occurred.connect(self.on_stream_error)
+        
+        self.plot.clear()
+        ax = self.plot.ax
+        if ax.get_legend() is not None:
+            ax.get_legend().remove()
+        ax.set_title("Live Forecast")
+        ax.set_xlabel("Bar")
+        ax.set_ylabel("Price ($)")
+        ax.grid(True)
+        self.stream_status.setText("Waiting for ticks...")
+        self.stream_start_btn.setEnabled(False)
+        self.stream_stop_btn.setEnabled(True)
+        self.streamer.start()
+    
+    def stop_stream(self):
+        if self.streamer is not None:
+            self.streamer.stop()
+    
+    def on_stream_forecast(self, update):
+        history = np.asarray(update['history'])
+        bars = update['bars']
+        x = np.arange(bars - len(history) + 1, bars + 1)
+        forecast = update['forecast']
+        
+        self.plot.set_series('live', x, history, color='b', label='Live Price')
+        self.plot.set_series('live_forecast', np.arange(bars, bars + len(forecast) + 1),
+                             np.concatenate([[update['close']], forecast]),
+                             color='g', linestyle='--', label='Forecast')
+        if self.plot.ax.get_legend() is None:
+            self.plot.ax.legend()
+        self.plot.autoscale()
+        
+        stats = update['stats']
+        self.stream_status.setText(
+            f"{stats['ticks']} ticks, {bars} bars, {stats['ticks_per_s']:.0f} ticks/s, "
+            f"next: {forecast[0]:.2f}"
+        )
+    
+    def on_stream_finished(self, stats):
+        self.stream_start_btn.setEnabled(True)
+        self.stream_stop_btn.setEnabled(False)
+        self.stream_status.setText(
+            f"Stream ended: {stats['ticks']} ticks, {stats['bars']} bars, "
+            f"{stats['forecasts']} forecasts in {stats['seconds']:.1f}s"
+        )
+    
+    def on_stream_error(self, error):
+        self.stream_start_btn.setEnabled(True)
+        self.stream_stop_btn.setEnabled(False)
+        self.stream_status.setText("")
+        QMessageBox.critical(self, "Error", f"Stream failed: {error}")
@@ -1,24 +1,171 @@
 import numpy as np
 from sklearn.preprocessing import MinMaxScaler
+from windows import SequenceWindows
+
+
+def _scaler_state(scaler):
+    if scaler is None:
+        return None
+    return {
+        'data_min': scaler.data_min_.tolist(),
+        'data_max': scaler.data_max_.tolist(),
+        'n_samples_seen': int(scaler.n_samples_seen_),
+    }
+
+
+def _scaler_from_state(state):
+    if state is None:
+        return None
+    # Fitting on the two extreme rows reproduces the original min_/scale_
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    scaler.fit(np.array([state['data_min'], state['data_max']], dtype=np.float64))
+    scaler.n_samples_seen_ = state['n_samples_seen']
+    return scaler
+
 
 class DataPreprocessor:
-    def __init__(self, target_col='Close', seq_length=60):
+    # fit() learns the scaling from training rows only; transform() applies
+    # it to any rows. The last seq_length rows are kept (raw and scaled) so
+    # forecasts start from a cached tail instead of rescaling the data.
+
+    def __init__(self, target_col='Close', seq_length=60, feature_cols=None):
         self.target_col = target_col
         self.seq_length = seq_length
+        self.feature_cols = list(feature_cols or [])
         self.scaler = MinMaxScaler(feature_range=(0, 1))
-        
-    def preprocess(self, df):
-        # Extract and scale target column
-        target_data = df[self.target_col].values.reshape(-1, 1)
-        scaled_data = self.scaler.fit_transform(target_data)
-        
-        # Create sequences
-        X, y = [], []
-        for i in range(len(scaled_data) - self.seq_length):
-            X.append(scaled_data[i:i+self.seq_length])
-            y.append(scaled_data[i+self.seq_length])
-            
-        return np.array(X), np.array(y), self.scaler
-    
+        self.feature_scaler = None
+        self.scaled_data = None
+        self.n_rows = 0
+        self._tail_raw = None
+        self._tail = None
+
+    @property
+    def n_features(self):
+        return 1 + len(self.feature_cols)
+
+    def raw_matrix(self, data):
+        # DataFrame -> (n, F) rows in model column order; arrays pass through
+        if hasattr(data, 'columns'):
+            if not self.feature_cols:
+                return data[self.target_col].to_numpy(dtype=np.float64).reshape(-1, 1)
+            return self.feature_matrix(data)
+        data = np.asarray(data, dtype=np.float64)
+        return data.reshape(-1, 1) if data.ndim == 1 else data
+
+    def feature_matrix(self, df):
+        from features import feature_frame
+
+        frame = feature_frame(df, self.target_col, self.feature_cols)
+        return frame[[self.target_col] + self.feature_cols].to_numpy(dtype=np.float64)
+
+    def n_windows(self, n_rows, horizon=1):
+        # Windows whose whole horizon of targets lies within n_rows
+        return max(n_rows - self.seq_length - horizon + 1, 0)
+
+    def fit_rows(self, n_rows, test_size=0.0, horizon=1):
+        # Rows read by the training windows and their targets in a
+        # chronological split
+        split_idx = int(self.n_windows(n_rows, horizon) * (1 - test_size))
+        return split_idx + self.seq_length + horizon - 1
+
+    def fit(self, data):
+        # Column 0 is the target; every column gets its own min/max. The
+        # target scaler is kept separately for inverse-transforming outputs.
+        rows = self.raw_matrix(data)
+        self.scaler = MinMaxScaler(feature_range=(0, 1)).fit(rows[:, :1])
+        if self.feature_cols:
+            self.feature_scaler = MinMaxScaler(feature_range=(0, 1)).fit(rows)
+        return self
+
+    def fit_range(self, data_min, data_max, n_samples):
+        # Scaling from per-column extremes computed elsewhere, e.g. by a
+        # chunked scan of a series that does not fit in memory
+        data_min = np.asarray(data_min, dtype=np.float64).ravel()
+        data_max = np.asarray(data_max, dtype=np.float64).ravel()
+        self.scaler = _scaler_from_state({'data_min': data_min[:1].tolist(),
+                                          'data_max': data_max[:1].tolist(),
+                                          'n_samples_seen': int(n_samples)})
+        if self.feature_cols:
+            self.feature_scaler = _scaler_from_state({'data_min': data_min.tolist(),
+                                                      'data_max': data_max.tolist(),
+                                                      'n_samples_seen': int(n_samples)})
+        return self
+
+    def transform(self, data):
+        rows = self.raw_matrix(data)
+        if self.feature_cols:
+            return self.feature_scaler.transform(rows)
+        return self.scaler.transform(rows)
+
+    def attach(self, data, scaled=None):
+        # Adopt the full data set with the fitted scaling
+        rows = self.raw_matrix(data)
+        self.scaled_data = self.transform(rows) if scaled is None else scaled
+        self.n_rows = len(rows)
+        self._tail_raw = rows[-self.seq_length:, 0].copy()
+        self._tail = np.array(self.scaled_data[-self.seq_length:])
+        return self.scaled_data
+
+    def preprocess(self, data, materialize=True, test_size=0.0, horizon=1):
+        # Scale with statistics of the training rows only, then window
+        rows = self.raw_matrix(data)
+        self.fit(rows[:self.fit_rows(len(rows), test_size, horizon)])
+        self.attach(rows)
+        return self._windows(materialize)
+
+    def last_window(self, values=None):
+        # (seq_length, F) scaled input for the next forecast. For target-only
+        # models, rows appended to values since the last call are scaled and
+        # pushed onto the cached tail; a different series is rescaled.
+        if values is None or self.feature_cols:
+            return self._tail
+        values = np.asarray(values, dtype=np.float64).ravel()
+        seq_length, seen = self.seq_length, self.n_rows
+        extends = (self._tail_raw is not None and seq_length <= seen <= len(values)
+                   and np.array_equal(values[seen - seq_length:seen], self._tail_raw))
+        if not extends:
+            window = values[-seq_length:]
+            self._tail_raw, self._tail = window.copy(), self.transform(window)
+        elif len(values) > seen:
+            new = values[max(seen, len(values) - seq_length):]
+            self._tail_raw = np.concatenate([self._tail_raw, new])[-seq_length:]
+            self._tail = np.concatenate([self._tail, self.transform(new)])[-seq_length:]
+        self.n_rows = len(values)
+        return self._tail
+
+    def _windows(self, materialize):
+        # Create sequences as strided views over the scaled series
+        windows = SequenceWindows(self.scaled_data, self.seq_length)
+        targets = windows.target_matrix()
+        if not materialize:
+            return windows, targets, self.scaler
+
+        return windows.materialize(), targets.copy(), self.scaler
+
     def inverse_transform(self, data):
         return self.scaler.inverse_transform(data)
+
+    def get_state(self):
+        # Plain lists and numbers only, so the state can be stored as JSON
+        return {
+            'target_col': self.target_col,
+            'seq_length': self.seq_length,
+            'feature_cols': self.feature_cols,
+            'scaler': _scaler_state(self.scaler),
+            'feature_scaler': _scaler_state(self.feature_scaler),
+            'n_rows': self.n_rows,
+            'tail_raw': None if self._tail_raw is None else self._tail_raw.tolist(),
+            'tail': None if self._tail is None else np.asarray(self._tail).tolist(),
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        preprocessor = cls(state['target_col'], state['seq_length'],
+                           state.get('feature_cols'))
+        preprocessor.scaler = _scaler_from_state(state['scaler'])
+        preprocessor.feature_scaler = _scaler_from_state(state.get('feature_scaler'))
+        preprocessor.n_rows = state.get('n_rows', 0)
+        if state.get('tail') is not None:
+            preprocessor._tail_raw = np.array(state['tail_raw'], dtype=np.float64)
+            preprocessor._tail = np.array(state['tail'], dtype=np.float64)
+        return preprocessor
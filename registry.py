@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import numpy as np
+from data_loader import CACHE_DIR
+
+REGISTRY_DIR = os.path.join(CACHE_DIR, "models")
+DEFAULT_BUDGET = 2 * 1024 ** 3
+
+MODEL_FILE = "model.keras"
+QUANTILE_FILE = "quantile_model.keras"
+PREPROCESSOR_FILE = "preprocessor.json"
+METADATA_FILE = "metadata.json"
+RUNTIME_FILE = "runtime.npz"
+HASH_ROWS = 1 << 20
+
+
+def model_key(series, config):
+    # Content hash of the target series plus everything that shapes the
+    # model. The series is hashed in chunks so a memory-mapped one is never
+    # loaded at once; the digest equals hashing all the bytes in one go.
+    digest = hashlib.sha256()
+    for start in range(0, len(series), HASH_ROWS):
+        digest.update(np.ascontiguousarray(series[start:start + HASH_ROWS],
+                                           dtype=np.float64).tobytes())
+    digest.update(json.dumps(config, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+class ModelRegistry:
+    def __init__(self, root=REGISTRY_DIR, max_bytes=DEFAULT_BUDGET):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def path(self, key):
+        return os.path.join(self.root, key)
+
+    def runtime_path(self, key):
+        path = os.path.join(self.path(key), RUNTIME_FILE)
+        return path if os.path.exists(path) else None
+
+    def contains(self, key):
+        # Entries without a JSON preprocessor state predate it and are retrained
+        path = self.path(key)
+        return (os.path.exists(os.path.join(path, METADATA_FILE))
+                and os.path.exists(os.path.join(path, PREPROCESSOR_FILE)))
+
+    def save(self, key, model, preprocessor, metadata, quantile_model=None):
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self.path(key) + f".tmp{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+
+        model.save(os.path.join(tmp, MODEL_FILE))
+        if quantile_model is not None:
+            quantile_model.save(os.path.join(tmp, QUANTILE_FILE))
+        with open(os.path.join(tmp, PREPROCESSOR_FILE), "w") as f:
+            json.dump(preprocessor.get_state(), f)
+        # TensorFlow-free copy for forecast-only processes, when every layer
+        # has a NumPy implementation
+        try:
+            from runtime import export_numpy
+            export_numpy(model, preprocessor, os.path.join(tmp, RUNTIME_FILE))
+        except ValueError:
+            pass
+        metadata = dict(metadata, key=key, created=time.time())
+        with open(os.path.join(tmp, METADATA_FILE), "w") as f:
+            json.dump(metadata, f, indent=2, default=float)
+
+        # Metadata is written last, so a half-saved entry is never a hit
+        shutil.rmtree(self.path(key), ignore_errors=True)
+        os.replace(tmp, self.path(key))
+        self.evict(keep=key)
+
+    def load(self, key, load_model=True):
+        from preprocessor import DataPreprocessor
+
+        path = self.path(key)
+        with open(os.path.join(path, METADATA_FILE)) as f:
+            metadata = json.load(f)
+        with open(os.path.join(path, PREPROCESSOR_FILE)) as f:
+            preprocessor = DataPreprocessor.from_state(json.load(f))
+
+        model = quantile_model = None
+        if load_model:
+            import tensorflow as tf
+            model = tf.keras.models.load_model(os.path.join(path, MODEL_FILE))
+            if os.path.exists(os.path.join(path, QUANTILE_FILE)):
+                quantile_model = tf.keras.models.load_model(
+                    os.path.join(path, QUANTILE_FILE), compile=False)
+
+        # Access time drives LRU eviction
+        os.utime(os.path.join(path, METADATA_FILE))
+        return {'model': model, 'quantile_model': quantile_model,
+                'preprocessor': preprocessor, 'metadata': metadata}
+
+    def entries(self):
+        if not os.path.isdir(self.root):
+            return []
+        entries = []
+        for key in os.listdir(self.root):
+            meta = os.path.join(self.root, key, METADATA_FILE)
+            if os.path.exists(meta):
+                entries.append({
+                    'key': key,
+                    'last_used': os.path.getmtime(meta),
+                    'bytes': _dir_size(self.path(key)),
+                })
+        return entries
+
+    def evict(self, keep=None):
+        entries = sorted(self.entries(), key=lambda e: e['last_used'])
+        total = sum(e['bytes'] for e in entries)
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry['key'] == keep:
+                continue
+            shutil.rmtree(self.path(entry['key']), ignore_errors=True)
+            total -= entry['bytes']
@@ -1,18 +1,26 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                             QPushButton, QGroupBox, QTextEdit, QSplitter,
-                            QMessageBox)
+                            QMessageBox, QSpinBox, QComboBox, QProgressBar)
 from PyQt5.QtCore import Qt
 from matplotlib.backends.backend_qt5agg import (
     FigureCanvas, NavigationToolbar2QT as NavigationToolbar
 )
 from matplotlib.figure import Figure
 import numpy as np
+import pandas as pd
+import core
+from plotting import FastPlot
+from trainer import BacktestRunner
 
 class ResultsTab(QWidget):
     def __init__(self, model_tab):
         super().__init__()
         self.model_tab = model_tab
+        self.backtester = None
+        self.backtest_folds = []
         self.init_ui()
+        self.model_tab.sweep_finished.connect(self.show_leaderboard)
+        self.model_tab.ensemble_finished.connect(self.show_ensemble)
         
     def init_ui(self):
         layout = QVBoxLayout()
@@ -24,6 +32,7 @@ class ResultsTab(QWidget):
         self.figure = Figure(figsize=(10, 6))
         self.canvas = FigureCanvas(self.figure)
         self.toolbar = NavigationToolbar(self.canvas, self)
+        self.plot = FastPlot(self.figure, self.canvas)
         
         plot_layout.addWidget(self.toolbar)
         plot_layout.addWidget(self.canvas)
@@ -44,7 +53,57 @@ class ResultsTab(QWidget):
         metrics_group_layout.addWidget(self.metrics_text)
         metrics_group.setLayout(metrics_group_layout)
         
+        sweep_group = QGroupBox("Sweep Leaderboard")
+        self.leaderboard_text = QTextEdit()
+        self.leaderboard_text.setReadOnly(True)
+        sweep_group_layout = QVBoxLayout()
+        sweep_group_layout.addWidget(self.leaderboard_text)
+        sweep_group.setLayout(sweep_group_layout)
+        
+        ensemble_group = QGroupBox("Ensemble vs Members")
+        self.ensemble_text = QTextEdit()
+        self.ensemble_text.setReadOnly(True)
+        ensemble_group_layout = QVBoxLayout()
+        ensemble_group_layout.addWidget(self.ensemble_text)
+        ensemble_group.setLayout(ensemble_group_layout)
+        
+        backtest_group = QGroupBox("Walk-Forward Backtest")
+        backtest_layout = QVBoxLayout()
+        options_layout = QHBoxLayout()
+        options_layout.addWidget(QLabel("Folds:"))
+        self.backtest_folds_spin = QSpinBox()
+        self.backtest_folds_spin.setRange(2, 50)
+        self.backtest_folds_spin.setValue(5)
+        options_layout.addWidget(self.backtest_folds_spin)
+        options_layout.addWidget(QLabel("Window:"))
+        self.backtest_mode = QComboBox()
+        self.backtest_mode.addItems(["Expanding", "Sliding"])
+        options_layout.addWidget(self.backtest_mode)
+        options_layout.addWidget(QLabel("Epochs:"))
+        self.backtest_epochs = QSpinBox()
+        self.backtest_epochs.setRange(1, 500)
+        self.backtest_epochs.setValue(20)
+        options_layout.addWidget(self.backtest_epochs)
+        self.backtest_btn = QPushButton("Run Backtest")
+        self.backtest_btn.clicked.connect(self.start_backtest)
+        self.stop_backtest_btn = QPushButton("Stop")
+        self.stop_backtest_btn.clicked.connect(self.stop_backtest)
+        self.stop_backtest_btn.setEnabled(False)
+        options_layout.addWidget(self.backtest_btn)
+        options_layout.addWidget(self.stop_backtest_btn)
+        self.backtest_progress = QProgressBar()
+        self.backtest_progress.setAlignment(Qt.AlignCenter)
+        self.backtest_text = QTextEdit()
+        self.backtest_text.setReadOnly(True)
+        backtest_layout.addLayout(options_layout)
+        backtest_layout.addWidget(self.backtest_progress)
+        backtest_layout.addWidget(self.backtest_text)
+        backtest_group.setLayout(backtest_layout)
+        
         metrics_layout.addWidget(metrics_group)
+        metrics_layout.addWidget(sweep_group)
+        metrics_layout.addWidget(ensemble_group)
+        metrics_layout.addWidget(backtest_group)
         metrics_layout.addWidget(plot_btn)
         metrics_widget.setLayout(metrics_layout)
         
@@ -57,27 +116,13 @@ class ResultsTab(QWidget):
         self.setLayout(layout)
     
     def plot_results(self):
-        if not hasattr(self.model_tab, 'model_result'):
+        if getattr(self.model_tab, 'model_result', None) is None:
             QMessageBox.warning(self, "Warning", "Train model first")
             return
             
-        result = self.model_tab.model_result
-        model = result['model']
-        X_test = result['X_test']
-        y_test = result['y_test']
-        scaler = result['preprocessor'].scaler
-        
-        # Make predictions
-        y_pred = model.predict(X_test)
-        
-        # Inverse transform
-        y_true = scaler.inverse_transform(y_test.reshape(-1, 1)).flatten()
-        y_pred = scaler.inverse_transform(y_pred).flatten()
-        
-        # Calculate metrics
-        mse = np.mean((y_true - y_pred)**2)
-        rmse = np.sqrt(mse)
-        mae = np.mean(np.abs(y_true - y_pred))
+        metrics = core.evaluate(self.model_tab.model_result)
+        y_true, y_pred = metrics['y_true'], metrics['y_pred']
+        mse, rmse, mae = metrics['mse'], metrics['rmse'], metrics['mae']
         
         # Update metrics
         self.metrics_text.setPlainText(
@@ -87,17 +132,152 @@ class ResultsTab(QWidget):
         )
         
         # Plot
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        
-        ax.plot(y_true, label='Actual', color='blue', linewidth=2)
-        ax.plot(y_pred, label='Predicted', color='red', linestyle='--', linewidth=2)
+        # Streamed test windows stop where their whole horizon still fits,
+        # so their first-step targets end horizon - 1 rows before the data
+        result = self.model_tab.model_result
+        skip = result.get('horizon', 1) - 1 if result.get('out_of_core') else 0
+        x = self.test_axis(len(y_true), skip)
+        self.plot.set_series('actual', x, y_true, label='Actual', color='blue', linewidth=2)
+        self.plot.set_series('predicted', x, y_pred, label='Predicted', color='red',
+                             linestyle='--', linewidth=2)
         
+        ax = self.plot.ax
         ax.set_title("Actual vs Predicted Prices", fontsize=14)
-        ax.set_xlabel("Time Steps", fontsize=12)
+        ax.set_xlabel("Date" if np.issubdtype(x.dtype, np.datetime64) else "Time Steps",
+                      fontsize=12)
         ax.set_ylabel("Price", fontsize=12)
         ax.legend(fontsize=12)
         ax.grid(True, linestyle='--', alpha=0.7)
         
+        self.plot.autoscale()
         self.figure.tight_layout()
-        self.canvas.draw()
+    
+    def test_axis(self, n, skip=0):
+        # Test targets are the n rows before the last skip; use their dates
+        # when available
+        data_tab = self.model_tab.data_tab
+        date_col = data_tab.date_col.currentText()
+        if data_tab.df is not None and date_col != "None" and len(data_tab.df) >= n + skip:
+            end = len(data_tab.df) - skip
+            dates = pd.to_datetime(data_tab.df[date_col].iloc[end - n:end], errors='coerce')
+            if not dates.isna().any():
+                return dates.to_numpy()
+        return np.arange(n)
+    
+    def show_leaderboard(self, board):
+        lines = [f"{'#':>3} {'seq':>5} {'test':>5} {'units':>5} {'drop':>5} "
+                 f"{'lr':>8} {'val_loss':>10} {'epochs':>6} {'time':>7}"]
+        for row in board:
+            status = " pruned" if row.get('pruned') else ""
+            if 'error' in row:
+                status = f" error: {row['error']}"
+            lines.append(
+                f"{row['rank']:>3} {row['seq_length']:>5} {row['test_size']:>5.2f} "
+                f"{row['units']:>5} {row.get('dropout', 0.2):>5.2f} "
+                f"{row.get('learning_rate', 0.001):>8.4g} {row['val_loss']:>10.6f} "
+                f"{row.get('epochs', 0):>6} {row.get('seconds', 0):>6.1f}s{status}"
+            )
+        self.leaderboard_text.setPlainText("\n".join(lines))
+    
+    def show_ensemble(self, result):
+        # Members and ensemble are scored on the same test windows; weights
+        # come from the validation block before them
+        report = result['ensemble']
+        lines = [f"{'#':>3} {'arch':>6} {'seed':>5} {'val RMSE':>10} {'RMSE':>10} "
+                 f"{'MAE':>10} {'weight':>7} {'time':>7}"]
+        for member in report['members']:
+            if 'error' in member:
+                lines.append(f"{member['member']:>3} {member['architecture']:>6} "
+                             f"{member['seed']:>5} error: {member['error']}")
+                continue
+            lines.append(
+                f"{member['member']:>3} {member['architecture']:>6} {member['seed']:>5} "
+                f"{member['val_rmse']:>10.4f} {member['rmse']:>10.4f} {member['mae']:>10.4f} "
+                f"{member['weight']:>7.3f} {member['seconds']:>6.1f}s"
+            )
+        metrics = report['metrics']
+        scored = [m for m in report['members'] if 'error' not in m]
+        best = min(m['rmse'] for m in scored)
+        lines.append("")
+        lines.append(f"ensemble ({report['method']}) RMSE {metrics['rmse']:.4f}  "
+                     f"MAE {metrics['mae']:.4f}")
+        lines.append(f"best member RMSE {best:.4f}  "
+                     f"mean member RMSE {np.mean([m['rmse'] for m in scored]):.4f}")
+        lines.append(f"wall time {report['wall_seconds']:.1f}s")
+        self.ensemble_text.setPlainText("\n".join(lines))
+    
+    def start_backtest(self):
+        data_tab = self.model_tab.data_tab
+        if data_tab.df is None:
+            QMessageBox.warning(self, "Warning", "Load data first")
+            return
+        
+        folds = self.backtest_folds_spin.value()
+        self.backtest_folds = []
+        self.backtest_progress.setRange(0, folds)
+        self.backtest_progress.setValue(0)
+        self.backtest_btn.setEnabled(False)
+        self.stop_backtest_btn.setEnabled(True)
+        
+        target_col = data_tab.target_col.currentText()
+        self.backtester = BacktestRunner(
+            data_tab.df[target_col].values,
+            seq_length=self.model_tab.seq_length.value(),
+            n_folds=folds,
+            mode=self.backtest_mode.currentText().lower(),
+            epochs=self.backtest_epochs.value(),
+            units=self.model_tab.units.value(),
+            architecture=self.model_tab.architecture.currentText().lower()
+        )
+        self.backtester.fold_completed.connect(self.on_fold_complete)
+        self.backtester.backtest_completed.connect(self.show_backtest)
+        self.backtester.error_occurred.connect(self.on_backtest_error)
+        self.backtester.start()
+    
+    def stop_backtest(self):
+        if self.backtester:
+            self.backtester.stop()
+            self.stop_backtest_btn.setEnabled(False)
+    
+    def on_fold_complete(self, fold):
+        self.backtest_folds.append(fold)
+        self.backtest_progress.setValue(len(self.backtest_folds))
+    
+    def on_backtest_error(self, error):
+        QMessageBox.critical(self, "Error", f"Backtest failed: {error}")
+        self.backtest_btn.setEnabled(True)
+        self.stop_backtest_btn.setEnabled(False)
+    
+    def show_backtest(self, report):
+        self.backtest_btn.setEnabled(True)
+        self.stop_backtest_btn.setEnabled(False)
+        
+        lines = [f"{'fold':>4} {'train':>13} {'test':>13} {'RMSE':>10} {'MAE':>10} "
+                 f"{'MAPE%':>7} {'dir%':>6} {'time':>7}"]
+        for fold in report['folds']:
+            train = f"{fold['train'][0]}-{fold['train'][1]}"
+            test = f"{fold['test'][0]}-{fold['test'][1]}"
+            if 'error' in fold:
+                lines.append(f"{fold['fold']:>4} {train:>13} {test:>13} error: {fold['error']}")
+                continue
+            lines.append(
+                f"{fold['fold']:>4} {train:>13} {test:>13} {fold['rmse']:>10.4f} "
+                f"{fold['mae']:>10.4f} {fold['mape']:>7.2f} "
+                f"{fold['directional_accuracy'] * 100:>6.1f} {fold['seconds']:>6.1f}s"
+            )
+        summary = report['aggregate']
+        if summary:
+            lines.append("")
+            lines.append(
+                f"mean  RMSE {summary['rmse']['mean']:.4f} ± {summary['rmse']['std']:.4f}  "
+                f"MAE {summary['mae']['mean']:.4f}  MAPE {summary['mape']['mean']:.2f}%  "
+                f"direction {summary['directional_accuracy']['mean'] * 100:.1f}%"
+            )
+            pooled = summary['pooled']
+            lines.append(
+                f"pooled RMSE {pooled['rmse']:.4f}  MAE {pooled['mae']:.4f}  "
+                f"MAPE {pooled['mape']:.2f}%  direction {pooled['directional_accuracy'] * 100:.1f}%"
+            )
+        lines.append(f"wall time {report['wall_seconds']:.1f}s "
+                     f"(fold time {summary.get('fold_seconds', 0):.1f}s)")
+        self.backtest_text.setPlainText("\n".join(lines))
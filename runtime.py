@@ -0,0 +1,289 @@
+import json
+import numpy as np
+
+# TensorFlow-free inference. export_numpy() writes a trained Keras model as
+# a layer graph plus float32 weights in one .npz, together with the scaling
+# state; NumpyModel runs that graph with plain NumPy, and ExportedForecaster
+# adds scaling and the recursive forecast on top. Nothing here imports
+# TensorFlow, sklearn or pandas, so forecast-only processes start quickly.
+# export_tflite() and TFLiteModel are the optional TFLite equivalents.
+
+FORMAT_VERSION = 1
+
+
+def _sigmoid(x):
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)
+
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0),
+    'tanh': np.tanh,
+    'sigmoid': _sigmoid,
+}
+
+
+def _layer_spec(layer, producers):
+    kind = type(layer).__name__
+    config = layer.get_config()
+    spec = {'name': layer.name, 'type': kind, 'inputs': producers}
+    if kind in ('LSTM', 'GRU'):
+        spec.update(return_sequences=config['return_sequences'],
+                    activation=config['activation'],
+                    recurrent_activation=config['recurrent_activation'])
+        if kind == 'GRU':
+            spec['reset_after'] = config.get('reset_after', True)
+    elif kind == 'Conv1D':
+        spec.update(padding=config['padding'], dilation=config['dilation_rate'][0],
+                    activation=config['activation'])
+    elif kind == 'Dense':
+        spec['activation'] = config['activation']
+    elif kind == 'Cropping1D':
+        spec['cropping'] = list(config['cropping'])
+    elif kind not in ('InputLayer', 'Dropout', 'Add', 'Concatenate', 'Flatten', 'Embedding'):
+        raise ValueError(f"layer type {kind} has no NumPy implementation")
+    for key in ('activation', 'recurrent_activation'):
+        if spec.get(key, 'linear') not in ACTIVATIONS:
+            raise ValueError(f"activation {spec[key]} has no NumPy implementation")
+    return spec
+
+
+def export_numpy(model, preprocessor, path):
+    # Layers are stored in the model's topological order with the names of
+    # the layers feeding them
+    inputs = [t._keras_history.operation.name for t in model.inputs]
+    outputs = [t._keras_history.operation.name for t in model.outputs]
+    layers, arrays = [], {}
+    previous = inputs[0]
+    for layer in model.layers:
+        nodes = getattr(layer, '_inbound_nodes', None)
+        if nodes:
+            producers = [t._keras_history.operation.name for t in nodes[0].input_tensors]
+        else:
+            producers = [previous]
+        layers.append(_layer_spec(layer, producers))
+        for i, weight in enumerate(layer.get_weights()):
+            arrays[f"{layer.name}/{i}"] = np.asarray(weight, dtype=np.float32)
+        previous = layer.name
+
+    spec = {
+        'format': FORMAT_VERSION,
+        'inputs': inputs,
+        'outputs': outputs,
+        'input_shape': list(model.inputs[0].shape[1:]),
+        'horizon': int(model.outputs[0].shape[-1]),
+        'layers': layers,
+        'preprocessor': preprocessor.get_state() if preprocessor is not None else None,
+    }
+    np.savez(path, __spec__=np.array(json.dumps(spec)), **arrays)
+    return path
+
+
+class NumpyModel:
+    def __init__(self, spec, weights):
+        self.spec = spec
+        self.weights = weights
+        self.horizon = spec['horizon']
+        self.input_shape = tuple(spec['input_shape'])
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            spec = json.loads(str(data['__spec__']))
+            weights = {}
+            for key in data.files:
+                if key == '__spec__':
+                    continue
+                name, index = key.rsplit('/', 1)
+                weights.setdefault(name, {})[int(index)] = data[key]
+        weights = {name: [w[i] for i in sorted(w)] for name, w in weights.items()}
+        return cls(spec, weights)
+
+    def predict(self, *inputs):
+        # inputs follow the model's inputs: the (B, seq_length, F) windows,
+        # plus series ids for multi-series models
+        values = {name: np.asarray(x, dtype=np.float32 if i == 0 else np.int64)
+                  for i, (name, x) in enumerate(zip(self.spec['inputs'], inputs))}
+        for layer in self.spec['layers']:
+            if layer['type'] == 'InputLayer':
+                continue
+            args = [values[name] for name in layer['inputs']]
+            values[layer['name']] = self._run(layer, args, self.weights.get(layer['name'], []))
+        return values[self.spec['outputs'][0]]
+
+    __call__ = predict
+
+    def _run(self, layer, args, weights):
+        kind = layer['type']
+        x = args[0]
+        if kind == 'Dense':
+            return ACTIVATIONS[layer['activation']](x @ weights[0] + weights[1])
+        if kind == 'LSTM':
+            return self._lstm(x, layer, *weights)
+        if kind == 'GRU':
+            return self._gru(x, layer, *weights)
+        if kind == 'Conv1D':
+            return self._conv1d(x, layer, *weights)
+        if kind == 'Dropout':
+            return x
+        if kind == 'Add':
+            return sum(args[1:], args[0])
+        if kind == 'Concatenate':
+            return np.concatenate(args, axis=-1)
+        if kind == 'Flatten':
+            return x.reshape(len(x), -1)
+        if kind == 'Cropping1D':
+            start, end = layer['cropping']
+            return x[:, start:x.shape[1] - end]
+        if kind == 'Embedding':
+            return weights[0][x]
+        raise ValueError(f"unsupported layer {kind}")
+
+    @staticmethod
+    def _lstm(x, layer, kernel, recurrent, bias):
+        activation = ACTIVATIONS[layer['activation']]
+        gate = ACTIVATIONS[layer['recurrent_activation']]
+        units = recurrent.shape[0]
+        # Input projections for every time step in one matmul
+        projected = x @ kernel + bias
+        h = np.zeros((len(x), units), dtype=np.float32)
+        c = np.zeros_like(h)
+        outputs = []
+        for t in range(x.shape[1]):
+            z = projected[:, t] + h @ recurrent
+            i = gate(z[:, :units])
+            f = gate(z[:, units:2 * units])
+            g = activation(z[:, 2 * units:3 * units])
+            o = gate(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * activation(c)
+            outputs.append(h)
+        return np.stack(outputs, axis=1) if layer['return_sequences'] else h
+
+    @staticmethod
+    def _gru(x, layer, kernel, recurrent, bias):
+        activation = ACTIVATIONS[layer['activation']]
+        gate = ACTIVATIONS[layer['recurrent_activation']]
+        units = recurrent.shape[0]
+        reset_after = layer.get('reset_after', True)
+        input_bias, recurrent_bias = (bias[0], bias[1]) if bias.ndim == 2 else (bias, 0)
+        projected = x @ kernel + input_bias
+        h = np.zeros((len(x), units), dtype=np.float32)
+        outputs = []
+        for t in range(x.shape[1]):
+            xz, xr, xh = np.split(projected[:, t], 3, axis=1)
+            if reset_after:
+                rz, rr, rh = np.split(h @ recurrent + recurrent_bias, 3, axis=1)
+                z = gate(xz + rz)
+                r = gate(xr + rr)
+                candidate = activation(xh + r * rh)
+            else:
+                z = gate(xz + h @ recurrent[:, :units])
+                r = gate(xr + h @ recurrent[:, units:2 * units])
+                candidate = activation(xh + (r * h) @ recurrent[:, 2 * units:])
+            h = z * h + (1 - z) * candidate
+            outputs.append(h)
+        return np.stack(outputs, axis=1) if layer['return_sequences'] else h
+
+    @staticmethod
+    def _conv1d(x, layer, kernel, bias):
+        size, dilation = kernel.shape[0], layer['dilation']
+        span = (size - 1) * dilation
+        if layer['padding'] == 'causal':
+            x = np.pad(x, ((0, 0), (span, 0), (0, 0)))
+        elif layer['padding'] == 'same':
+            x = np.pad(x, ((0, 0), (span // 2, span - span // 2), (0, 0)))
+        steps = x.shape[1] - span
+        out = bias + sum(x[:, j * dilation:j * dilation + steps] @ kernel[j]
+                         for j in range(size))
+        return ACTIVATIONS[layer['activation']](out)
+
+
+def export_tflite(model, path):
+    import tensorflow as tf
+
+    # Unrolled recurrent layers convert to plain builtin ops; the default
+    # while-loop form needs the Flex delegate at runtime
+    def unrolled(layer):
+        config = layer.get_config()
+        if 'unroll' in config:
+            config['unroll'] = True
+        return layer.__class__.from_config(config)
+
+    clone = tf.keras.models.clone_model(model, clone_function=unrolled)
+    clone.set_weights(model.get_weights())
+    converter = tf.lite.TFLiteConverter.from_keras_model(clone)
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS]
+    with open(path, "wb") as f:
+        f.write(converter.convert())
+    return path
+
+
+class TFLiteModel:
+    # Uses the standalone tflite_runtime interpreter when installed
+    def __init__(self, path):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+        self.interpreter = Interpreter(model_path=path)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self.input_shape = tuple(self._input['shape'][1:])
+        self.horizon = int(self._output['shape'][-1])
+        self._batch = int(self._input['shape'][0])
+
+    def predict(self, x):
+        x = np.asarray(x, dtype=np.float32)
+        if len(x) != self._batch:
+            self.interpreter.resize_tensor_input(self._input['index'], x.shape)
+            self.interpreter.allocate_tensors()
+            self._batch = len(x)
+        self.interpreter.set_tensor(self._input['index'], x)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self._output['index'])
+
+    __call__ = predict
+
+
+class ExportedForecaster:
+    # Scaling plus recursive forecasting around an exported model. The
+    # min/max state is applied directly, so sklearn is not needed.
+
+    def __init__(self, engine, state):
+        from forecaster import RecursiveForecaster
+
+        self.engine = engine
+        self.state = state
+        self.seq_length = state['seq_length']
+        self.n_features = 1 + len(state.get('feature_cols') or [])
+        scaler = state['scaler']
+        self.data_min = scaler['data_min'][0]
+        data_range = scaler['data_max'][0] - self.data_min
+        self.scale = 1.0 / data_range if data_range else 1.0
+        self.forecaster = RecursiveForecaster(None, self.seq_length, self.n_features,
+                                              step_fn=engine.predict,
+                                              horizon=engine.horizon)
+
+    @classmethod
+    def load(cls, path, tflite_path=None):
+        numpy_model = NumpyModel.load(path)
+        engine = TFLiteModel(tflite_path) if tflite_path else numpy_model
+        return cls(engine, numpy_model.spec['preprocessor'])
+
+    def transform(self, values):
+        return (np.asarray(values, dtype=np.float64) - self.data_min) * self.scale
+
+    def inverse_transform(self, scaled):
+        return np.asarray(scaled, dtype=np.float64) / self.scale + self.data_min
+
+    def forecast(self, days, values=None):
+        # With values, the last seq_length of them seed a target-only model;
+        # otherwise the scaled tail saved at export time is used
+        if values is not None and self.n_features == 1:
+            window = self.transform(np.asarray(values)[-self.seq_length:]).reshape(-1, 1)
+        else:
+            window = np.asarray(self.state['tail'], dtype=np.float64)
+        return self.inverse_transform(self.forecaster.forecast(window, days)).ravel()
@@ -0,0 +1,282 @@
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+# Local forecast service. Models are loaded from the registry once and kept
+# warm; concurrent requests for the same model are coalesced into one
+# batched forward pass per step.
+
+
+class LatencyStats:
+    def __init__(self, window=10000):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._batch_sizes = deque(maxlen=window)
+        self._started = time.time()
+        self.requests = 0
+        self.errors = 0
+
+    def record(self, seconds):
+        with self._lock:
+            self._latencies.append(seconds)
+            self.requests += 1
+
+    def record_batch(self, size):
+        with self._lock:
+            self._batch_sizes.append(size)
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self):
+        with self._lock:
+            latencies = np.array(self._latencies)
+            batches = np.array(self._batch_sizes)
+            uptime = time.time() - self._started
+            requests, errors = self.requests, self.errors
+        summary = {
+            'requests': requests,
+            'errors': errors,
+            'uptime_s': uptime,
+            'throughput_rps': requests / uptime if uptime else 0.0,
+        }
+        if len(latencies):
+            summary.update({
+                'p50_ms': float(np.percentile(latencies, 50) * 1000),
+                'p99_ms': float(np.percentile(latencies, 99) * 1000),
+                'mean_ms': float(latencies.mean() * 1000),
+            })
+        if len(batches):
+            summary['mean_batch'] = float(batches.mean())
+        return summary
+
+
+class MicroBatcher:
+    # Requests wait at most max_wait seconds for company before the batch
+    # is run; one forecaster call then serves all of them
+
+    def __init__(self, forecaster, max_batch=64, max_wait=0.002, stats=None):
+        self.forecaster = forecaster
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.stats = stats
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, window, days):
+        slot = {'window': window, 'days': days, 'done': threading.Event()}
+        self._queue.put(slot)
+        slot['done'].wait()
+        if 'error' in slot:
+            raise slot['error']
+        return slot['result']
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._run(batch)
+
+    def _run(self, batch):
+        try:
+            windows = np.stack([slot['window'] for slot in batch])
+            days = max(slot['days'] for slot in batch)
+            paths = self.forecaster.forecast(windows, days)
+            for slot, path in zip(batch, paths):
+                slot['result'] = path[:slot['days']]
+        except Exception as e:
+            for slot in batch:
+                slot['error'] = e
+        finally:
+            if self.stats is not None:
+                self.stats.record_batch(len(batch))
+            for slot in batch:
+                slot['done'].set()
+
+
+def input_window(preprocessor, values):
+    # Scaled (seq_length, F) model input from the latest raw values: a list
+    # of prices for target-only models, rows of [target, *feature_cols] for
+    # models trained with features
+    seq_length, n_features = preprocessor.seq_length, preprocessor.n_features
+    values = np.asarray(values, dtype=np.float64)
+    if n_features > 1 and (values.ndim != 2 or values.shape[1] != n_features):
+        raise ValueError(f"model takes rows of {n_features} values "
+                         f"({', '.join([preprocessor.target_col] + preprocessor.feature_cols)})")
+    if n_features == 1 and values.ndim != 1:
+        raise ValueError("model takes a flat list of prices")
+    if len(values) < seq_length:
+        raise ValueError(f"need at least {seq_length} values, got {len(values)}")
+    return preprocessor.transform(values[-seq_length:]).astype(np.float32)
+
+
+class ForecastService:
+    def __init__(self, registry, max_batch=64, max_wait=0.002):
+        self.registry = registry
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.stats = LatencyStats()
+        self._models = {}
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def model(self, key):
+        # Loading takes seconds, so it runs under a per-key lock: requests
+        # for other, already warm models are not held up behind it
+        entry = self._models.get(key)
+        if entry is not None:
+            return entry
+        with self._lock:
+            loading = self._loading.setdefault(key, threading.Lock())
+        with loading:
+            entry = self._models.get(key)
+            if entry is None:
+                entry = self._load(key)
+                with self._lock:
+                    self._models[key] = entry
+                    self._loading.pop(key, None)
+        return entry
+
+    def _load(self, key):
+        from forecaster import RecursiveForecaster
+
+        loaded = self.registry.load(key)
+        preprocessor = loaded['preprocessor']
+        forecaster = RecursiveForecaster(loaded['model'], preprocessor.seq_length,
+                                         preprocessor.n_features)
+        return {
+            'preprocessor': preprocessor,
+            'metadata': loaded['metadata'],
+            'batcher': MicroBatcher(forecaster, self.max_batch,
+                                    self.max_wait, self.stats),
+        }
+
+    def forecast(self, key, values, days):
+        start = time.perf_counter()
+        entry = self.model(key)
+        preprocessor = entry['preprocessor']
+        window = input_window(preprocessor, values)
+        path = entry['batcher'].submit(window, days)
+        prices = preprocessor.scaler.inverse_transform(
+            np.asarray(path).reshape(-1, 1)
+        ).flatten()
+        self.stats.record(time.perf_counter() - start)
+        return prices
+
+    def models(self):
+        return [{
+            'key': e['key'],
+            'seq_length': e.get('seq_length'),
+            'feature_cols': e.get('feature_cols') or [],
+            'loaded': e['key'] in self._models,
+        } for e in self._describe()]
+
+    def _describe(self):
+        from registry import METADATA_FILE
+
+        described = []
+        for entry in self.registry.entries():
+            meta_path = os.path.join(self.registry.path(entry['key']), METADATA_FILE)
+            with open(meta_path) as f:
+                config = json.load(f).get('config', {})
+            described.append(dict(entry, seq_length=config.get('seq_length'),
+                                  feature_cols=config.get('features')))
+        return described
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/metrics":
+                self._send(200, service.stats.snapshot())
+            elif self.path == "/models":
+                self._send(200, service.models())
+            else:
+                self._send(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path != "/forecast":
+                self._send(404, {'error': 'not found'})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length))
+                prices = service.forecast(request['model'], request['values'],
+                                          int(request.get('days', 1)))
+                self._send(200, {'model': request['model'],
+                                 'forecast': prices.tolist()})
+            except (KeyError, ValueError, FileNotFoundError) as e:
+                service.stats.record_error()
+                self._send(400, {'error': str(e)})
+            except Exception as e:
+                service.stats.record_error()
+                self._send(500, {'error': str(e)})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class ForecastHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def get_request(self):
+        # Unix sockets have no client address; the handler expects a pair
+        request, _ = super().get_request()
+        return request, ("unix", 0)
+
+
+def serve(host="127.0.0.1", port=8765, unix_socket=None, registry=None,
+          max_batch=64, max_wait=0.002, preload=()):
+    if registry is None:
+        from registry import ModelRegistry
+        registry = ModelRegistry()
+
+    service = ForecastService(registry, max_batch=max_batch, max_wait=max_wait)
+    for key in preload:
+        service.model(key)
+
+    handler = make_handler(service)
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+        httpd = ThreadingUnixHTTPServer(unix_socket, handler)
+    else:
+        httpd = ForecastHTTPServer((host, port), handler)
+    try:
+        httpd.serve_forever()
+    finally:
+        httpd.server_close()
@@ -0,0 +1,98 @@
+import multiprocessing as mp
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+import numpy as np
+
+# Shared-memory plumbing for process pools (sweeps, backtests, ensembles):
+# the series is published once and every worker maps it read-only.
+
+
+class SharedSeries:
+    # Publishes a series once in shared memory so worker processes map it
+    # instead of receiving a pickled copy per trial
+
+    def __init__(self, series):
+        series = np.ascontiguousarray(series, dtype=np.float64)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(series.nbytes, 1))
+        self.array = np.ndarray(series.shape, dtype=series.dtype, buffer=self._shm.buf)
+        self.array[:] = series
+        self.spec = (self._shm.name, series.shape, series.dtype.str)
+
+    def close(self):
+        self.array = None
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_series(spec):
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    array.flags.writeable = False
+    return shm, array
+
+
+worker_state = {}
+
+
+def init_worker(spec, threads, extra=None):
+    # Process-pool initializer: each process gets an equal share of the
+    # cores and maps the shared series once
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    shm, series = attach_series(spec)
+    worker_state.update(extra or {}, shm=shm, series=series)
+
+
+def run_pool(series, fn, tasks, n_workers=None, on_result=None, should_stop=None,
+             on_error=None, extra=None, poll_seconds=0.2, **kwargs):
+    # Runs fn(task, **kwargs) for every task in a spawned process pool that
+    # shares the series, returning results in completion order. A failed
+    # task becomes on_error(task, exc), by default the task with an 'error'.
+    # should_stop is polled while tasks run; when it fires, queued tasks are
+    # cancelled and the pool is left to wind down without waiting on the
+    # ones in flight.
+    tasks = list(tasks)
+    if not tasks:
+        return []
+    cores = os.cpu_count() or 1
+    n_workers = max(1, min(n_workers or cores, len(tasks)))
+    threads = max(1, cores // n_workers)
+    if on_error is None:
+        on_error = lambda task, e: dict(task, error=str(e))
+
+    results = []
+    stopped = False
+    # TensorFlow is not fork-safe
+    ctx = mp.get_context("spawn")
+    with SharedSeries(series) as shared:
+        pool = ProcessPoolExecutor(n_workers, mp_context=ctx, initializer=init_worker,
+                                   initargs=(shared.spec, threads, extra))
+        try:
+            futures = {pool.submit(fn, task, **kwargs): task for task in tasks}
+            pending = set(futures)
+            while pending and not stopped:
+                done, pending = wait(pending, timeout=poll_seconds,
+                                     return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = on_error(futures[future], e)
+                    results.append(result)
+                    if on_result is not None:
+                        on_result(result)
+                stopped = should_stop is not None and should_stop()
+        finally:
+            pool.shutdown(wait=not stopped, cancel_futures=True)
+    return results
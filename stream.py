@@ -0,0 +1,359 @@
+import json
+import os
+import queue
+import socket
+import threading
+import time
+from collections import deque
+from datetime import datetime
+import numpy as np
+from forecaster import RingBuffer
+
+# Live price ingestion. A source yields (timestamp, price) ticks, or None
+# while idle so the reader can notice a stop request; ticks are folded into
+# bars and every closed bar is pushed onto a fixed-size ring of scaled
+# closes that feeds the forecaster. No DataFrame is touched after startup,
+# and memory is bounded by the tick queue and the ring.
+
+_END = object()
+
+
+def _timestamp(text):
+    try:
+        return float(text)
+    except ValueError:
+        return datetime.fromisoformat(text.strip()).timestamp()
+
+
+def parse_tick(line):
+    # "price", "timestamp,price" or {"t": ..., "price": ...}; the timestamp
+    # is epoch seconds or ISO 8601. Header and blank lines give None.
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        if line[0] == '{':
+            tick = json.loads(line)
+            t = tick.get('t', tick.get('time'))
+            return (None if t is None else _timestamp(str(t))), float(tick['price'])
+        parts = line.split(',')
+        if len(parts) == 1:
+            return None, float(parts[0])
+        return _timestamp(parts[0]), float(parts[-1])
+    except (ValueError, KeyError):
+        return None
+
+
+def _parse_lines(lines):
+    for line in lines:
+        if line is None:
+            yield None
+            continue
+        tick = parse_tick(line)
+        if tick is not None:
+            t, price = tick
+            yield (time.time() if t is None else t), price
+
+
+def tail_file(path, from_start=False, poll=0.05):
+    # Follows a growing file like `tail -f`; a truncated file is re-read
+    # from the top
+    def lines():
+        with open(path, 'r') as f:
+            if not from_start:
+                f.seek(0, 2)
+            partial = ''
+            while True:
+                line = f.readline()
+                if line:
+                    if not line.endswith('\n'):
+                        partial += line
+                        continue
+                    yield partial + line
+                    partial = ''
+                    continue
+                if f.tell() > _file_size(path):
+                    f.seek(0)
+                    partial = ''
+                yield None
+                time.sleep(poll)
+
+    return _parse_lines(lines())
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def socket_source(address, timeout=0.25):
+    # Newline-delimited ticks from a TCP "host:port" or a Unix socket path
+    def lines():
+        if ':' in address:
+            host, port = address.rsplit(':', 1)
+            sock = socket.create_connection((host, int(port)))
+        else:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(address)
+        sock.settimeout(timeout)
+        buffer = b''
+        try:
+            while True:
+                try:
+                    chunk = sock.recv(65536)
+                except socket.timeout:
+                    yield None
+                    continue
+                if not chunk:
+                    break
+                buffer += chunk
+                *complete, buffer = buffer.split(b'\n')
+                for line in complete:
+                    yield line.decode('utf-8', 'replace')
+            if buffer:
+                yield buffer.decode('utf-8', 'replace')
+        finally:
+            sock.close()
+
+    return _parse_lines(lines())
+
+
+def replay_csv(path, target='Close', date=None, speed=1.0):
+    # Replays a CSV as ticks at `speed` times its own clock (rows are one
+    # second apart without a date column); speed <= 0 replays flat out
+    import pandas as pd
+    from data_loader import load_csv
+
+    cols = [target] + ([date] if date and date != target else [])
+    df = load_csv(path, usecols=cols)
+    prices = df[target].to_numpy(dtype=np.float64).tolist()
+    if date:
+        times = (pd.to_datetime(df[date]).to_numpy('datetime64[ns]')
+                 .astype(np.int64) / 1e9).tolist()
+    else:
+        times = np.arange(len(prices), dtype=np.float64).tolist()
+    del df
+
+    if speed <= 0:
+        yield from zip(times, prices)
+        return
+    start, origin = time.perf_counter(), times[0] if times else 0.0
+    for t, price in zip(times, prices):
+        ahead = (t - origin) / speed - (time.perf_counter() - start)
+        # Short waits are batched up rather than slept one tick at a time
+        if ahead > 0.002:
+            time.sleep(ahead)
+        yield t, price
+
+
+class BarBuilder:
+    # Folds ticks into fixed-length bars keyed by their end time. With
+    # seconds == 0 every tick is its own bar. Empty intervals make no bar.
+
+    def __init__(self, seconds=0.0):
+        self.seconds = seconds
+        self._bucket = None
+        self._close = None
+
+    def update(self, t, price):
+        if not self.seconds:
+            return t, price
+        bucket = t // self.seconds
+        if self._bucket is None or bucket == self._bucket:
+            self._bucket, self._close = bucket, price
+            return None
+        bar = ((self._bucket + 1) * self.seconds, self._close)
+        self._bucket, self._close = bucket, price
+        return bar
+
+    def flush(self):
+        if self._bucket is None:
+            return None
+        bar = ((self._bucket + 1) * self.seconds, self._close)
+        self._bucket = self._close = None
+        return bar
+
+
+class StreamingForecaster:
+    # Ring of the last seq_length scaled closes of a target-only model.
+    # Until seq_length bars have arrived (or a warm start window is given)
+    # there is nothing to forecast from.
+
+    def __init__(self, forecaster, data_min, scale, days=1, initial=None):
+        self.forecaster = forecaster
+        self.seq_length = forecaster.seq_length
+        self.data_min = data_min
+        self.scale = scale
+        self.days = days
+        if initial is not None:
+            window = np.asarray(initial, dtype=np.float32).reshape(1, self.seq_length, 1)
+            self.bars = self.seq_length
+        else:
+            window = np.zeros((1, self.seq_length, 1), dtype=np.float32)
+            self.bars = 0
+        self.ring = RingBuffer(window)
+        self._row = np.empty((1, 1), dtype=np.float32)
+
+    @classmethod
+    def from_runtime(cls, path, tflite_path=None, days=1, warm=False):
+        from runtime import ExportedForecaster
+
+        exported = ExportedForecaster.load(path, tflite_path)
+        if exported.n_features != 1:
+            raise ValueError("streaming needs a target-only model")
+        return cls(exported.forecaster, exported.data_min, exported.scale, days,
+                   initial=exported.state['tail'] if warm else None)
+
+    @classmethod
+    def from_result(cls, result, days=1, warm=False):
+        from forecaster import RecursiveForecaster
+
+        preprocessor = result['preprocessor']
+        if preprocessor.feature_cols:
+            raise ValueError("streaming needs a target-only model")
+        forecaster = result.get('forecaster')
+        if forecaster is None:
+            forecaster = RecursiveForecaster(result['model'], preprocessor.seq_length)
+            result['forecaster'] = forecaster
+        scaler = preprocessor.scaler
+        return cls(forecaster, float(scaler.data_min_[0]), float(scaler.scale_[0]), days,
+                   initial=preprocessor.last_window() if warm else None)
+
+    @property
+    def ready(self):
+        return self.bars >= self.seq_length
+
+    def update(self, close):
+        self._row[0, 0] = (close - self.data_min) * self.scale
+        self.ring.push(self._row)
+        self.bars += 1
+
+    def forecast(self):
+        scaled = self.forecaster.forecast(self.ring.window, self.days)
+        return np.asarray(scaled, dtype=np.float64).ravel() / self.scale + self.data_min
+
+
+class PriceStream:
+    # A reader thread drains the source into a bounded queue (a slow
+    # consumer blocks the reader rather than growing memory). With conflate,
+    # bars that queued up while a forecast ran are all pushed first and only
+    # the latest one is forecast, so output never lags the feed.
+
+    def __init__(self, source, forecaster, bar_seconds=0.0, queue_size=10000,
+                 conflate=True, on_forecast=None, on_bar=None):
+        self.source = source
+        self.forecaster = forecaster
+        self.bars = BarBuilder(bar_seconds)
+        self.conflate = conflate
+        self.on_forecast = on_forecast
+        self.on_bar = on_bar
+        self._queue = queue.Queue(queue_size)
+        self._stop = threading.Event()
+        self._error = None
+        self._latencies = deque(maxlen=10000)
+        self.ticks = 0
+        self.n_bars = 0
+        self.forecasts = 0
+        self.elapsed = 0.0
+
+    def stop(self):
+        self._stop.set()
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _read(self):
+        try:
+            for tick in self.source:
+                if self._stop.is_set():
+                    break
+                if tick is not None and not self._put(tick):
+                    break
+        except Exception as e:
+            self._error = e
+        finally:
+            self._put(_END)
+
+    def _bar(self, bar, emit):
+        self.forecaster.update(bar[1])
+        self.n_bars += 1
+        if self.on_bar is not None:
+            self.on_bar(bar)
+        if emit:
+            self._emit(bar)
+
+    def _emit(self, bar):
+        if not self.forecaster.ready:
+            return
+        start = time.perf_counter()
+        prices = self.forecaster.forecast()
+        self._latencies.append(time.perf_counter() - start)
+        self.forecasts += 1
+        if self.on_forecast is not None:
+            self.on_forecast({'time': bar[0], 'close': bar[1], 'forecast': prices,
+                              'ticks': self.ticks, 'bars': self.n_bars})
+
+    def run(self, max_bars=None, should_stop=None):
+        reader = threading.Thread(target=self._read, daemon=True)
+        start = time.perf_counter()
+        reader.start()
+        done = ended = False
+        try:
+            while not done:
+                if should_stop is not None and should_stop():
+                    break
+                try:
+                    batch = [self._queue.get(timeout=0.1)]
+                except queue.Empty:
+                    continue
+                # Everything already queued is handled in one pass
+                while len(batch) < 4096:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                last = None
+                for tick in batch:
+                    if tick is _END:
+                        done = ended = True
+                        break
+                    self.ticks += 1
+                    bar = self.bars.update(*tick)
+                    if bar is not None:
+                        self._bar(bar, not self.conflate)
+                        last = bar
+                        if max_bars and self.n_bars >= max_bars:
+                            done = True
+                            break
+                if self.conflate and last is not None:
+                    self._emit(last)
+            # The source ran dry: the open bar is complete
+            bar = self.bars.flush() if ended else None
+            if bar is not None:
+                self._bar(bar, True)
+        finally:
+            self.stop()
+            self.elapsed = time.perf_counter() - start
+        if self._error is not None:
+            raise self._error
+        return self.stats()
+
+    def stats(self):
+        latencies = np.array(self._latencies)
+        return {
+            'ticks': self.ticks,
+            'bars': self.n_bars,
+            'forecasts': self.forecasts,
+            'seconds': self.elapsed,
+            'ticks_per_s': self.ticks / self.elapsed if self.elapsed else 0.0,
+            'forecast_p50_ms': float(np.percentile(latencies, 50) * 1000) if len(latencies) else None,
+            'forecast_p99_ms': float(np.percentile(latencies, 99) * 1000) if len(latencies) else None,
+        }
@@ -0,0 +1,112 @@
+import itertools
+import math
+import multiprocessing as mp
+import random
+import time
+from shared import run_pool, worker_state
+
+DEFAULT_SPACE = {
+    'seq_length': [30, 60, 90],
+    'test_size': [0.2],
+    'units': [32, 50, 64],
+    'dropout': [0.2],
+    'learning_rate': [0.001],
+}
+
+
+def grid_trials(space):
+    names = list(space)
+    return [dict(zip(names, values))
+            for values in itertools.product(*(space[name] for name in names))]
+
+
+def random_trials(space, n_trials, seed=None):
+    rng = random.Random(seed)
+    total = math.prod(len(values) for values in space.values())
+    trials, seen = [], set()
+    while len(trials) < min(n_trials, total):
+        trial = {name: rng.choice(values) for name, values in space.items()}
+        key = tuple(sorted(trial.items()))
+        if key not in seen:
+            seen.add(key)
+            trials.append(trial)
+    return trials
+
+
+def run_trial(trial, epochs=20, batch_size=32, patience=3, grace_epochs=3,
+              prune_factor=1.5):
+    import tensorflow as tf
+    from datasets import window_dataset
+    from model_builder import ModelBuilder
+    from preprocessor import DataPreprocessor
+
+    best_loss = worker_state['best_loss']
+    start = time.time()
+
+    trial = dict({'seq_length': 60, 'test_size': 0.2, 'units': 50}, **trial)
+    preprocessor = DataPreprocessor(seq_length=trial['seq_length'])
+    X, _, _ = preprocessor.preprocess(worker_state['series'], materialize=False,
+                                      test_size=trial['test_size'])
+    split_idx = int(len(X) * (1 - trial['test_size']))
+    train_dataset = window_dataset(X[:split_idx], batch_size=batch_size)
+    val_dataset = window_dataset(X[split_idx:], batch_size=batch_size, shuffle_buffer=0)
+
+    model = ModelBuilder.build(
+        trial.get('architecture', 'lstm'),
+        (trial['seq_length'], 1),
+        units=(trial['units'],) * trial.get('layers', 2),
+        dropout=trial.get('dropout', 0.2),
+        learning_rate=trial.get('learning_rate', 0.001)
+    )
+
+    class PruneCallback(tf.keras.callbacks.Callback):
+        # Stop trials that are clearly behind the best one seen by any worker
+        def __init__(self):
+            super().__init__()
+            self.pruned = False
+
+        def on_epoch_end(self, epoch, logs=None):
+            if best_loss is None or epoch + 1 < grace_epochs:
+                return
+            if logs['val_loss'] > best_loss.value * prune_factor:
+                self.pruned = True
+                self.model.stop_training = True
+
+    pruner = PruneCallback()
+    history = model.fit(
+        train_dataset,
+        validation_data=val_dataset,
+        epochs=epochs,
+        callbacks=[
+            tf.keras.callbacks.EarlyStopping(
+                monitor='val_loss',
+                patience=patience,
+                restore_best_weights=True
+            ),
+            pruner
+        ],
+        verbose=0
+    )
+
+    val_loss = float(min(history.history['val_loss']))
+    if best_loss is not None:
+        with best_loss.get_lock():
+            best_loss.value = min(best_loss.value, val_loss)
+
+    return dict(trial, val_loss=val_loss, epochs=len(history.history['loss']),
+                pruned=pruner.pruned, seconds=time.time() - start)
+
+
+def leaderboard(results):
+    ranked = sorted(results, key=lambda r: r.get('val_loss', math.inf))
+    return [dict(r, rank=i + 1) for i, r in enumerate(ranked)]
+
+
+def run_sweep(series, trials, n_workers=None, on_result=None, should_stop=None,
+              **trial_kwargs):
+    # Shared across workers so trials can prune against the best so far
+    best_loss = mp.get_context("spawn").Value('d', math.inf)
+    results = run_pool(series, run_trial, trials, n_workers, on_result, should_stop,
+                       on_error=lambda trial, e: dict(trial, val_loss=math.inf, error=str(e)),
+                       extra={'best_loss': best_loss}, **trial_kwargs)
+    return leaderboard(results)
@@ -0,0 +1,174 @@
+import csv
+import json
+import os
+import sys
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Per-epoch and per-batch training telemetry: wall time, throughput, loss
+# and memory. The callback is created lazily so this module stays free of
+# TensorFlow at import time.
+
+EPOCH_FIELDS = ('epoch', 'seconds', 'samples', 'samples_per_s', 'loss', 'data_s',
+                'compute_s', 'rss_bytes', 'peak_rss_bytes')
+BATCH_FIELDS = ('epoch', 'batch', 'seconds', 'samples_per_s', 'loss')
+
+
+def memory_usage():
+    # (rss, peak rss) of this process in bytes; 0 when not available
+    rss = peak = 0
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        rss, peak = info.rss, getattr(info, 'peak_wset', 0)
+    else:
+        try:
+            with open('/proc/self/statm') as f:
+                rss = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, AttributeError):
+            pass
+    try:
+        import resource
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        peak = max(peak, maxrss if sys.platform == 'darwin' else maxrss * 1024)
+    except ImportError:
+        pass
+    return rss, max(peak, rss)
+
+
+class TrainingTelemetry:
+    def __init__(self):
+        self.epochs = []
+        self.batches = []
+        self.pipeline_batch_s = None
+        self.profile_dir = None
+        self.input_wait_s = 0.0
+
+    def as_dict(self):
+        return {
+            'epochs': self.epochs,
+            'batches': self.batches,
+            'pipeline_batch_s': self.pipeline_batch_s,
+            'profile_dir': self.profile_dir,
+        }
+
+    def export(self, path):
+        # .json holds the whole trace; .csv holds the epochs, with the
+        # batches written next to it as <name>_batches.csv
+        if path.endswith('.json'):
+            with open(path, 'w') as f:
+                json.dump(self.as_dict(), f, indent=2)
+            return [path]
+        root, ext = os.path.splitext(path)
+        batch_path = f"{root}_batches{ext or '.csv'}"
+        for rows, fields, target in ((self.epochs, EPOCH_FIELDS, path),
+                                     (self.batches, BATCH_FIELDS, batch_path)):
+            with open(target, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+                writer.writeheader()
+                writer.writerows(rows)
+        return [path, batch_path]
+
+    def timed(self, dataset):
+        # Keras pulls each batch inside its compiled train step, out of reach
+        # of callbacks. Batches are therefore handed over by a generator that
+        # times every fetch from the real pipeline; the wait it sees is the
+        # time training stood still for input.
+        import tensorflow as tf
+
+        telemetry = self
+
+        def batches():
+            iterator = iter(dataset)
+            while True:
+                start = time.perf_counter()
+                batch = next(iterator, None)
+                telemetry.input_wait_s += time.perf_counter() - start
+                if batch is None:
+                    return
+                yield batch
+
+        timed = tf.data.Dataset.from_generator(batches, output_signature=dataset.element_spec)
+        cardinality = int(dataset.cardinality())
+        if cardinality >= 0:
+            timed = timed.apply(tf.data.experimental.assert_cardinality(cardinality))
+        return timed
+
+    def callback(self, samples, batch_size, on_epoch=None, on_batch=None,
+                 batch_interval=0.1, profile_dir=None, profile_batches=(2, 6)):
+        import tensorflow as tf
+
+        telemetry = self
+        telemetry.profile_dir = profile_dir
+
+        class TelemetryCallback(tf.keras.callbacks.Callback):
+            # Batch records are kept for every batch; on_batch is throttled
+            # to one call per batch_interval seconds so a UI can keep up
+            profiling = False
+
+            # Input wait is accumulated by timed(); datasets passed to fit
+            # without it report no pipeline time
+            def on_epoch_begin(self, epoch, logs=None):
+                self.epoch = epoch
+                self.epoch_start = time.perf_counter()
+                self.wait_start = telemetry.input_wait_s
+                self.last_emit = 0.0
+                self.steps = 0
+
+            def on_train_batch_begin(self, batch, logs=None):
+                if profile_dir and self.epoch == 0 and batch == profile_batches[0]:
+                    tf.profiler.experimental.start(profile_dir)
+                    self.profiling = True
+                self.batch_start = time.perf_counter()
+
+            def on_train_batch_end(self, batch, logs=None):
+                now = time.perf_counter()
+                if self.profiling and batch == profile_batches[1]:
+                    tf.profiler.experimental.stop()
+                    self.profiling = False
+                seconds = now - self.batch_start
+                record = {
+                    'epoch': self.epoch,
+                    'batch': batch,
+                    'seconds': seconds,
+                    'samples_per_s': batch_size / seconds if seconds else 0.0,
+                    'loss': float((logs or {}).get('loss', float('nan'))),
+                }
+                telemetry.batches.append(record)
+                self.steps += 1
+                if on_batch is not None and now - self.last_emit >= batch_interval:
+                    self.last_emit = now
+                    on_batch(record)
+
+            def on_epoch_end(self, epoch, logs=None):
+                seconds = time.perf_counter() - self.epoch_start
+                rss, peak = memory_usage()
+                data_s = min(seconds, telemetry.input_wait_s - self.wait_start)
+                if telemetry.pipeline_batch_s is None and self.steps:
+                    telemetry.pipeline_batch_s = data_s / self.steps
+                record = {
+                    'epoch': epoch,
+                    'seconds': seconds,
+                    'samples': samples,
+                    'samples_per_s': samples / seconds if seconds else 0.0,
+                    'loss': float((logs or {}).get('loss', float('nan'))),
+                    'data_s': data_s,
+                    'compute_s': seconds - data_s,
+                    'rss_bytes': rss,
+                    'peak_rss_bytes': peak,
+                }
+                telemetry.epochs.append(record)
+                if on_epoch is not None:
+                    on_epoch(record)
+
+            def on_train_end(self, logs=None):
+                # A run shorter than the profiled range still closes the trace
+                if self.profiling:
+                    tf.profiler.experimental.stop()
+                    self.profiling = False
+
+        return TelemetryCallback()
@@ -0,0 +1,27 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+# The modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+
+@pytest.fixture
+def prices():
+    # Smooth, positive and long enough for a few dozen short windows
+    rng = np.random.default_rng(0)
+    return 100 + np.cumsum(rng.normal(0, 1, 400)) * 0.5 + 10 * np.sin(np.arange(400) / 15)
+
+
+@pytest.fixture
+def price_frame(prices):
+    return pd.DataFrame({'Close': prices})
+
+
+@pytest.fixture
+def registry(tmp_path):
+    from registry import ModelRegistry
+    return ModelRegistry(str(tmp_path / "registry"))
@@ -0,0 +1,55 @@
+import math
+import numpy as np
+import pytest
+from backtest import aggregate, fold_metrics, run_backtest, walk_forward_folds
+
+
+@pytest.mark.parametrize("mode", ['expanding', 'sliding'])
+def test_folds_test_the_block_after_training(mode):
+    folds = walk_forward_folds(400, 10, n_folds=4, mode=mode)
+    for fold in folds:
+        train_start, train_stop = fold['train']
+        test_start, test_stop = fold['test']
+        assert train_stop == test_start and test_stop > test_start
+    # Test blocks tile the end of the series without overlap
+    assert folds[-1]['test'][1] == 400 - 10
+    assert [f['test'][0] for f in folds[1:]] == [f['test'][1] for f in folds[:-1]]
+    sizes = [f['train'][1] - f['train'][0] for f in folds]
+    if mode == 'expanding':
+        assert all(f['train'][0] == 0 for f in folds) and sizes == sorted(sizes)
+    else:
+        assert len(set(sizes)) == 1
+
+
+def test_too_few_rows_for_the_folds():
+    with pytest.raises(ValueError):
+        walk_forward_folds(20, 10, n_folds=20)
+
+
+def test_fold_metrics():
+    y_true = np.array([2.0, 4.0, 1.0])
+    y_pred = np.array([3.0, 4.0, 3.0])
+    last_seen = np.array([1.0, 5.0, 2.0])
+    metrics = fold_metrics(y_true, y_pred, last_seen)
+    assert metrics['mse'] == pytest.approx(5 / 3)
+    assert metrics['rmse'] == pytest.approx(math.sqrt(5 / 3))
+    assert metrics['mae'] == pytest.approx(1.0)
+    assert metrics['mape'] == pytest.approx((50 + 0 + 200) / 3)
+    # Up and down are called right, the last rise is a fall
+    assert metrics['directional_accuracy'] == pytest.approx(2 / 3)
+
+
+def test_aggregate_skips_failed_folds():
+    ok = dict(fold_metrics(np.array([1.0, 2.0]), np.array([1.5, 2.5]), np.array([1.0, 1.0])),
+              y_true=[1.0, 2.0], y_pred=[1.5, 2.5], last_seen=[1.0, 1.0], seconds=1.0)
+    summary = aggregate([ok, {'fold': 1, 'error': 'boom'}])
+    assert summary['mse'] == {'mean': pytest.approx(0.25), 'std': 0.0}
+    assert summary['pooled']['mae'] == pytest.approx(0.5)
+    assert aggregate([{'error': 'boom'}]) == {}
+
+
+def test_backtest_runs_folds_in_parallel(prices):
+    report = run_backtest(prices, seq_length=10, n_folds=3, n_workers=2, epochs=1, units=8)
+    assert [f['fold'] for f in report['folds']] == [0, 1, 2]
+    assert all(len(f['y_pred']) == f['n_test'] for f in report['folds'])
+    assert np.isfinite(report['aggregate']['pooled']['rmse'])
@@ -0,0 +1,115 @@
+import os
+import numpy as np
+import pytest
+from core import TrainingJob
+
+OPTIONS = dict(seq_length=10, epochs=3, batch_size=32, units=8, layers=1, dropout=0.0,
+               seed=0, checkpoint_seconds=3600)
+
+
+class StopAfter:
+    # should_stop for a run interrupted partway through; TrainingJob asks
+    # before training, once per batch and once per epoch end
+    def __init__(self, calls):
+        self.calls = calls
+
+    def __call__(self):
+        self.calls -= 1
+        return self.calls < 0
+
+
+def train(df, **options):
+    return TrainingJob(df, 'Close', **dict(OPTIONS, **options)).run()
+
+
+def assert_same_weights(a, b):
+    for x, y in zip(a.get_weights(), b.get_weights()):
+        np.testing.assert_allclose(x, y, rtol=1e-5, atol=1e-6)
+
+
+@pytest.mark.parametrize("options", [{}, dict(shuffle_buffer=16, cache=True)])
+def test_resumed_run_matches_uninterrupted_run(price_frame, tmp_path, options):
+    reference = train(price_frame, **options)
+
+    checkpoints = str(tmp_path / "checkpoints")
+    # 312 training windows -> 10 batches per epoch; the first call comes
+    # before training, so this stops inside the second epoch
+    partial = train(price_frame, checkpoint_dir=checkpoints, should_stop=StopAfter(14),
+                    **options)
+    assert partial['stopped']
+    saved = os.listdir(checkpoints)
+    assert len(saved) == 1
+
+    resumed = train(price_frame, checkpoint_dir=checkpoints, resume=True, **options)
+    assert not resumed['stopped']
+    assert_same_weights(resumed['model'], reference['model'])
+    # The split epoch reports the loss of its resumed part only
+    loss = resumed['history']['loss']
+    assert len(loss) == OPTIONS['epochs']
+    np.testing.assert_allclose(loss[0], reference['history']['loss'][0], rtol=1e-5)
+    np.testing.assert_allclose(loss[2:], reference['history']['loss'][2:], rtol=1e-5)
+    # A finished run removes its checkpoint
+    assert not os.listdir(checkpoints)
+
+
+@pytest.mark.parametrize("calls", [10, 11])
+def test_resume_at_epoch_boundary(price_frame, tmp_path, calls):
+    # Stopped after the last batch of the first epoch, or at its end
+    checkpoints = str(tmp_path / "checkpoints")
+    train(price_frame, checkpoint_dir=checkpoints, should_stop=StopAfter(calls))
+    resumed = train(price_frame, checkpoint_dir=checkpoints, resume=True)
+    reference = train(price_frame)
+    assert_same_weights(resumed['model'], reference['model'])
+    np.testing.assert_allclose(resumed['history']['loss'], reference['history']['loss'],
+                               rtol=1e-5)
+
+
+def test_out_of_core_resume(prices, tmp_path):
+    import pandas as pd
+    from core import OutOfCoreJob
+
+    path = str(tmp_path / "prices.csv")
+    pd.DataFrame({'Close': prices}).to_csv(path, index=False)
+
+    def run(**options):
+        return OutOfCoreJob(path, 'Close', **dict(OPTIONS, **options)).run()
+
+    checkpoints = str(tmp_path / "checkpoints")
+    assert run(checkpoint_dir=checkpoints, should_stop=StopAfter(14))['stopped']
+    resumed = run(checkpoint_dir=checkpoints, resume=True)
+    assert_same_weights(resumed['model'], run()['model'])
+
+
+def test_without_resume_training_starts_over(price_frame, tmp_path):
+    checkpoints = str(tmp_path / "checkpoints")
+    train(price_frame, checkpoint_dir=checkpoints, should_stop=StopAfter(14))
+    fresh = train(price_frame, checkpoint_dir=checkpoints)
+    assert_same_weights(fresh['model'], train(price_frame)['model'])
+
+
+def test_seeded_order_keeps_shuffle_buffer():
+    from datasets import buffer_order
+
+    count, size = 500, 16
+    order = buffer_order(np.random.default_rng(0), count, size)
+    assert sorted(order) == list(range(count))
+    # A window can't be drawn before it has entered the buffer
+    assert np.all(order <= np.arange(count) + size - 1)
+    full = buffer_order(np.random.default_rng(0), count, None)
+    assert np.any(full > np.arange(count) + size - 1)
+
+
+def test_seeded_cache_yields_same_batches(prices):
+    from datasets import window_dataset
+    from windows import SequenceWindows
+
+    windows = SequenceWindows(prices[:, None], 10, start=50)
+
+    def batches(cache):
+        dataset = window_dataset(windows, batch_size=32, shuffle_buffer=16, cache=cache,
+                                 seed=3, first_epoch=2)
+        return [(x.numpy(), y.numpy()) for x, y in dataset]
+
+    for (x, y), (cx, cy) in zip(batches(False), batches(True)):
+        np.testing.assert_array_equal(x, cx)
+        np.testing.assert_array_equal(y, cy)
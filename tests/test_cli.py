@@ -0,0 +1,60 @@
+import json
+import os
+import subprocess
+import sys
+import pandas as pd
+import pytest
+from cli import main
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRAIN = ['--seq-length', '10', '--epochs', '1', '--units', '8', '--layers', '1',
+         '--no-checkpoint']
+
+
+@pytest.fixture
+def csv_path(price_frame, tmp_path, monkeypatch):
+    from registry import DEFAULT_BUDGET, ModelRegistry
+
+    # Saved models go to a per-test registry
+    monkeypatch.setattr(ModelRegistry.__init__, '__defaults__',
+                        (str(tmp_path / "registry"), DEFAULT_BUDGET))
+    path = tmp_path / "prices.csv"
+    frame = price_frame.assign(Date=pd.date_range('2021-01-01', periods=len(price_frame)))
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+def test_help_does_not_import_tensorflow():
+    code = ("import sys, contextlib, io\n"
+            "from cli import main\n"
+            "with contextlib.redirect_stdout(io.StringIO()):\n"
+            "    try: main(['train', '--help'])\n"
+            "    except SystemExit: pass\n"
+            "print('tensorflow' in sys.modules, 'pandas' in sys.modules)")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                         cwd=ROOT, check=True).stdout
+    assert out.split() == ['False', 'False']
+
+
+def test_train_then_forecast_from_the_saved_model(csv_path, capsys):
+    main(['train', csv_path] + TRAIN)
+    trained = json.loads(capsys.readouterr().out)
+    assert not trained['cached'] and trained['epochs'] == 1
+
+    main(['train', csv_path] + TRAIN)
+    assert json.loads(capsys.readouterr().out)['cached']
+
+    main(['forecast', csv_path, '--model', trained['key'], '--date', 'Date',
+          '--days', '3'] + TRAIN)
+    lines = capsys.readouterr().out.split()
+    assert lines[0] == 'date,prediction'
+    last = pd.Timestamp('2021-01-01') + pd.Timedelta(days=399)
+    assert [line.split(',')[0] for line in lines[1:]] == [
+        (last + pd.Timedelta(days=i)).strftime('%Y-%m-%d') for i in (1, 2, 3)]
+
+
+def test_evaluate_reports_metrics(csv_path, capsys):
+    main(['evaluate', csv_path] + TRAIN)
+    metrics = json.loads(capsys.readouterr().out)
+    assert metrics['rmse'] == pytest.approx(metrics['mse'] ** 0.5)
+    assert metrics['mae'] > 0
@@ -0,0 +1,140 @@
+import numpy as np
+import pytest
+from data_loader import SAMPLE_ROWS, iter_csv_chunks, load_csv
+
+ROWS = 2500
+BAD_ROW = 1700
+
+
+@pytest.fixture
+def stray_csv(tmp_path):
+    # A non-numeric value well past the rows sampled for dtype inference
+    assert BAD_ROW > SAMPLE_ROWS
+    path = tmp_path / "prices.csv"
+    lines = ["Date,Close"]
+    for i in range(ROWS):
+        close = "bad" if i == BAD_ROW else f"{100 + i * 0.5:.2f}"
+        lines.append(f"2020-01-01,{close}")
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def expected_close():
+    close = 100 + np.arange(ROWS) * 0.5
+    close[BAD_ROW] = np.nan
+    return close
+
+
+def test_load_csv_coerces_stray_value(stray_csv):
+    df = load_csv(stray_csv, usecols=['Close'], cache_dir=None)
+    np.testing.assert_allclose(df['Close'].to_numpy(), expected_close())
+
+
+@pytest.mark.parametrize('chunksize', [300, 1000, ROWS])
+def test_chunks_fall_back_after_stray_value(stray_csv, chunksize):
+    chunks = list(iter_csv_chunks(stray_csv, usecols=['Close'], chunksize=chunksize))
+    close = np.concatenate([chunk['Close'].to_numpy() for chunk, _, _ in chunks])
+    np.testing.assert_allclose(close, expected_close())
+    # Progress counts each row once, across the restart
+    rows = [count for _, count, _ in chunks]
+    assert rows == sorted(rows) and rows[-1] == ROWS
+
+
+def test_data_loader_survives_stray_value(stray_csv, monkeypatch):
+    import loader
+
+    monkeypatch.setattr(loader, 'read_cache', lambda *args: None)
+    monkeypatch.setattr(loader, 'write_cache', lambda *args: None)
+    worker = loader.DataLoader(stray_csv, usecols=['Close'], chunksize=500)
+    done, errors = [], []
+    worker.load_completed.connect(done.append)
+    worker.error_occurred.connect(errors.append)
+    worker.run()
+    assert not errors
+    np.testing.assert_allclose(done[0]['Close'].to_numpy(), expected_close())
+
+
+def test_memmap_conversion_survives_stray_value(stray_csv, tmp_path):
+    from memmap_store import MemmapSeries
+
+    series = MemmapSeries.from_csv(stray_csv, ['Close'], store_dir=str(tmp_path / "store"))
+    assert len(series) == ROWS
+    np.testing.assert_allclose(series.data[:, 0], expected_close(), rtol=1e-6)
+
+
+@pytest.mark.parametrize("sep", [",", ";", "\t", "|"])
+def test_delimiter_is_sniffed(tmp_path, sep):
+    from data_loader import sniff_delimiter
+
+    path = tmp_path / "prices.csv"
+    path.write_text(sep.join(["Date", "Close"]) + "\n"
+                    + "\n".join(f"2020-01-0{i}{sep}{100 + i}" for i in range(1, 8)) + "\n")
+    assert sniff_delimiter(str(path)) == sep
+    df = load_csv(str(path), cache_dir=None)
+    assert df['Close'].tolist() == [101, 102, 103, 104, 105, 106, 107]
+
+
+def test_currency_and_date_columns_are_parsed(tmp_path):
+    from data_loader import infer_column_kinds
+
+    path = tmp_path / "prices.csv"
+    path.write_text("Date,Close,Ticker\n"
+                    "2020-01-02,\"$1,234.50\",ABC\n"
+                    "2020-01-03, $1,ABC\n")
+    assert infer_column_kinds(str(path), ",") == {
+        'Date': 'date', 'Close': 'currency', 'Ticker': 'string'}
+    df = load_csv(str(path), cache_dir=None)
+    assert df['Close'].tolist() == [1234.5, 1.0]
+    assert str(df['Date'].dtype).startswith('datetime64')
+    assert df['Ticker'].tolist() == ['ABC', 'ABC']
+
+
+def test_parsed_csv_is_cached_until_the_file_changes(tmp_path, monkeypatch):
+    import os
+    import data_loader
+
+    path = tmp_path / "prices.csv"
+    path.write_text("Close\n1\n2\n3\n")
+    cache_dir = str(tmp_path / "cache")
+    first = load_csv(str(path), cache_dir=cache_dir)
+    assert os.path.exists(data_loader.cache_path(str(path), None, cache_dir))
+
+    def no_parse(*args, **kwargs):
+        raise AssertionError("parsed despite a cached copy")
+
+    monkeypatch.setattr(data_loader.pd, 'read_csv', no_parse)
+    assert load_csv(str(path), cache_dir=cache_dir).equals(first)
+    monkeypatch.undo()
+
+    path.write_text("Close\n1\n2\n3\n4\n")
+    assert len(load_csv(str(path), cache_dir=cache_dir)) == 4
+
+
+def test_data_loader_previews_first_chunk_and_reports_progress(stray_csv, monkeypatch):
+    import loader
+
+    monkeypatch.setattr(loader, 'read_cache', lambda *args: None)
+    monkeypatch.setattr(loader, 'write_cache', lambda *args: None)
+    worker = loader.DataLoader(stray_csv, chunksize=500)
+    previews, progress, done = [], [], []
+    worker.preview_ready.connect(previews.append)
+    worker.progress_updated.connect(lambda rows, nbytes: progress.append((rows, nbytes)))
+    worker.load_completed.connect(done.append)
+    worker.run()
+    assert len(previews) == 1 and len(previews[0]) == 5
+    assert [rows for rows, _ in progress] == [500, 1000, 1500, 2000, 2500]
+    assert all(a[1] <= b[1] for a, b in zip(progress, progress[1:]))
+    assert len(done[0]) == ROWS
+
+
+def test_data_loader_stops_at_a_chunk_boundary(stray_csv, monkeypatch):
+    import loader
+
+    monkeypatch.setattr(loader, 'read_cache', lambda *args: None)
+    worker = loader.DataLoader(stray_csv, chunksize=500)
+    cancelled, done = [], []
+    worker.preview_ready.connect(lambda _: worker.stop())
+    worker.load_cancelled.connect(lambda: cancelled.append(True))
+    worker.load_completed.connect(done.append)
+    worker.run()
+    assert cancelled and not done
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+import tensorflow as tf
+from datasets import window_dataset
+from windows import SequenceWindows
+
+
+def collect(dataset):
+    xs, ys = zip(*[(x.numpy(), y.numpy()) for x, y in dataset])
+    return np.concatenate(xs), np.concatenate(ys)
+
+
+@pytest.mark.parametrize("horizon", [1, 4])
+@pytest.mark.parametrize("cache", [False, True])
+def test_unshuffled_stream_matches_tensor_slices(prices, horizon, cache):
+    scaled = ((prices - prices.min()) / np.ptp(prices)).astype(np.float32)
+    windows = SequenceWindows(scaled, 10)
+    targets = windows.target_matrix(horizon)
+    X, y = collect(tf.data.Dataset.from_tensor_slices(
+        (windows[:len(targets)].materialize(), targets)).batch(32))
+
+    sx, sy = collect(window_dataset(windows, batch_size=32, shuffle_buffer=0,
+                                    cache=cache, horizon=horizon))
+    np.testing.assert_allclose(sx, X)
+    np.testing.assert_allclose(sy.reshape(y.shape), y)
+
+
+@pytest.mark.parametrize("seed", [None, 5])
+def test_shuffled_stream_keeps_window_target_pairs(seed):
+    # Values equal their row index, so a window's first value is its start
+    windows = SequenceWindows(np.arange(400, dtype=np.float32), 10, start=30)
+    x, y = collect(window_dataset(windows, batch_size=16, shuffle_buffer=50, seed=seed))
+    assert sorted(x[:, 0, 0]) == list(range(30, 390))
+    np.testing.assert_array_equal(y[:, 0], x[:, -1, 0] + 1)
+    assert not np.array_equal(x[:, 0, 0], np.arange(30, 390))
+
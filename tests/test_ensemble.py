@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from ensemble import inverse_error_weights, member_specs, split_windows
+
+
+@pytest.fixture(scope="module")
+def members():
+    import tensorflow as tf
+    from model_builder import ModelBuilder
+
+    built = []
+    for seed in range(3):
+        tf.keras.utils.set_random_seed(seed)
+        built.append(ModelBuilder.build('lstm', (10, 1), units=(4,)))
+    return built
+
+
+def test_member_specs_cycle_architectures():
+    specs = member_specs(5, ('lstm', 'gru'), seed=7)
+    assert [s['architecture'] for s in specs] == ['lstm', 'gru', 'lstm', 'gru', 'lstm']
+    assert [s['seed'] for s in specs] == [7, 8, 9, 10, 11]
+
+
+def test_split_windows_holds_out_validation_then_test():
+    assert split_windows(100, test_size=0.2, val_size=0.1) == (70, 80)
+
+
+def test_inverse_error_weights():
+    weights = inverse_error_weights([1.0, 2.0, 4.0])
+    np.testing.assert_allclose(weights, np.array([4, 2, 1]) / 7)
+    assert np.isfinite(inverse_error_weights([0.0, 1.0])).all()
+
+
+@pytest.mark.parametrize("method", ['mean', 'median', 'weighted'])
+def test_ensemble_combines_member_outputs(members, method):
+    from model_builder import ModelBuilder
+
+    weights = np.array([0.5, 0.3, 0.2]) if method == 'weighted' else None
+    model, stacked = ModelBuilder.build_ensemble(members, method, weights)
+    x = np.random.default_rng(0).random((6, 10, 1)).astype(np.float32)
+    outputs = np.stack([m.predict(x, verbose=0) for m in members], axis=1)
+    np.testing.assert_allclose(stacked.predict(x, verbose=0), outputs, rtol=1e-5)
+    expected = {
+        'mean': lambda: outputs.mean(axis=1),
+        'median': lambda: np.median(outputs, axis=1),
+        'weighted': lambda: np.tensordot(weights, outputs, axes=([0], [1])),
+    }[method]()
+    np.testing.assert_allclose(model.predict(x, verbose=0), expected, rtol=1e-5, atol=1e-6)
+
+
+def test_unknown_method_is_rejected_before_training(price_frame, registry):
+    from core import ensemble
+
+    with pytest.raises(ValueError, match="unknown ensemble method"):
+        ensemble(price_frame, 'Close', method='mode', registry=registry)
+    assert not registry.entries()
+
+
+def test_cli_choices_come_from_model_builder():
+    from cli import build_parser
+    from model_builder import ARCHITECTURES
+
+    parser = build_parser()
+    for name in ARCHITECTURES:
+        args = parser.parse_args(['ensemble', 'prices.csv', '--architectures', name])
+        assert args.architectures == [name]
+    with pytest.raises(SystemExit):
+        parser.parse_args(['ensemble', 'prices.csv', '--architectures', 'transformer'])
+    with pytest.raises(SystemExit):
+        parser.parse_args(['ensemble', 'prices.csv', '--method', 'mode'])
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+from features import compute_features
+
+WINDOW = 14
+
+
+@pytest.fixture
+def ohlcv(prices):
+    rng = np.random.default_rng(1)
+    return pd.DataFrame({
+        'Close': prices,
+        'Open': prices + rng.normal(0, 0.1, len(prices)),
+        'Volume': rng.integers(1000, 5000, len(prices)).astype(float),
+    }, index=pd.RangeIndex(1000, 1000 + len(prices)))
+
+
+@pytest.mark.parametrize("feature_cols, warmup", [
+    (['return'], 1),
+    (['rsi'], 1),
+    (['sma'], WINDOW - 1),
+    (['volume_z'], WINDOW - 1),
+    (['volatility'], WINDOW),
+    (['macd', 'macd_signal'], 0),
+    (['Open'], 0),
+    (['return', 'sma', 'volatility', 'rsi', 'macd', 'volume_z'], WINDOW),
+])
+def test_rows_stay_aligned_with_input(ohlcv, feature_cols, warmup):
+    frame = compute_features(ohlcv, 'Close', feature_cols, window=WINDOW)
+    assert len(frame) == len(ohlcv) - warmup
+    # Row i of the result is row warmup + i of the input
+    np.testing.assert_array_equal(frame.index, ohlcv.index[warmup:])
+    np.testing.assert_array_equal(frame['Close'].to_numpy(), ohlcv['Close'].to_numpy()[warmup:])
+    assert not frame.isna().any().any()
+
+
+def test_indicator_values_use_their_own_row(ohlcv):
+    frame = compute_features(ohlcv, 'Close', ['return', 'sma'], window=WINDOW)
+    close = ohlcv['Close']
+    row = ohlcv.index[100]
+    assert frame.loc[row, 'return'] == pytest.approx(close[row] / close[row - 1] - 1)
+    assert frame.loc[row, 'sma'] == pytest.approx(close.loc[row - WINDOW + 1:row].mean())
+
+
+def test_interior_gap_in_price_raises(ohlcv):
+    ohlcv.loc[ohlcv.index[200], 'Close'] = np.nan
+    with pytest.raises(ValueError, match="missing or infinite"):
+        compute_features(ohlcv, 'Close', ['return'], window=WINDOW)
+
+
+def test_gaps_in_raw_columns_carry_forward(ohlcv):
+    ohlcv.loc[ohlcv.index[200], 'Open'] = np.nan
+    frame = compute_features(ohlcv, 'Close', ['Open'], window=WINDOW)
+    assert len(frame) == len(ohlcv)
+    assert frame['Open'].iloc[200] == ohlcv['Open'].iloc[199]
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from core import TrainingJob
+from forecaster import RecursiveForecaster
+
+OPTIONS = dict(seq_length=10, epochs=1, units=8, layers=1, dropout=0.0, seed=0)
+
+
+@pytest.fixture(scope="module")
+def model():
+    from model_builder import ModelBuilder
+    import tensorflow as tf
+
+    tf.keras.utils.set_random_seed(0)
+    return ModelBuilder.build('lstm', (10, 1), units=(8,))
+
+
+def stepwise(model, window, days):
+    # One model.predict per day, feeding each prediction back
+    window = list(window)
+    out = []
+    for _ in range(days):
+        pred = float(model.predict(np.asarray(window)[None, :, None], verbose=0)[0, 0])
+        out.append(pred)
+        window = window[1:] + [pred]
+    return np.asarray(out)
+
+
+def test_recursive_forecast_matches_stepwise_predict(model, prices):
+    window = (prices[-10:] - prices.min()) / np.ptp(prices)
+    forecast = RecursiveForecaster(model, 10).forecast(window, 7)
+    assert forecast.shape == (7,)
+    np.testing.assert_allclose(forecast, stepwise(model, window, 7), rtol=1e-4, atol=1e-5)
+
+
+def test_batched_forecast_matches_single_series(model, prices):
+    scaled = (prices - prices.min()) / np.ptp(prices)
+    windows = np.stack([scaled[i:i + 10] for i in (0, 100, 200)])
+    forecaster = RecursiveForecaster(model, 10)
+    batched = forecaster.forecast(windows[..., None], 5)
+    assert batched.shape == (3, 5)
+    for window, row in zip(windows, batched):
+        np.testing.assert_allclose(row, forecaster.forecast(window, 5), rtol=1e-5, atol=1e-6)
+
+
+@pytest.mark.parametrize("horizon", [1, 5])
+def test_training_targets_stay_out_of_test_rows(price_frame, horizon, monkeypatch):
+    seen = {}
+    make_dataset = TrainingJob._make_dataset
+
+    def spy(self, windows, **kwargs):
+        seen['windows'] = windows
+        return make_dataset(self, windows, **kwargs)
+
+    monkeypatch.setattr(TrainingJob, '_make_dataset', spy)
+    result = TrainingJob(price_frame, 'Close', horizon=horizon, test_size=0.2,
+                         **OPTIONS).run()
+
+    preprocessor = result['preprocessor']
+    fit_rows = preprocessor.fit_rows(len(price_frame), 0.2, horizon)
+    assert preprocessor.scaler.n_samples_seen_ == fit_rows
+    # The last target of the last training window is the last fitted row
+    train = seen['windows']
+    last_target = train.start + len(train.target_view(horizon)) - 1 + 10 + horizon - 1
+    assert len(train.target_view(horizon)) == len(train)
+    assert last_target == fit_rows - 1
+    assert len(result['X_test']) == len(price_frame) - 10 - len(train)
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from core import forecast, train
+
+OPTIONS = dict(seq_length=10, epochs=1, units=8, layers=1, seed=0, finetune_epochs=2)
+
+
+@pytest.fixture
+def base(price_frame, registry):
+    return train(price_frame.iloc[:300], 'Close', registry=registry, **OPTIONS)
+
+
+def snapshot(result):
+    return {
+        'weights': [w.copy() for w in result['model'].get_weights()],
+        'scaled': np.array(result['preprocessor'].scaled_data),
+        'scaler': (result['preprocessor'].scaler.data_min_.copy(),
+                   result['preprocessor'].scaler.data_max_.copy()),
+        'series': result['series'].copy(),
+        'key': result['key'],
+        'forecast': forecast(result, 5),
+    }
+
+
+@pytest.mark.parametrize("range_policy", ['keep', 'extend'])
+def test_update_leaves_base_result_unchanged(price_frame, registry, base, range_policy):
+    before = snapshot(base)
+    updated = train(price_frame, 'Close', registry=registry, base_result=base,
+                    range_policy=range_policy, **OPTIONS)
+    assert updated['incremental']
+    assert updated['model'] is not base['model']
+
+    after = snapshot(base)
+    for old, new in zip(before['weights'], after['weights']):
+        np.testing.assert_array_equal(old, new)
+    np.testing.assert_array_equal(before['scaled'], after['scaled'])
+    np.testing.assert_array_equal(before['scaler'][0], after['scaler'][0])
+    np.testing.assert_array_equal(before['scaler'][1], after['scaler'][1])
+    np.testing.assert_array_equal(before['series'], after['series'])
+    assert before['key'] == after['key']
+    np.testing.assert_array_equal(before['forecast'], after['forecast'])
+
+    # The tuned copy did train
+    assert any(not np.array_equal(a, b) for a, b in
+               zip(before['weights'], updated['model'].get_weights()))
+
+
+def test_update_is_keyed_apart_from_full_retrain(price_frame, registry, base):
+    updated = train(price_frame, 'Close', registry=registry, base_result=base, **OPTIONS)
+    assert not updated['stopped']
+    assert updated['config']['incremental']
+    assert updated['config']['base_key'] == base['key']
+    assert registry.contains(updated['key'])
+
+    full = train(price_frame, 'Close', registry=registry, **OPTIONS)
+    assert not full['cached']
+    assert full['key'] != updated['key']
+
+
+def test_stopped_update_is_not_saved(price_frame, registry, base):
+    updated = train(price_frame, 'Close', registry=registry, base_result=base,
+                    should_stop=lambda: True, **OPTIONS)
+    assert updated['stopped']
+    assert not registry.contains(updated['key'])
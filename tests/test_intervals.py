@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+import tensorflow as tf
+from forecaster import MonteCarloForecaster, RecursiveForecaster
+
+OPTIONS = dict(seq_length=10, epochs=2, units=8, layers=1, seed=0)
+
+
+@pytest.fixture(scope="module")
+def model():
+    from model_builder import ModelBuilder
+
+    tf.keras.utils.set_random_seed(0)
+    return ModelBuilder.build('lstm', (10, 1), units=(8,), dropout=0.3)
+
+
+@pytest.fixture(scope="module")
+def quantile_result():
+    import pandas as pd
+    from core import train
+
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({'Close': 100 + np.cumsum(rng.normal(size=300))})
+    return train(frame, 'Close', quantiles=[0.05, 0.5, 0.95], **OPTIONS)
+
+
+def test_mc_paths_vary_only_through_dropout(model, prices):
+    from model_builder import ModelBuilder
+
+    window = ((prices[-10:] - prices.min()) / np.ptp(prices))
+    paths = MonteCarloForecaster(model, 10, samples=32).sample(window, 5)
+    assert paths.shape == (32, 5)
+    assert np.ptp(paths[:, 0]) > 0
+
+    # Without dropout every path is the point forecast
+    plain = ModelBuilder.build('lstm', (10, 1), units=(8,), dropout=0.0)
+    paths = MonteCarloForecaster(plain, 10, samples=4).sample(window, 5)
+    point = RecursiveForecaster(plain, 10).forecast(window, 5)
+    np.testing.assert_allclose(paths, np.tile(point, (4, 1)), rtol=1e-5, atol=1e-6)
+
+
+def test_mc_batches_series(model, prices):
+    scaled = (prices - prices.min()) / np.ptp(prices)
+    windows = np.stack([scaled[:10], scaled[-10:]])[..., None]
+    paths = MonteCarloForecaster(model, 10, samples=8).sample(windows, 3)
+    assert paths.shape == (2, 8, 3)
+
+
+def test_mc_bands_are_ordered_prices(quantile_result):
+    from core import forecast_intervals
+
+    intervals = forecast_intervals(quantile_result, 5, method='mc', samples=64)
+    bands = np.asarray(intervals['bands'])
+    assert intervals['quantiles'] == [0.05, 0.5, 0.95]
+    assert bands.shape == (3, 5)
+    assert np.all(np.diff(bands, axis=0) >= 0)
+
+
+def test_quantile_head_bands(quantile_result):
+    from core import forecast, forecast_intervals
+
+    intervals = forecast_intervals(quantile_result, 4, method='quantile')
+    bands = np.asarray(intervals['bands'])
+    assert bands.shape == (3, 4)
+    assert np.all(np.diff(bands, axis=0) >= 0)
+    # The point model is untouched by the quantile head
+    assert len(forecast(quantile_result, 4)) == 4
+    with pytest.raises(ValueError):
+        forecast_intervals(quantile_result, 4, method='bootstrap')
+
+
+def test_quantile_method_needs_a_head(price_frame):
+    from core import forecast_intervals, train
+
+    result = train(price_frame, 'Close', **OPTIONS)
+    with pytest.raises(ValueError, match="quantile head"):
+        forecast_intervals(result, 3, method='quantile')
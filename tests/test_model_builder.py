@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+import tensorflow as tf
+from model_builder import ARCHITECTURES, ModelBuilder
+
+
+@pytest.mark.parametrize("architecture", sorted(ARCHITECTURES))
+@pytest.mark.parametrize("horizon", [1, 3])
+def test_every_architecture_builds_and_trains(architecture, horizon):
+    model = ModelBuilder.build(architecture, (20, 2), horizon=horizon, units=(8, 8))
+    assert model.output_shape == (None, horizon)
+    x = np.random.default_rng(0).random((16, 20, 2)).astype(np.float32)
+    y = np.random.default_rng(1).random((16, horizon)).astype(np.float32)
+    loss = model.fit(x, y, epochs=1, verbose=0).history['loss']
+    assert np.isfinite(loss).all()
+
+
+@pytest.mark.parametrize("seq_length", [5, 60, 365])
+def test_tcn_receptive_field_covers_the_window(seq_length):
+    model = ModelBuilder.build('tcn', (seq_length, 1), units=(4,), dropout=0.0)
+    x = np.zeros((1, seq_length, 1), dtype=np.float32)
+    changed = x.copy()
+    changed[0, 0, 0] = 1.0
+    # The first value of the window reaches the output
+    assert not np.allclose(model.predict(x, verbose=0), model.predict(changed, verbose=0))
+
+
+def test_unknown_architecture():
+    with pytest.raises(ValueError, match="unknown architecture"):
+        ModelBuilder.build('transformer', (10, 1))
+
+
+def test_mixed_precision_leaves_the_global_policy(monkeypatch):
+    import model_builder
+
+    monkeypatch.setattr(model_builder, 'gpu_available', lambda: True)
+    tf.keras.mixed_precision.set_global_policy('float32')
+    model = ModelBuilder.build('gru', (10, 1), units=(8,), mixed_precision=True)
+    assert tf.keras.mixed_precision.global_policy().name == 'float32'
+    assert model.layers[1].dtype_policy.name == 'mixed_float16'
+    # The output stays float32 for a stable loss
+    assert model.output.dtype == 'float32'
+
+
+def test_cpu_builds_stay_float32():
+    model = ModelBuilder.build('lstm', (10, 1), units=(8,), mixed_precision=True)
+    if not tf.config.list_physical_devices('GPU'):
+        assert all(layer.dtype_policy.name == 'float32' for layer in model.layers)
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+from multi_asset import MultiSeriesPreprocessor, forecast_all, from_long_frame, train_multi_asset
+
+
+@pytest.fixture
+def series(prices):
+    return {'AAA': prices[:300], 'BBB': prices[::-1] * 10, 'CCC': prices[:5]}
+
+
+def test_each_series_gets_its_own_scaling(series):
+    preprocessor = MultiSeriesPreprocessor(seq_length=10)
+    scaled = preprocessor.fit_transform(series, test_size=0.2)
+    # Too short for a window
+    assert preprocessor.names == ['AAA', 'BBB']
+    for i, name in enumerate(preprocessor.names):
+        values = series[name]
+        fit_rows = int((len(values) - 10) * 0.8) + 10
+        part = scaled[preprocessor.offsets[i]:preprocessor.offsets[i] + len(values)]
+        assert part[:fit_rows].min() == pytest.approx(0)
+        assert part[:fit_rows].max() == pytest.approx(1)
+        np.testing.assert_allclose(preprocessor.inverse_transform(part, i), values)
+
+
+def test_windows_stay_inside_one_series(series):
+    preprocessor = MultiSeriesPreprocessor(seq_length=10)
+    preprocessor.fit_transform(series, test_size=0.2)
+    (train, train_ids), (test, test_ids) = preprocessor.window_index(0.2)
+    counts = preprocessor.lengths - 10
+    assert len(train) + len(test) == counts.sum()
+    ends = (preprocessor.offsets + preprocessor.lengths)
+    # The target row of every window lies in the window's own series
+    assert np.all(train + 10 < ends[train_ids])
+    assert np.all(test + 10 < ends[test_ids])
+    assert np.all(train >= preprocessor.offsets[train_ids])
+    for i in range(2):
+        assert train[train_ids == i].max() < test[test_ids == i].min()
+
+
+def test_long_frame_groups_by_ticker():
+    df = pd.DataFrame({'Ticker': ['B', 'A', 'B', 'A'], 'Date': [2, 2, 1, 1],
+                       'Close': [4.0, 2.0, 3.0, 1.0]})
+    grouped = from_long_frame(df, 'Ticker', 'Close', 'Date')
+    assert list(grouped) == ['A', 'B']
+    np.testing.assert_array_equal(grouped['B'], [3.0, 4.0])
+
+
+@pytest.mark.parametrize("embedding_dim", [0, 4])
+def test_forecast_all_returns_a_path_per_ticker(series, embedding_dim):
+    result = train_multi_asset(series, seq_length=10, epochs=1, units=8,
+                               embedding_dim=embedding_dim)
+    paths = forecast_all(result, 4)
+    assert sorted(paths) == ['AAA', 'BBB']
+    assert all(path.shape == (4,) and np.isfinite(path).all() for path in paths.values())
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+OPTIONS = ['--seq-length', '10', '--epochs', '1', '--units', '8', '--layers', '1',
+           '--no-cache', '--no-checkpoint']
+
+
+@pytest.fixture
+def ohlcv_csv(prices, tmp_path):
+    rng = np.random.default_rng(1)
+    path = tmp_path / "prices.csv"
+    pd.DataFrame({'Date': pd.date_range('2020-01-01', periods=len(prices)).strftime('%Y-%m-%d'),
+                  'Close': prices,
+                  'Volume': rng.uniform(1e3, 1e4, len(prices)),
+                  'Open': prices + rng.normal(size=len(prices))}).to_csv(path, index=False)
+    return str(path)
+
+
+def test_memmap_store_matches_csv(ohlcv_csv, tmp_path):
+    from memmap_store import MemmapSeries
+
+    series = MemmapSeries.from_csv(ohlcv_csv, ['Close', 'Volume'],
+                                   store_dir=str(tmp_path / "store"))
+    frame = pd.read_csv(ohlcv_csv)
+    np.testing.assert_allclose(series.data, frame[['Close', 'Volume']].to_numpy(), rtol=1e-6)
+    low, high = series.column_range(100)
+    np.testing.assert_allclose(low, frame[['Close', 'Volume']][:100].min(), rtol=1e-6)
+    np.testing.assert_allclose(high, frame[['Close', 'Volume']][:100].max(), rtol=1e-6)
+
+
+@pytest.mark.parametrize("horizon", [1, 3])
+def test_fit_rows_cover_training_targets_only(horizon):
+    from preprocessor import DataPreprocessor
+
+    preprocessor = DataPreprocessor('Close', 10)
+    n_windows = preprocessor.n_windows(400, horizon)
+    assert n_windows == 400 - 10 - horizon + 1
+    split_idx = int(n_windows * 0.8)
+    # The last training window reads rows up to its final target
+    assert preprocessor.fit_rows(400, 0.2, horizon) == (split_idx - 1) + 10 + horizon
+
+
+def test_load_data_reads_feature_columns(ohlcv_csv):
+    from core import load_data
+
+    df = load_data(ohlcv_csv, 'Close', 'Date', ['Volume', 'rsi', 'volume_z'])
+    assert sorted(df.columns) == ['Close', 'Date', 'Volume']
+
+
+def test_cli_passes_features_to_in_memory_training(ohlcv_csv):
+    from cli import _result, build_parser
+
+    args = build_parser().parse_args(['train', ohlcv_csv, '--features', 'Volume', 'rsi']
+                                     + OPTIONS)
+    _, result = _result(args)
+    assert result['preprocessor'].feature_cols == ['Volume', 'rsi']
+    assert result['model'].input_shape[-1] == 3
+
+
+def test_out_of_core_rejects_indicators(ohlcv_csv):
+    from core import OutOfCoreJob
+
+    with pytest.raises(ValueError, match="rsi"):
+        OutOfCoreJob(ohlcv_csv, 'Close', feature_cols=['Volume', 'rsi'])
+
+
+def test_memmap_dataset_matches_windows(prices):
+    from datasets import memmap_dataset, memmap_steps
+    from windows import SequenceWindows
+
+    data = np.column_stack([prices, prices * 2]).astype(np.float32)
+    offset, scale = np.zeros(2, np.float32), np.ones(2, np.float32)
+    batches = list(memmap_dataset(data, 10, offset, scale, batch_size=32, horizon=2,
+                                  shuffle=False, block_windows=100))
+    x = np.concatenate([b[0].numpy() for b in batches])
+    y = np.concatenate([b[1].numpy() for b in batches])
+    windows = SequenceWindows(data, 10)
+    targets = windows.target_matrix(2)
+    np.testing.assert_allclose(x, windows[:len(targets)].materialize())
+    np.testing.assert_allclose(y, targets)
+    assert memmap_steps(len(targets), 32, 100) == len(batches)
@@ -0,0 +1,57 @@
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+import pandas as pd
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from plotting import FastPlot, as_numeric_x, minmax_decimate
+
+
+@pytest.fixture
+def plot():
+    figure = Figure(figsize=(4, 3), dpi=100)
+    return FastPlot(figure, FigureCanvasAgg(figure))
+
+
+@pytest.mark.parametrize("newest_first", [False, True])
+def test_every_point_of_a_short_date_series_is_drawn(plot, newest_first):
+    dates = pd.date_range('2024-01-01', periods=30, freq='D')
+    prices = np.arange(30, dtype=float)
+    if newest_first:
+        dates, prices = dates[::-1], prices[::-1]
+    plot.set_series('actual', dates.to_numpy(), prices)
+    plot.autoscale()
+
+    x, y = plot.lines['actual'].line.get_data()
+    assert len(x) == 30
+    assert (np.diff(x) > 0).all()
+    # Each price stays with its own date
+    np.testing.assert_array_equal(y, np.arange(30))
+    expected, _ = as_numeric_x(pd.date_range('2024-01-01', periods=30, freq='D').to_numpy())
+    np.testing.assert_allclose(plot.ax.get_xlim(), (expected[0], expected[-1]))
+
+
+def test_long_series_is_decimated_to_the_visible_range(plot):
+    n = 200_000
+    y = np.sin(np.arange(n) / 500.0)
+    y[123_456] = 50.0
+    plot.set_series('line', np.arange(n), y)
+    plot.autoscale()
+    x_drawn, y_drawn = plot.lines['line'].line.get_data()
+    assert len(x_drawn) <= 2 * int(plot.ax.bbox.width)
+    assert y_drawn.max() == 50.0
+
+    plot.ax.set_xlim(1000, 2000)
+    x_drawn, _ = plot.lines['line'].line.get_data()
+    assert x_drawn.min() >= 999 and x_drawn.max() <= 2001
+
+
+def test_decimation_keeps_extremes_in_order():
+    rng = np.random.default_rng(0)
+    x = np.arange(10_000, dtype=float)
+    y = rng.normal(size=10_000)
+    xs, ys = minmax_decimate(x, y, 100)
+    assert len(xs) == 200
+    assert (np.diff(xs) >= 0).all()
+    assert ys.max() == y.max() and ys.min() == y.min()
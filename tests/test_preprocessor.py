@@ -0,0 +1,33 @@
+import json
+import numpy as np
+from preprocessor import DataPreprocessor
+
+
+def test_scaler_sees_training_rows_only(price_frame):
+    frame = price_frame.copy()
+    fit_rows = DataPreprocessor('Close', 10).fit_rows(len(frame), 0.2)
+    # A spike in the test rows must not move the scaling
+    frame.loc[fit_rows:, 'Close'] = 1e6
+    preprocessor = DataPreprocessor('Close', 10)
+    preprocessor.preprocess(frame, test_size=0.2)
+    train = frame['Close'].to_numpy()[:fit_rows]
+    assert preprocessor.scaler.data_min_[0] == train.min()
+    assert preprocessor.scaler.data_max_[0] == train.max()
+    assert preprocessor.scaler.n_samples_seen_ == fit_rows
+
+
+def test_transform_reuses_fitted_scaling(price_frame):
+    preprocessor = DataPreprocessor('Close', 10)
+    X, y, _ = preprocessor.preprocess(price_frame, test_size=0.2)
+    np.testing.assert_allclose(preprocessor.transform(price_frame),
+                               preprocessor.scaled_data)
+    np.testing.assert_allclose(y[:, 0], preprocessor.scaled_data[10:, 0])
+
+
+def test_state_round_trips_through_json(price_frame):
+    preprocessor = DataPreprocessor('Close', 10)
+    preprocessor.preprocess(price_frame, test_size=0.2)
+    restored = DataPreprocessor.from_state(json.loads(json.dumps(preprocessor.get_state())))
+    np.testing.assert_allclose(restored.transform(price_frame.tail(50)),
+                               preprocessor.transform(price_frame.tail(50)))
+    np.testing.assert_allclose(restored.last_window(), preprocessor.last_window())
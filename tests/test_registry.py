@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from registry import HASH_ROWS, model_key
+
+CONFIG = {'architecture': 'lstm', 'seq_length': 10, 'units': 8}
+
+
+def test_key_depends_on_series_and_config(prices):
+    key = model_key(prices, CONFIG)
+    assert key == model_key(prices.copy(), dict(CONFIG))
+    assert key != model_key(prices[:-1], CONFIG)
+    changed = prices.copy()
+    changed[5] += 1e-9
+    assert key != model_key(changed, CONFIG)
+    assert key != model_key(prices, dict(CONFIG, units=16))
+    assert key != model_key(prices, dict(CONFIG, incremental=True))
+
+
+def test_chunked_hash_equals_hash_of_whole_series(monkeypatch):
+    import registry
+
+    series = np.arange(10_000, dtype=np.float64)
+    whole = model_key(series, CONFIG)
+    monkeypatch.setattr(registry, 'HASH_ROWS', 777)
+    assert registry.model_key(series, CONFIG) == whole
+    assert HASH_ROWS != 777
+
+
+def test_training_hits_registry_for_same_data_and_config(price_frame, registry):
+    from core import train
+
+    options = dict(seq_length=10, epochs=1, units=8, layers=1, seed=0, registry=registry)
+    first = train(price_frame, 'Close', **options)
+    assert not first['cached']
+    assert registry.contains(first['key'])
+
+    again = train(price_frame, 'Close', **options)
+    assert again['cached']
+    assert again['key'] == first['key']
+
+    # A different configuration or different data misses
+    other = train(price_frame, 'Close', **dict(options, units=4))
+    assert not other['cached'] and other['key'] != first['key']
+    shorter = train(price_frame.iloc[:-1], 'Close', **options)
+    assert not shorter['cached'] and shorter['key'] != first['key']
+
+
+def test_saved_entry_round_trips(price_frame, registry):
+    from core import load_result, train
+
+    result = train(price_frame, 'Close', seq_length=10, epochs=1, units=8, layers=1,
+                   seed=0, registry=registry)
+    loaded = load_result(registry, result['key'], price_frame)
+    np.testing.assert_allclose(loaded['model'].predict(result['X_test'], verbose=0),
+                               result['model'].predict(result['X_test'], verbose=0),
+                               rtol=1e-6)
+    np.testing.assert_array_equal(loaded['y_test'], result['y_test'])
+    assert loaded['config'] == result['config']
+
+
+def test_entry_without_preprocessor_state_is_a_miss(price_frame, registry):
+    import os
+    from core import train
+    from registry import PREPROCESSOR_FILE
+
+    first = train(price_frame, 'Close', seq_length=10, epochs=1, units=8, layers=1,
+                  seed=0, registry=registry)
+    os.remove(os.path.join(registry.path(first['key']), PREPROCESSOR_FILE))
+    assert not registry.contains(first['key'])
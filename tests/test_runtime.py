@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from preprocessor import DataPreprocessor
+from runtime import ExportedForecaster, NumpyModel, export_numpy
+
+SEQ_LENGTH = 12
+
+
+@pytest.fixture
+def windows():
+    return np.random.default_rng(0).random((16, SEQ_LENGTH, 2)).astype(np.float32)
+
+
+@pytest.mark.parametrize("architecture", ['lstm', 'gru', 'tcn', 'dense'])
+@pytest.mark.parametrize("horizon", [1, 3])
+def test_numpy_model_matches_keras(tmp_path, windows, architecture, horizon):
+    import tensorflow as tf
+    from model_builder import ModelBuilder
+
+    tf.keras.utils.set_random_seed(0)
+    model = ModelBuilder.build(architecture, (SEQ_LENGTH, 2), horizon=horizon, units=(8, 6))
+    path = export_numpy(model, None, str(tmp_path / "model.npz"))
+
+    expected = model.predict(windows, verbose=0)
+    actual = NumpyModel.load(path).predict(windows)
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(actual, expected, rtol=1e-4, atol=1e-5)
+
+
+def test_multi_series_model_matches_keras(tmp_path, windows):
+    import tensorflow as tf
+    from model_builder import ModelBuilder
+
+    tf.keras.utils.set_random_seed(0)
+    model = ModelBuilder.build_multi_series((SEQ_LENGTH, 2), n_series=4, units=(8,))
+    ids = np.arange(len(windows)) % 4
+    path = export_numpy(model, None, str(tmp_path / "model.npz"))
+    np.testing.assert_allclose(NumpyModel.load(path).predict(windows, ids),
+                               model.predict([windows, ids], verbose=0),
+                               rtol=1e-4, atol=1e-5)
+
+
+def test_exported_forecast_matches_keras_forecast(tmp_path, prices):
+    import tensorflow as tf
+    from forecaster import RecursiveForecaster
+    from model_builder import ModelBuilder
+
+    tf.keras.utils.set_random_seed(0)
+    preprocessor = DataPreprocessor(seq_length=SEQ_LENGTH)
+    preprocessor.fit(prices)
+    preprocessor.attach(prices)
+    model = ModelBuilder.build('lstm', (SEQ_LENGTH, 1), horizon=2, units=(8,))
+    path = export_numpy(model, preprocessor, str(tmp_path / "model.npz"))
+
+    window = preprocessor.transform(prices[-SEQ_LENGTH:])
+    scaled = RecursiveForecaster(model, SEQ_LENGTH).forecast(window, 7)
+    expected = preprocessor.inverse_transform(scaled.reshape(-1, 1)).ravel()
+    actual = ExportedForecaster.load(path).forecast(7, prices)
+    np.testing.assert_allclose(actual, expected, rtol=1e-4)
@@ -0,0 +1,112 @@
+import json
+import threading
+import http.client
+import numpy as np
+import pandas as pd
+import pytest
+from server import ForecastService, MicroBatcher, make_handler, ForecastHTTPServer
+
+OPTIONS = dict(seq_length=10, epochs=1, units=8, layers=1, seed=0)
+
+
+class EchoForecaster:
+    # Forecasts the last value of each window, recording batch sizes
+    def __init__(self):
+        self.batches = []
+
+    def forecast(self, windows, days):
+        self.batches.append(len(windows))
+        return np.repeat(windows[:, -1, :1], days, axis=1)
+
+
+def test_micro_batcher_coalesces_concurrent_requests():
+    forecaster = EchoForecaster()
+    batcher = MicroBatcher(forecaster, max_batch=8, max_wait=0.05)
+    results = {}
+
+    def submit(i):
+        results[i] = batcher.submit(np.full((10, 1), i, dtype=np.float32), 2 + i % 3)
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sum(forecaster.batches) == 8
+    assert len(forecaster.batches) < 8
+    for i, path in results.items():
+        np.testing.assert_array_equal(path, np.full(2 + i % 3, i))
+
+
+@pytest.fixture(scope="module")
+def served(tmp_path_factory):
+    from core import train
+    from registry import ModelRegistry
+
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({'Close': 100 + np.cumsum(rng.normal(size=200)),
+                          'Volume': rng.uniform(1e3, 1e4, 200)})
+    registry = ModelRegistry(str(tmp_path_factory.mktemp("registry")))
+    plain = train(frame, 'Close', registry=registry, **OPTIONS)['key']
+    features = train(frame, 'Close', feature_cols=['Volume'], registry=registry,
+                     **OPTIONS)['key']
+    service = ForecastService(registry, max_wait=0.001)
+    httpd = ForecastHTTPServer(("127.0.0.1", 0), make_handler(service))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield service, httpd.server_address[1], frame, plain, features
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_models_describe_inputs(served):
+    service, _, _, plain, features = served
+    models = {m['key']: m for m in service.models()}
+    assert models[plain]['seq_length'] == 10
+    assert models[plain]['feature_cols'] == []
+    assert models[features]['feature_cols'] == ['Volume']
+
+
+def test_forecast_takes_prices_or_feature_rows(served):
+    service, _, frame, plain, features = served
+    prices = service.forecast(plain, frame['Close'].tolist(), 3)
+    assert prices.shape == (3,) and np.all(np.isfinite(prices))
+    rows = frame[['Close', 'Volume']].to_numpy().tolist()
+    assert service.forecast(features, rows, 3).shape == (3,)
+    with pytest.raises(ValueError):
+        service.forecast(features, frame['Close'].tolist(), 3)
+    with pytest.raises(ValueError):
+        service.forecast(plain, frame['Close'].tolist()[:5], 3)
+
+
+def post(port, payload):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.request("POST", "/forecast", json.dumps(payload),
+                 {"Content-Type": "application/json"})
+    response = conn.getresponse()
+    body = json.loads(response.read())
+    conn.close()
+    return response.status, body
+
+
+def test_http_forecast_and_bad_shape(served):
+    _, port, frame, plain, features = served
+    status, body = post(port, {'model': plain, 'values': frame['Close'].tolist(), 'days': 4})
+    assert status == 200 and len(body['forecast']) == 4
+    status, body = post(port, {'model': features, 'values': frame['Close'].tolist()})
+    assert status == 400 and 'rows of 2 values' in body['error']
+
+
+def test_loadgen_sends_feature_rows(served):
+    import argparse
+    from loadgen import describe_model, run_http, synthetic_values
+
+    _, port, _, _, features = served
+    args = argparse.Namespace(model=features, host="127.0.0.1", port=port, unix=None,
+                              concurrency=2, requests=3, days=2)
+    model = describe_model(args)
+    values = synthetic_values(model['seq_length'], 1 + len(model['feature_cols']))
+    assert np.shape(values) == (10, 2)
+    assert run_http(args, values)['requests'] == 6
+    with pytest.raises(SystemExit):
+        describe_model(argparse.Namespace(**dict(vars(args), model="missing")))
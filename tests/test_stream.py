@@ -0,0 +1,92 @@
+import threading
+import time
+import numpy as np
+import pytest
+from stream import BarBuilder, PriceStream, StreamingForecaster, parse_tick, tail_file
+
+
+class LastValue:
+    # Stands in for RecursiveForecaster: every day repeats the last input
+    seq_length = 3
+
+    def __init__(self):
+        self.windows = []
+
+    def forecast(self, window, days):
+        window = np.asarray(window)
+        self.windows.append(window[0, :, 0].copy())
+        return np.repeat(window[:, -1, 0], days)
+
+
+@pytest.mark.parametrize("line, tick", [
+    ("101.5", (None, 101.5)),
+    ("1700000000,101.5", (1700000000.0, 101.5)),
+    ("1970-01-01T00:00:10+00:00,2", (10.0, 2.0)),
+    ('{"t": 5, "price": 3}', (5.0, 3.0)),
+    ("timestamp,price", None),
+    ("", None),
+])
+def test_parse_tick(line, tick):
+    assert parse_tick(line) == tick
+
+
+def test_bars_close_on_the_next_interval():
+    bars = BarBuilder(seconds=10)
+    ticks = [(1, 1.0), (4, 2.0), (12, 3.0), (35, 4.0)]
+    closed = [bar for bar in (bars.update(*tick) for tick in ticks) if bar]
+    # The empty 20-30 interval makes no bar
+    assert closed == [(10, 2.0), (20, 3.0)]
+    assert bars.flush() == (40, 4.0)
+    assert BarBuilder().update(7, 1.5) == (7, 1.5)
+
+
+def test_forecaster_waits_for_a_full_window():
+    inner = LastValue()
+    live = StreamingForecaster(inner, data_min=100.0, scale=0.5, days=2)
+    for close in (102.0, 104.0):
+        live.update(close)
+    assert not live.ready
+    live.update(106.0)
+    assert live.ready
+    np.testing.assert_allclose(live.forecast(), [106.0, 106.0])
+    np.testing.assert_allclose(inner.windows[-1], [1.0, 2.0, 3.0])
+    live.update(108.0)
+    live.forecast()
+    np.testing.assert_allclose(inner.windows[-1], [2.0, 3.0, 4.0])
+
+
+@pytest.mark.parametrize("conflate", [False, True])
+def test_stream_forecasts_closed_bars(conflate):
+    ticks = [(float(t), 100.0 + t) for t in range(10)]
+    forecasts = []
+    stream = PriceStream(iter(ticks), StreamingForecaster(LastValue(), 0.0, 1.0),
+                         conflate=conflate, on_forecast=forecasts.append)
+    stats = stream.run()
+    assert stats['ticks'] == stats['bars'] == 10
+    assert forecasts[-1]['close'] == 109.0
+    assert forecasts[-1]['forecast'][0] == pytest.approx(109.0)
+    if not conflate:
+        # One forecast per bar once the window is full
+        assert stats['forecasts'] == 10 - LastValue.seq_length + 1
+
+
+def test_tail_file_follows_appended_lines(tmp_path):
+    path = tmp_path / "ticks.csv"
+    path.write_text("timestamp,price\n1,100\n")
+    source = tail_file(str(path), from_start=True, poll=0.01)
+    seen = []
+
+    def read():
+        for tick in source:
+            if tick is not None:
+                seen.append(tick)
+            if len(seen) == 2:
+                return
+
+    reader = threading.Thread(target=read, daemon=True)
+    reader.start()
+    time.sleep(0.05)
+    with open(path, "a") as f:
+        f.write("2,101\n")
+    reader.join(timeout=5)
+    assert seen == [(1.0, 100.0), (2.0, 101.0)]
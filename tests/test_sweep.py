@@ -0,0 +1,38 @@
+import math
+import numpy as np
+from sweep import grid_trials, leaderboard, random_trials, run_sweep
+
+
+def test_grid_covers_every_combination():
+    trials = grid_trials({'seq_length': [30, 60], 'units': [8, 16, 32]})
+    assert len(trials) == 6
+    assert {(t['seq_length'], t['units']) for t in trials} == {
+        (s, u) for s in (30, 60) for u in (8, 16, 32)}
+
+
+def test_random_trials_are_distinct_and_capped():
+    space = {'seq_length': [30, 60], 'units': [8, 16, 32]}
+    trials = random_trials(space, 4, seed=1)
+    assert len({tuple(sorted(t.items())) for t in trials}) == 4
+    assert trials == random_trials(space, 4, seed=1)
+    assert len(random_trials(space, 100, seed=1)) == 6
+
+
+def test_leaderboard_ranks_failures_last():
+    ranked = leaderboard([{'val_loss': 0.3}, {'error': 'boom', 'val_loss': math.inf},
+                          {'val_loss': 0.1}])
+    assert [r['val_loss'] for r in ranked] == [0.1, 0.3, math.inf]
+    assert [r['rank'] for r in ranked] == [1, 2, 3]
+
+
+def test_sweep_runs_trials_in_workers(prices):
+    trials = [{'seq_length': 10, 'units': 8, 'layers': 1},
+              {'seq_length': 20, 'units': 8, 'layers': 1},
+              {'seq_length': 1000, 'units': 8, 'layers': 1}]
+    seen = []
+    results = run_sweep(prices, trials, n_workers=2, on_result=seen.append, epochs=1)
+    assert len(seen) == 3
+    assert [r['seq_length'] for r in results[:2]] in ([10, 20], [20, 10])
+    assert all(np.isfinite(r['val_loss']) for r in results[:2])
+    # A trial that cannot run is reported, not raised
+    assert results[2]['seq_length'] == 1000 and 'error' in results[2]
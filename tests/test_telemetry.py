@@ -0,0 +1,95 @@
+import csv
+import json
+import time
+import numpy as np
+import pytest
+from telemetry import TrainingTelemetry, memory_usage
+
+
+def slow_pipeline(n_batches, pause):
+    import tensorflow as tf
+
+    def batches():
+        for i in range(n_batches):
+            time.sleep(pause)
+            yield np.full((8, 3), i, np.float32), np.full((8, 1), i, np.float32)
+
+    return tf.data.Dataset.from_generator(batches, output_signature=(
+        tf.TensorSpec((None, 3), tf.float32), tf.TensorSpec((None, 1), tf.float32)))
+
+
+def small_model():
+    import tensorflow as tf
+
+    model = tf.keras.Sequential([tf.keras.Input((3,)), tf.keras.layers.Dense(1)])
+    model.compile('adam', 'mse')
+    return model
+
+
+def test_input_wait_is_counted_as_pipeline_time():
+    telemetry = TrainingTelemetry()
+    small_model().fit(telemetry.timed(slow_pipeline(20, 0.02)), epochs=2, verbose=0,
+                      callbacks=[telemetry.callback(samples=160, batch_size=8)])
+    assert len(telemetry.epochs) == 2
+    for epoch in telemetry.epochs:
+        # 20 fetches of 20 ms each dominate a tiny model's epoch
+        assert epoch['data_s'] >= 0.35
+        assert epoch['data_s'] > epoch['compute_s']
+        assert epoch['data_s'] + epoch['compute_s'] == pytest.approx(epoch['seconds'])
+    assert telemetry.pipeline_batch_s >= 0.017
+
+
+def test_batches_and_epochs_are_recorded():
+    telemetry = TrainingTelemetry()
+    seen = []
+    small_model().fit(telemetry.timed(slow_pipeline(5, 0)), epochs=3, verbose=0,
+                      callbacks=[telemetry.callback(samples=40, batch_size=8,
+                                                    on_epoch=seen.append)])
+    assert [e['epoch'] for e in telemetry.epochs] == [0, 1, 2]
+    assert seen == telemetry.epochs
+    assert len(telemetry.batches) == 15
+    assert all(b['samples_per_s'] > 0 for b in telemetry.batches)
+    assert telemetry.epochs[0]['peak_rss_bytes'] >= telemetry.epochs[0]['rss_bytes'] > 0
+
+
+def test_timed_dataset_keeps_its_length_and_values():
+    import tensorflow as tf
+
+    dataset = tf.data.Dataset.range(10).batch(4)
+    timed = TrainingTelemetry().timed(dataset)
+    assert int(timed.cardinality()) == 3
+    assert [b.numpy().tolist() for b in timed] == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+
+def test_export_json_and_csv(tmp_path):
+    telemetry = TrainingTelemetry()
+    small_model().fit(telemetry.timed(slow_pipeline(3, 0)), epochs=2, verbose=0,
+                      callbacks=[telemetry.callback(samples=24, batch_size=8)])
+
+    json_path = str(tmp_path / "trace.json")
+    assert telemetry.export(json_path) == [json_path]
+    with open(json_path) as f:
+        trace = json.load(f)
+    assert len(trace['epochs']) == 2 and len(trace['batches']) == 6
+
+    paths = telemetry.export(str(tmp_path / "trace.csv"))
+    assert paths[1].endswith("trace_batches.csv")
+    with open(paths[0]) as f:
+        assert len(list(csv.DictReader(f))) == 2
+    with open(paths[1]) as f:
+        assert len(list(csv.DictReader(f))) == 6
+
+
+def test_training_job_reports_telemetry(price_frame):
+    from core import train
+
+    result = train(price_frame, 'Close', seq_length=10, epochs=2, units=8, layers=1)
+    telemetry = result['telemetry']
+    assert len(telemetry.epochs) == len(result['history']['loss'])
+    assert telemetry.pipeline_batch_s is not None
+    assert all(0 <= e['data_s'] <= e['seconds'] for e in telemetry.epochs)
+
+
+def test_memory_usage():
+    rss, peak = memory_usage()
+    assert 0 < rss <= peak
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from preprocessor import DataPreprocessor
+from windows import SequenceWindows
+
+
+def legacy_windows(scaled, seq_length):
+    # The loop DataPreprocessor.preprocess used before SequenceWindows
+    X, y = [], []
+    for i in range(len(scaled) - seq_length):
+        X.append(scaled[i:i + seq_length])
+        y.append(scaled[i + seq_length])
+    return np.array(X), np.array(y)
+
+
+@pytest.mark.parametrize("seq_length", [1, 7, 60])
+def test_windows_match_legacy_loop(prices, seq_length):
+    scaled = DataPreprocessor(seq_length=seq_length).fit(prices).transform(prices)
+    X, y = legacy_windows(scaled, seq_length)
+
+    windows = SequenceWindows(scaled, seq_length)
+    assert len(windows) == len(X)
+    np.testing.assert_array_equal(windows.materialize(), X)
+    np.testing.assert_array_equal(np.asarray(windows), X)
+    np.testing.assert_array_equal(windows.targets, y)
+    np.testing.assert_array_equal(windows.target_matrix(), y)
+
+
+def test_multi_feature_windows_match_legacy_loop(prices):
+    series = np.column_stack([prices, np.log(prices), np.arange(len(prices))])
+    X, y = legacy_windows(series, 12)
+    windows = SequenceWindows(series, 12)
+    np.testing.assert_array_equal(windows.materialize(), X)
+    np.testing.assert_array_equal(windows.targets, y)
+    np.testing.assert_array_equal(windows.target_matrix(), y[:, :1])
+
+
+def test_slices_match_legacy_loop(prices):
+    X, y = legacy_windows(prices.reshape(-1, 1), 10)
+    windows = SequenceWindows(prices, 10)
+    split = int(len(windows) * 0.8)
+    np.testing.assert_array_equal(windows[:split].materialize(), X[:split])
+    np.testing.assert_array_equal(windows[split:].materialize(), X[split:])
+    np.testing.assert_array_equal(windows[split:].targets, y[split:])
+
+
+def test_horizon_targets(prices):
+    horizon, seq_length = 4, 10
+    windows = SequenceWindows(prices, seq_length)
+    targets = windows.target_matrix(horizon)
+    expected = np.array([prices[i + seq_length:i + seq_length + horizon]
+                         for i in range(len(prices) - seq_length - horizon + 1)])
+    np.testing.assert_array_equal(targets, expected)
+
+
+def test_preprocess_matches_legacy_loop(price_frame):
+    # With no test split the scaler sees every row, as the old code did
+    X, y, scaler = DataPreprocessor(seq_length=20).preprocess(price_frame)
+    scaled = scaler.transform(price_frame[['Close']].values)
+    X_legacy, y_legacy = legacy_windows(scaled, 20)
+    np.testing.assert_array_equal(X, X_legacy)
+    np.testing.assert_array_equal(y, y_legacy)
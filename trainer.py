@@ -1,85 +1,192 @@
+import time
+from collections import deque
 from PyQt5.QtCore import QThread, pyqtSignal
-import tensorflow as tf
-from preprocessor import DataPreprocessor
-from model_builder import ModelBuilder
-import numpy as np
+import core
 
 class ModelTrainer(QThread):
     progress_updated = pyqtSignal(int)
+    epoch_logged = pyqtSignal(dict)
+    batch_logged = pyqtSignal(dict)
     training_completed = pyqtSignal(dict)
     error_occurred = pyqtSignal(str)
 
-    def __init__(self, df, target_col, seq_length, test_size):
+    def __init__(self, df, target_col, seq_length, test_size, source=None, **options):
+        super().__init__()
+        self._running = True
+        # With a source path, train out of core from a memory-mapped copy
+        job_class, data = ((core.OutOfCoreJob, source) if source is not None
+                           else (core.TrainingJob, df))
+        self.job = job_class(
+            data, target_col,
+            seq_length=seq_length,
+            test_size=test_size,
+            on_progress=self.progress_updated.emit,
+            on_epoch=self.epoch_logged.emit,
+            on_batch=self.batch_logged.emit,
+            should_stop=lambda: not self._running,
+            **options
+        )
+
+    def run(self):
+        try:
+            self.training_completed.emit(self.job.run())
+        except Exception as e:
+            self.error_occurred.emit(str(e))
+        finally:
+            self._running = False
+
+    def stop(self):
+        # Non-blocking: training ends after the current batch and the
+        # result still arrives through training_completed
+        self._running = False
+
+
+class SweepRunner(QThread):
+    trial_completed = pyqtSignal(dict)
+    sweep_completed = pyqtSignal(list)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, series, trials, n_workers=None, epochs=20):
+        super().__init__()
+        self.series = series
+        self.trials = trials
+        self.n_workers = n_workers
+        self.epochs = epochs
+        self._running = True
+
+    def run(self):
+        try:
+            board = core.sweep(
+                self.series,
+                self.trials,
+                n_workers=self.n_workers,
+                epochs=self.epochs,
+                on_result=self.trial_completed.emit,
+                should_stop=lambda: not self._running
+            )
+            self.sweep_completed.emit(board)
+        except Exception as e:
+            self.error_occurred.emit(str(e))
+        finally:
+            self._running = False
+
+    def stop(self):
+        self._running = False
+
+
+class EnsembleRunner(QThread):
+    member_completed = pyqtSignal(dict)
+    ensemble_completed = pyqtSignal(dict)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, df, target_col, n_members=5, architectures=None, method='mean',
+                 **options):
         super().__init__()
         self.df = df
         self.target_col = target_col
-        self.seq_length = seq_length
-        self.test_size = test_size
+        self.options = dict(options, n_members=n_members, architectures=architectures,
+                            method=method)
         self._running = True
 
     def run(self):
         try:
-            # Preprocess data
-            preprocessor = DataPreprocessor(self.target_col, self.seq_length)
-            X, y, scaler = preprocessor.preprocess(self.df)
-            
-            # Split data
-            split_idx = int(len(X) * (1 - self.test_size))
-            X_train, X_test = X[:split_idx], X[split_idx:]
-            y_train, y_test = y[:split_idx], y[split_idx:]
-            
-            # Create dataset
-            train_dataset = tf.data.Dataset.from_tensor_slices((X_train, y_train))
-            train_dataset = train_dataset.shuffle(1000).batch(32)
-            
-            # Build model
-            model = ModelBuilder.build_lstm((X.shape[1], 1))
-            
-            # Callbacks
-            callbacks = [
-                tf.keras.callbacks.EarlyStopping(
-                    monitor='loss',
-                    patience=5,
-                    restore_best_weights=True
-                ),
-                self._create_progress_callback()
-            ]
-            
-            # Train
-            history = model.fit(
-                train_dataset,
-                epochs=50,
-                callbacks=callbacks,
-                verbose=0
+            result = core.ensemble(
+                self.df, self.target_col,
+                on_result=self.member_completed.emit,
+                should_stop=lambda: not self._running,
+                **self.options
             )
-            
-            self.training_completed.emit({
-                'model': model,
-                'preprocessor': preprocessor,
-                'X_test': X_test,
-                'y_test': y_test,
-                'history': history.history
-            })
-            
+            self.ensemble_completed.emit(result)
+        except Exception as e:
+            self.error_occurred.emit(str(e))
+        finally:
+            self._running = False
+
+    def stop(self):
+        self._running = False
+
+
+class BacktestRunner(QThread):
+    fold_completed = pyqtSignal(dict)
+    backtest_completed = pyqtSignal(dict)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, series, seq_length=60, n_folds=5, mode='expanding', epochs=20,
+                 units=50, architecture='lstm'):
+        super().__init__()
+        self.series = series
+        self.options = dict(seq_length=seq_length, n_folds=n_folds, mode=mode,
+                            epochs=epochs, units=units, architecture=architecture)
+        self._running = True
+
+    def run(self):
+        try:
+            report = core.backtest(
+                self.series,
+                on_result=self.fold_completed.emit,
+                should_stop=lambda: not self._running,
+                **self.options
+            )
+            self.backtest_completed.emit(report)
+        except Exception as e:
+            self.error_occurred.emit(str(e))
+        finally:
+            self._running = False
+
+    def stop(self):
+        self._running = False
+
+
+class StreamRunner(QThread):
+    forecast_updated = pyqtSignal(dict)
+    stream_finished = pyqtSignal(dict)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, result, source, location, target='Close', date=None, speed=1.0,
+                 bar_seconds=0.0, days=1, history=500, interval=0.1):
+        super().__init__()
+        self.result = result
+        self.source = source
+        self.location = location
+        self.target = target
+        self.date = date
+        self.speed = speed
+        self.bar_seconds = bar_seconds
+        self.days = days
+        self.interval = interval
+        self.closes = deque(maxlen=history)
+        self.feed = None
+        self._running = True
+
+    def run(self):
+        import stream
+
+        try:
+            if self.source == 'replay':
+                source = stream.replay_csv(self.location, self.target, self.date, self.speed)
+            elif self.source == 'tail':
+                source = stream.tail_file(self.location)
+            else:
+                source = stream.socket_source(self.location)
+            forecaster = stream.StreamingForecaster.from_result(self.result, days=self.days,
+                                                                warm=True)
+            self.feed = stream.PriceStream(source, forecaster, bar_seconds=self.bar_seconds,
+                                           on_forecast=self._on_forecast,
+                                           on_bar=lambda bar: self.closes.append(bar[1]))
+            self._last_emit = 0.0
+            self.stream_finished.emit(self.feed.run(should_stop=lambda: not self._running))
         except Exception as e:
             self.error_occurred.emit(str(e))
         finally:
             self._running = False
 
-    def _create_progress_callback(self):
-        class ProgressCallback(tf.keras.callbacks.Callback):
-            def __init__(self, trainer):
-                super().__init__()
-                self.trainer = trainer
-            
-            def on_epoch_end(self, epoch, logs=None):
-                if not self.trainer._running:
-                    self.model.stop_training = True
-                progress = int((epoch + 1) / 50 * 100)
-                self.trainer.progress_updated.emit(progress)
-        
-        return ProgressCallback(self)
+    def _on_forecast(self, update):
+        # The UI hears about the latest forecast at most once per interval
+        now = time.perf_counter()
+        if now - self._last_emit >= self.interval:
+            self._last_emit = now
+            self.forecast_updated.emit(dict(update, history=list(self.closes),
+                                            stats=self.feed.stats()))
 
     def stop(self):
         self._running = False
-        self.wait()
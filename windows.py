@@ -0,0 +1,86 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class SequenceWindows:
+    # Lazy view over every seq_length window of a (n, F) series. Windows are
+    # read-only strided views into the series, so nothing is copied until a
+    # consumer asks for a dense tensor (np.asarray / materialize / batches).
+
+    def __init__(self, series, seq_length, start=0, stop=None):
+        series = np.asarray(series)
+        if series.ndim == 1:
+            series = series.reshape(-1, 1)
+        self.series = series
+        self.seq_length = seq_length
+
+        total = max(len(series) - seq_length, 0)
+        start, stop, _ = slice(start, stop).indices(total)
+        self.start = start
+        self.stop = max(start, stop)
+
+    def __len__(self):
+        return self.stop - self.start
+
+    @property
+    def shape(self):
+        return (len(self), self.seq_length, self.series.shape[1])
+
+    @property
+    def dtype(self):
+        return self.series.dtype
+
+    @property
+    def view(self):
+        # (N, seq_length, F) read-only view sharing memory with the series
+        if len(self) == 0:
+            return np.empty(self.shape, dtype=self.dtype)
+        span = self.series[self.start:self.stop + self.seq_length - 1]
+        windows = sliding_window_view(span, self.seq_length, axis=0)
+        return windows.transpose(0, 2, 1)
+
+    @property
+    def targets(self):
+        # Value that follows each window, aligned with view
+        return self.target_view()
+
+    def target_view(self, horizon=1):
+        # (N, F) for horizon=1, otherwise (N, horizon, F) of the next values.
+        # Windows whose horizon runs past the end of the series are dropped.
+        first = self.start + self.seq_length
+        if horizon == 1:
+            return self.series[first:self.stop + self.seq_length]
+        count = max(min(self.stop, len(self.series) - self.seq_length - horizon + 1)
+                    - self.start, 0)
+        if count == 0:
+            return np.empty((0, horizon, self.series.shape[1]), dtype=self.dtype)
+        span = self.series[first:first + count + horizon - 1]
+        return sliding_window_view(span, horizon, axis=0).transpose(0, 2, 1)
+
+    def target_matrix(self, horizon=1):
+        # (N, horizon) of the target column (column 0)
+        targets = self.target_view(horizon)
+        return targets[:, :1] if horizon == 1 else targets[..., 0]
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if key.step not in (None, 1):
+                return self.view[key]
+            start, stop, _ = key.indices(len(self))
+            return SequenceWindows(self.series, self.seq_length,
+                                   self.start + start, self.start + stop)
+        return self.view[key]
+
+    def __array__(self, dtype=None, copy=None):
+        out = self.materialize()
+        return out if dtype is None else out.astype(dtype, copy=False)
+
+    def materialize(self):
+        return np.ascontiguousarray(self.view)
+
+    def batches(self, batch_size, horizon=1):
+        # Dense (X, y) batches; only one batch is materialized at a time
+        targets = self.target_matrix(horizon)
+        for i in range(0, len(targets), batch_size):
+            yield (np.ascontiguousarray(self.view[i:i + batch_size]),
+                   np.ascontiguousarray(targets[i:i + batch_size]))